@@ -0,0 +1,91 @@
+import asyncio
+
+DEFAULT_WINDOW = 0.002
+DEFAULT_MAX_BATCH = 500
+
+
+class AsyncSupermarketCatalog:
+    """Catalog backed by a remote price service; check out with Teller.checks_out_articles_from_async()."""
+
+    version = 0
+
+    async def unit_price(self, product):
+        return (await self.unit_prices([product]))[product]
+
+    async def unit_prices(self, products):
+        raise NotImplementedError("accesses the price service")
+
+
+class BatchingPriceClient(AsyncSupermarketCatalog):
+    """Coalesces the lookups of concurrent callers into batched fetch_prices requests."""
+
+    def __init__(self, fetch_prices, window=DEFAULT_WINDOW, max_batch=DEFAULT_MAX_BATCH):
+        if max_batch < 1:
+            raise ValueError("max_batch must be >= 1")
+        self._fetch_prices = fetch_prices
+        self.window = window
+        self.max_batch = max_batch
+        self.lookups = 0
+        self.requests = 0
+        self._pending = {}
+        self._in_flight = {}
+        self._flush_handle = None
+        self._tasks = set()
+
+    async def unit_prices(self, products):
+        loop = asyncio.get_running_loop()
+        futures = {}
+        for product in products:
+            if product in futures:
+                continue
+            future = self._in_flight.get(product) or self._pending.get(product)
+            if future is None:
+                future = loop.create_future()
+                self._pending[product] = future
+            futures[product] = future
+        if not futures:
+            return {}
+        self.lookups += len(futures)
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._pending and self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+
+        # wait() rather than awaiting each future: cancelling this caller must not cancel lookups shared with others.
+        await asyncio.wait(futures.values())
+        return {product: future.result() for product, future in futures.items()}
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, {}
+        products = list(pending)
+        for start in range(0, len(products), self.max_batch):
+            batch = {product: pending[product] for product in products[start:start + self.max_batch]}
+            self._in_flight.update(batch)
+            task = asyncio.ensure_future(self._send(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch):
+        self.requests += 1
+        try:
+            prices = await self._fetch_prices(list(batch))
+        except Exception as exc:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(exc)
+        else:
+            for product, future in batch.items():
+                if future.done():
+                    continue
+                if product in prices:
+                    future.set_result(prices[product])
+                else:
+                    future.set_exception(KeyError(product.name))
+        finally:
+            for product, future in batch.items():
+                if self._in_flight.get(product) is future:
+                    del self._in_flight[product]
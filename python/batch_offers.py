@@ -0,0 +1,49 @@
+"""Columnar, fixed-point evaluation of the regular offers with numpy (optional dependency)."""
+from discount_strategies import NForAmountStrategy, PercentDiscountStrategy, ThreeForTwoStrategy
+from fixed_point import LINE_TO_AMOUNT, PRICE_TO_AMOUNT, QUANTITY_SCALE
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def batch_discounts(strategy, quantities, unit_prices, arguments=None):
+    """Dispatches on the strategy an offer resolves to (OfferCalculator.strategy_for)."""
+    if isinstance(strategy, ThreeForTwoStrategy):
+        return three_for_two_discounts(quantities, unit_prices)
+    if isinstance(strategy, PercentDiscountStrategy):
+        return percent_discounts(quantities, unit_prices, arguments)
+    if isinstance(strategy, NForAmountStrategy):
+        return n_for_amount_discounts(strategy.group_size, quantities, unit_prices, arguments)
+    raise ValueError(f"no batch evaluation for {type(strategy).__name__}")
+
+
+def three_for_two_discounts(quantities, unit_prices):
+    quantities, unit_prices = _as_arrays(quantities, unit_prices)
+    quantities_as_int = quantities // QUANTITY_SCALE
+    paid = (quantities_as_int // 3 * 2 + quantities_as_int % 3) * unit_prices * PRICE_TO_AMOUNT
+    discounts = paid - quantities * unit_prices * LINE_TO_AMOUNT
+    return np.where(quantities_as_int > 2, discounts, 0)
+
+
+def percent_discounts(quantities, unit_prices, percents):
+    quantities, unit_prices, percents = _as_arrays(quantities, unit_prices, percents)
+    return -(quantities * unit_prices * percents)
+
+
+def n_for_amount_discounts(group_size, quantities, unit_prices, amounts):
+    quantities, unit_prices, amounts = _as_arrays(quantities, unit_prices, amounts)
+    quantities_as_int = quantities // QUANTITY_SCALE
+    groups_total, remainder = np.divmod(amounts * PRICE_TO_AMOUNT * quantities_as_int, group_size)
+    applies = quantities_as_int >= group_size
+    if np.any((remainder != 0) & applies):
+        raise ValueError(f"{group_size} for amount cannot be split exactly in fixed point")
+    total = groups_total + (quantities_as_int % group_size) * unit_prices * PRICE_TO_AMOUNT
+    return np.where(applies, total - quantities * unit_prices * LINE_TO_AMOUNT, 0)
+
+
+def _as_arrays(*values):
+    if np is None:
+        raise ImportError("batch offer evaluation requires numpy (python -m pip install numpy)")
+    return [np.asarray(value, dtype=np.int64) for value in values]
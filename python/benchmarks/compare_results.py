@@ -0,0 +1,50 @@
+"""
+Compares two run_benchmarks.py result files, case by case.
+
+    python benchmarks/compare_results.py BASELINE.json CANDIDATE.json [--threshold 0.10]
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def compare(baseline, candidate, threshold):
+    """Returns (rows, regressions); a row is (case, products, baseline us/op, candidate us/op, ratio)."""
+    baseline_results = {(r["case"], r["products"]): r for r in baseline["results"]}
+    rows = []
+    regressions = []
+    for result in candidate["results"]:
+        key = (result["case"], result["products"])
+        before = baseline_results.get(key)
+        if before is None:
+            continue
+        ratio = result["best_per_op_us"] / before["best_per_op_us"]
+        row = (*key, before["best_per_op_us"], result["best_per_op_us"], ratio)
+        rows.append(row)
+        if ratio > 1 + threshold:
+            regressions.append(row)
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown, 0.10 = 10%%")
+    args = parser.parse_args(argv)
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    candidate = json.loads(args.candidate.read_text(encoding="utf-8"))
+    rows, regressions = compare(baseline, candidate, args.threshold)
+
+    print(f"{baseline.get('commit')} -> {candidate.get('commit')}")
+    print(f"{'case':<16}{'products':>10}{'before us/op':>14}{'after us/op':>14}{'ratio':>8}")
+    for case, products, before, after, ratio in rows:
+        flag = "  REGRESSION" if ratio > 1 + args.threshold else ""
+        print(f"{case:<16}{products:>10}{before:>14.1f}{after:>14.1f}{ratio:>8.2f}{flag}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Per-object memory of the model objects, compared with equivalent classes that keep a __dict__.
+
+    python benchmarks/memory_footprint.py [--count 100000]
+"""
+import argparse
+import sys
+import tracemalloc
+from decimal import Decimal
+from pathlib import Path
+
+_PYTHON_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_PYTHON_ROOT))
+
+from model_objects import Discount, Offer, Product, ProductQuantity, ProductUnit, SpecialOfferType
+from receipt import Payment, ReceiptItem
+
+
+# The model objects as they were before __slots__, for comparison.
+class _DictProduct:
+    def __init__(self, name, unit):
+        self.name = name
+        self.unit = unit
+
+
+class _DictProductQuantity:
+    def __init__(self, product, quantity):
+        self.product = product
+        self.quantity = quantity
+
+
+class _DictOffer:
+    def __init__(self, offer_type, product, argument):
+        self.offer_type = offer_type
+        self.product = product
+        self.argument = argument
+
+
+class _DictDiscount:
+    def __init__(self, product, description, amount):
+        self.product = product
+        self.description = description
+        self.amount = amount
+
+
+class _DictReceiptItem:
+    def __init__(self, product, quantity, price, total_price):
+        self.product = product
+        self.quantity = quantity
+        self.price = price
+        self.total_price = total_price
+
+
+class _DictPayment:
+    def __init__(self, description, amount):
+        self.description = description
+        self.amount = amount
+
+
+def _bytes_per_object(factory, count):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return (after - before) / count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    product = Product("toothbrush", ProductUnit.EACH)
+    price = Decimal("0.99")
+    # Names are shared between both variants so only the object layout is measured.
+    names = [f"product {i}" for i in range(args.count)]
+    cases = [
+        (
+            "Product",
+            lambda i: Product(names[i], ProductUnit.EACH),
+            lambda i: _DictProduct(names[i], ProductUnit.EACH),
+        ),
+        (
+            "ProductQuantity",
+            lambda i: ProductQuantity(product, price),
+            lambda i: _DictProductQuantity(product, price),
+        ),
+        (
+            "Offer",
+            lambda i: Offer(SpecialOfferType.THREE_FOR_TWO, product, None),
+            lambda i: _DictOffer(SpecialOfferType.THREE_FOR_TWO, product, None),
+        ),
+        (
+            "Discount",
+            lambda i: Discount(product, "3 for 2", price),
+            lambda i: _DictDiscount(product, "3 for 2", price),
+        ),
+        (
+            "ReceiptItem",
+            lambda i: ReceiptItem(product, price, price, price),
+            lambda i: _DictReceiptItem(product, price, price, price),
+        ),
+        (
+            "Payment",
+            lambda i: Payment("Loyalty points", price),
+            lambda i: _DictPayment("Loyalty points", price),
+        ),
+    ]
+
+    print(f"{'class':<16}{'slots':>10}{'__dict__':>10}{'saved':>10}  (bytes per object, {args.count} objects)")
+    for name, slotted, with_dict in cases:
+        slotted_size = _bytes_per_object(slotted, args.count)
+        dict_size = _bytes_per_object(with_dict, args.count)
+        print(f"{name:<16}{slotted_size:>10.0f}{dict_size:>10.0f}{dict_size - slotted_size:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Times the pricing engine on synthetic workloads (benchmarks/workload.py) across catalog sizes.
+
+    python benchmarks/run_benchmarks.py [--sizes 1000 10000 100000] [--repeat 5] [--output FILE]
+"""
+import argparse
+import gc
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+_PYTHON_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_PYTHON_ROOT))
+
+from benchmarks.workload import CHECKOUT_DATE, WorkloadSpec, generate_workload, write_csvs
+from csv_loaders import read_bundle_offers, read_catalog, read_coupons, read_offers
+from fake_catalog import FakeCatalog
+from product_registry import ProductRegistry
+from receipt_printer import ReceiptPrinter
+from teller import Teller
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def checkout_case(workload, data_dir):
+    teller = workload.teller()
+    carts = workload.shopping_carts()
+
+    def run():
+        for cart in carts:
+            _rearm(teller.coupons)
+            teller.checks_out_articles_from(cart, checkout_date=CHECKOUT_DATE)
+
+    return run, len(carts)
+
+
+def plan_selection_case(workload, data_dir):
+    teller = workload.teller()
+    carts = workload.shopping_carts()
+    active = teller.promotions_on(CHECKOUT_DATE)
+    pricing_table = active.pricing_table
+    pricing_table.prefetch(workload.products)
+    jobs = [(cart, teller.bundle_offers_for(cart.product_quantities, CHECKOUT_DATE)) for cart in carts]
+
+    def run():
+        for cart, bundle_offers in jobs:
+            _rearm(active.coupons)
+            cart._select_best_discount_plan(
+                active.offers, bundle_offers, active.coupons, pricing_table, CHECKOUT_DATE, teller.plan_optimizer
+            )
+
+    return run, len(jobs)
+
+
+def greedy_plans_case(workload, data_dir):
+    workload = generate_workload(workload.spec._replace(bundles=workload.spec.bundles * 10))
+    teller = workload.teller()
+    carts = workload.shopping_carts()
+    active = teller.promotions_on(CHECKOUT_DATE)
+    pricing_table = active.pricing_table
+    pricing_table.prefetch(workload.products)
+    jobs = [(cart, teller.bundle_offers_for(cart.product_quantities, CHECKOUT_DATE)) for cart in carts]
+
+    def run():
+        for cart, bundle_offers in jobs:
+            cart._select_greedy_discount_plan(
+                cart.product_quantities, active.offers, bundle_offers, active.coupons, pricing_table, CHECKOUT_DATE
+            )
+
+    return run, len(jobs)
+
+
+def print_receipt_case(workload, data_dir):
+    teller = workload.teller()
+    receipts = []
+    for cart in workload.shopping_carts():
+        _rearm(teller.coupons)
+        receipts.append(teller.checks_out_articles_from(cart, checkout_date=CHECKOUT_DATE))
+    printer = ReceiptPrinter()
+
+    def run():
+        for receipt in receipts:
+            printer.print_receipt(receipt)
+
+    return run, len(receipts)
+
+
+def csv_loaders_case(workload, data_dir):
+    write_csvs(workload, data_dir)
+    rows = len(workload.products) + len(workload.offers) + len(workload.bundles) + len(workload.coupons)
+
+    def run():
+        catalog = FakeCatalog(ProductRegistry())
+        read_catalog(data_dir / "catalog.csv", catalog)
+        teller = Teller(catalog)
+        read_offers(data_dir / "offers.csv", teller, catalog)
+        read_bundle_offers(data_dir / "bundles.csv", teller, catalog)
+        read_coupons(data_dir / "coupons.csv", catalog)
+
+    return run, rows
+
+
+CASES = {
+    "checkout": checkout_case,
+    "plan_selection": plan_selection_case,
+    "greedy_plans": greedy_plans_case,
+    "print_receipt": print_receipt_case,
+    "csv_loaders": csv_loaders_case,
+}
+
+
+def run_benchmarks(sizes, cases=tuple(CASES), repeat=5, base_spec=WorkloadSpec(), report=print):
+    results = []
+    for size in sizes:
+        spec = base_spec._replace(products=size)
+        workload = generate_workload(spec)
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in cases:
+                run, ops = CASES[name](workload, Path(tmp))
+                timings = _time(run, repeat)
+                best = min(timings)
+                result = {
+                    "case": name,
+                    "products": size,
+                    "ops": ops,
+                    "repeat": repeat,
+                    "best_s": best,
+                    "median_s": statistics.median(timings),
+                    "best_per_op_us": best / ops * 1e6,
+                }
+                results.append(result)
+                if report:
+                    report(f"{name:<16}{size:>10}{ops:>8}{result['best_per_op_us']:>14.1f} us/op")
+    return results
+
+
+def _time(run, repeat):
+    timings = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - started)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return timings
+
+
+def _rearm(coupons):
+    # Coupons are single-use; every timed checkout should get the same chance to redeem them.
+    for coupon in coupons:
+        coupon.redeemed = False
+
+
+def _git(*args):
+    try:
+        return subprocess.run(
+            ("git", *args), cwd=_PYTHON_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="catalog sizes to sweep")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--carts", type=int, default=WorkloadSpec().carts)
+    parser.add_argument("--cart-lines", type=int, default=WorkloadSpec().cart_lines)
+    parser.add_argument("--bundles", type=int, default=WorkloadSpec().bundles)
+    parser.add_argument("--zipf-s", type=float, default=WorkloadSpec().zipf_s)
+    parser.add_argument("--seed", type=int, default=WorkloadSpec().seed)
+    parser.add_argument("--output", type=Path, help="JSON file to write (default benchmarks/results/<commit>.json)")
+    args = parser.parse_args(argv)
+
+    spec = WorkloadSpec(
+        carts=args.carts, cart_lines=args.cart_lines, bundles=args.bundles, zipf_s=args.zipf_s, seed=args.seed
+    )
+    commit = _git("rev-parse", "--short", "HEAD")
+    results = run_benchmarks(args.sizes, args.cases, args.repeat, spec)
+
+    output = args.output or RESULTS_DIR / f"{commit or 'unknown'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    document = {
+        "commit": commit,
+        "dirty": bool(_git("status", "--porcelain", "--", ".")),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "workload": {key: value for key, value in spec._asdict().items() if key != "products"},
+        "results": results,
+    }
+    output.write_text(json.dumps(document, indent=2) + "\n", encoding="utf-8")
+    print(f"Wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Deterministic synthetic workloads with Zipf-distributed product popularity."""
+import csv
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import accumulate
+from typing import NamedTuple
+
+from fake_catalog import FakeCatalog
+from model_objects import Coupon, Product, ProductUnit, SpecialOfferType
+from product_registry import ProductRegistry
+from shopping_cart import ShoppingCart
+from teller import Teller
+
+CHECKOUT_DATE = date(2025, 12, 14)
+
+
+class WorkloadSpec(NamedTuple):
+    products: int = 1000
+    offer_ratio: float = 0.2
+    bundles: int = 20
+    bundle_size: int = 2
+    coupons: int = 5
+    carts: int = 200
+    cart_lines: int = 20
+    zipf_s: float = 1.1
+    kilo_ratio: float = 0.1
+    seed: int = 1
+
+
+class Workload(NamedTuple):
+    spec: WorkloadSpec
+    catalog: object
+    products: list
+    prices: dict
+    offers: list
+    bundles: list
+    coupons: list
+    carts: list
+
+    def teller(self):
+        """A teller with the workload's offers, bundles and coupon wallet."""
+        teller = Teller(self.catalog)
+        teller.add_special_offers(self.offers)
+        teller.add_bundle_offers(self.bundles)
+        teller.use_coupons(self.coupons)
+        return teller
+
+    def shopping_carts(self):
+        carts = []
+        for lines in self.carts:
+            cart = ShoppingCart()
+            for product, quantity in lines:
+                cart.add_item_quantity(product, quantity)
+            carts.append(cart)
+        return carts
+
+
+def generate_workload(spec):
+    rng = random.Random(spec.seed)
+    catalog = FakeCatalog(ProductRegistry())
+    products = []
+    prices = {}
+    for i in range(spec.products):
+        unit = ProductUnit.KILO if rng.random() < spec.kilo_ratio else ProductUnit.EACH
+        product = Product(f"product {i:07d}", unit)
+        products.append(product)
+        prices[product] = Decimal(rng.randint(25, 2500)) / 100
+    catalog.add_products(prices.items())
+
+    # Products are listed by popularity rank, so the first ones are the popular ones.
+    cum_weights = list(accumulate(1 / rank ** spec.zipf_s for rank in range(1, spec.products + 1)))
+
+    def popular(k):
+        return rng.choices(products, cum_weights=cum_weights, k=k)
+
+    offers = []
+    for product in rng.sample(products, int(spec.products * spec.offer_ratio)):
+        offers.append(_random_offer(rng, product, prices[product]))
+
+    bundles = []
+    for _ in range(spec.bundles):
+        members = sorted(set(popular(spec.bundle_size * 2)), key=lambda product: product.product_id)
+        if len(members) < 2:
+            continue
+        items = {product: _quantity(rng, product, 1, 2) for product in members[:spec.bundle_size]}
+        bundles.append((items, Decimal(rng.choice((5, 10, 15, 20)))))
+
+    coupons = []
+    for i in range(spec.coupons):
+        product = popular(1)[0]
+        required = rng.randint(2, 6)
+        coupons.append(
+            Coupon(
+                product,
+                required,
+                rng.randint(1, required),
+                rng.choice((25, 50)),
+                CHECKOUT_DATE - timedelta(days=3),
+                CHECKOUT_DATE + timedelta(days=3),
+                f"coupon {i}",
+            )
+        )
+
+    carts = []
+    for _ in range(spec.carts):
+        carts.append([(product, _quantity(rng, product, 1, 6)) for product in popular(spec.cart_lines)])
+
+    return Workload(spec, catalog, products, prices, offers, bundles, coupons, carts)
+
+
+def write_csvs(workload, directory):
+    """Writes the workload in the data directory format read by csv_loaders."""
+    with open(directory / "catalog.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(("name", "unit", "price"))
+        writer.writerows((p.name, p.unit.name, workload.prices[p]) for p in workload.products)
+    with open(directory / "offers.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(("name", "offer", "argument"))
+        for offer_type, product, argument in workload.offers:
+            writer.writerow((product.name, offer_type.name, "" if argument is None else argument))
+    with open(directory / "bundles.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(("bundle_name", "discount_percent", "items"))
+        for i, (items, discount_percent) in enumerate(workload.bundles):
+            items = ";".join(f"{p.name}:{qty}" for p, qty in items.items())
+            writer.writerow((f"bundle {i}", discount_percent, items))
+    with open(directory / "coupons.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            ("name", "product", "required_qty", "discounted_qty", "discount_percent",
+             "valid_from", "valid_to", "description")
+        )
+        for c in workload.coupons:
+            writer.writerow(
+                (c.description, c.product.name, c.required_qty, c.discounted_qty, c.discount_percent,
+                 c.valid_from.isoformat(), c.valid_to.isoformat(), c.description)
+            )
+
+
+def _random_offer(rng, product, price):
+    offer_type = rng.choice(
+        (SpecialOfferType.THREE_FOR_TWO, SpecialOfferType.TEN_PERCENT_DISCOUNT,
+         SpecialOfferType.TWO_FOR_AMOUNT, SpecialOfferType.FIVE_FOR_AMOUNT)
+    )
+    if offer_type is SpecialOfferType.THREE_FOR_TWO:
+        return offer_type, product, None
+    if offer_type is SpecialOfferType.TEN_PERCENT_DISCOUNT:
+        return offer_type, product, float(rng.choice((5, 10, 20, 30)))
+    group_size = 2 if offer_type is SpecialOfferType.TWO_FOR_AMOUNT else 5
+    return offer_type, product, float((price * group_size * Decimal("0.8")).quantize(Decimal("0.01")))
+
+
+def _quantity(rng, product, low, high):
+    if product.unit is ProductUnit.KILO:
+        return Decimal(rng.randint(low * 4, high * 4)) / 4
+    return rng.randint(low, high)
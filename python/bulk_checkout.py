@@ -0,0 +1,171 @@
+"""
+Batch checkout of carts read from a CSV or JSON Lines stream (see scripts/bulk_checkout.py).
+
+Expected CSV format (a cart's lines are consecutive; the optional columns count once per cart):
+  cart_id,name,quantity,loyalty_points,points_to_redeem,coupons
+  c1,toothpaste,5,200,150,orange juice coupon
+  c1,apples,1.2,,,
+"""
+import copy
+import csv
+import json
+from collections import deque
+from decimal import Decimal
+from typing import NamedTuple
+
+from model_objects import LoyaltyAccount, PricingMode
+from shopping_cart import ShoppingCart
+from teller import CheckoutRequest
+
+
+class CartRecord(NamedTuple):
+    cart_id: str
+    request: CheckoutRequest
+
+
+class BulkSummary(NamedTuple):
+    carts: int
+    total: Decimal
+
+
+def iter_cart_rows(stream, input_format="csv"):
+    """Yields the rows of a cart stream as dicts; input_format is "csv" or "jsonl"."""
+    if input_format == "csv":
+        yield from csv.DictReader(stream)
+    elif input_format == "jsonl":
+        for line_number, line in enumerate(stream, start=1):
+            if line.strip():
+                row = json.loads(line)
+                if not isinstance(row, dict):
+                    raise ValueError(f"line {line_number} is not a JSON object")
+                yield row
+    else:
+        raise ValueError(f"unknown input format '{input_format}'")
+
+
+def iter_cart_records(rows, catalog, coupons=(), pricing_mode=PricingMode.DECIMAL):
+    """Groups consecutive rows with the same cart_id into CartRecords."""
+    coupons_by_description = {}
+    for coupon in coupons:
+        # Carts name coupons by description, so two coupons sharing one would be ambiguous.
+        if coupon.description in coupons_by_description:
+            raise ValueError(f"Duplicate coupon description '{coupon.description}'")
+        coupons_by_description[coupon.description] = coupon
+    cart = None
+    for row in rows:
+        cart_id = str(row.get("cart_id") or "").strip()
+        if not cart_id:
+            raise ValueError(f"row without cart_id: {row}")
+        if cart is None or cart_id != cart.cart_id:
+            if cart is not None:
+                yield cart.record()
+            cart = _CartBuilder(cart_id, pricing_mode)
+        cart.add_row(row, catalog, coupons_by_description)
+    if cart is not None:
+        yield cart.record()
+
+
+def run_bulk_checkout(teller, records, write, checkout_date=None, processes=None, chunksize=64):
+    """Prices the records and calls write(record, receipt) in input order; returns a BulkSummary."""
+    records = iter(records)
+    pending = deque()
+
+    def requests():
+        # iter_checkouts() yields in input order, so the records being priced form a queue.
+        for record in records:
+            pending.append(record)
+            yield record.request
+
+    carts = 0
+    total = Decimal("0")
+    for receipt in teller.iter_checkouts(requests(), checkout_date, processes, chunksize):
+        write(pending.popleft(), receipt)
+        carts += 1
+        total += receipt.total_price()
+    return BulkSummary(carts, total)
+
+
+class TextReceiptWriter:
+    """Writes each receipt as ReceiptPrinter prints it, under a "cart <id>" header."""
+
+    def __init__(self, stream, printer):
+        self.stream = stream
+        self.printer = printer
+
+    def __call__(self, record, receipt):
+        self.stream.write(f"cart {record.cart_id}\n")
+        self.printer.write_receipt(receipt, self.stream)
+        account = record.request.loyalty_account
+        if account:
+            self.stream.write(
+                f"Points earned: {receipt.points_earned}, redeemed: {receipt.points_redeemed}, "
+                f"balance: {account.points}\n"
+            )
+        self.stream.write("\n")
+
+
+class JsonLinesReceiptWriter:
+    """Writes one JSON object per receipt."""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def __call__(self, record, receipt):
+        account = record.request.loyalty_account
+        document = {
+            "cart_id": record.cart_id,
+            "subtotal": str(receipt.subtotal),
+            "discount_total": str(receipt.discount_total),
+            "total": str(receipt.total_price()),
+            "discounts": [
+                {"product": d.product.name, "description": d.description, "amount": str(d.discount_amount)}
+                for d in receipt.discounts
+            ],
+            "payments": [{"description": p.description, "amount": str(p.amount)} for p in receipt.payments],
+            "points_earned": receipt.points_earned,
+            "points_redeemed": receipt.points_redeemed,
+            "loyalty_balance": account.points if account else None,
+            "promo_version": receipt.promo_version,
+        }
+        self.stream.write(json.dumps(document) + "\n")
+
+
+class _CartBuilder:
+    def __init__(self, cart_id, pricing_mode):
+        self.cart_id = cart_id
+        self.cart = ShoppingCart(pricing_mode)
+        self.loyalty_points = None
+        self.points_to_redeem = None
+        self.coupons = []
+        self.coupon_names = set()
+
+    def add_row(self, row, catalog, coupons_by_description):
+        name = str(row["name"]).strip()
+        product = catalog.products.get(name)
+        if not product:
+            raise ValueError(f"Unknown product '{name}' in cart {self.cart_id}")
+        self.cart.add_item_quantity(product, Decimal(str(row["quantity"]).strip()))
+
+        loyalty_points = str(row.get("loyalty_points") or "").strip()
+        if loyalty_points and self.loyalty_points is None:
+            self.loyalty_points = int(loyalty_points)
+        points_to_redeem = str(row.get("points_to_redeem") or "").strip()
+        if points_to_redeem and self.points_to_redeem is None:
+            self.points_to_redeem = int(points_to_redeem)
+        names = row.get("coupons") or ()
+        if isinstance(names, str):
+            names = [name.strip() for name in names.split(";") if name.strip()]
+        for name in names:
+            coupon = coupons_by_description.get(name)
+            if coupon is None:
+                raise ValueError(f"Unknown coupon '{name}' in cart {self.cart_id}")
+            if name in self.coupon_names:
+                raise ValueError(f"Duplicate coupon '{name}' in cart {self.cart_id}")
+            self.coupon_names.add(name)
+            self.coupons.append(copy.copy(coupon))
+
+    def record(self):
+        account = LoyaltyAccount(self.loyalty_points) if self.loyalty_points is not None else None
+        return CartRecord(
+            self.cart_id, CheckoutRequest(self.cart, account, self.points_to_redeem or 0, tuple(self.coupons))
+        )
@@ -1,9 +1,19 @@
 
 class SupermarketCatalog:
+    # Bumped by every price change; pricing tables fetch their prices again when it moves.
+    version = 0
 
     def add_product(self, product, price):
         raise NotImplementedError("cannot be called from a unit test - it accesses the database")
 
+    def add_products(self, products_and_prices):
+        for product, price in products_and_prices:
+            self.add_product(product, price)
+
     def unit_price(self, product):
         raise NotImplementedError("cannot be called from a unit test - it accesses the database")
 
+    def unit_prices(self, products):
+        """Prices of several products at once; catalogs backed by a store should override this with one lookup."""
+        return {product: self.unit_price(product) for product in products}
+
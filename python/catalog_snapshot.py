@@ -0,0 +1,363 @@
+"""Compiled, memory-mapped snapshot of a data directory's catalog and promotions."""
+import hashlib
+import mmap
+import os
+import struct
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+from typing import NamedTuple
+
+from csv_loaders import read_bundle_offers, read_catalog, read_coupons, read_offers
+from fake_catalog import FakeCatalog
+from model_objects import Coupon, Product, ProductUnit, SpecialOfferType
+from product_registry import ProductRegistry
+from teller import Teller
+
+SOURCE_FILES = ("catalog.csv", "offers.csv", "bundles.csv", "coupons.csv")
+DEFAULT_SNAPSHOT_NAME = "catalog.snapshot"
+
+MAGIC = b"SMRCSNAP"
+VERSION = 2
+
+# Strings are (offset, length) into the string table; Decimals are (coefficient, exponent).
+# Offer and bundle validity dates are ordinals, 0 for an open end.
+_HEADER = struct.Struct("<8sHHIIIIII")
+_SOURCE = struct.Struct("<IIqq32s")
+_PRODUCT = struct.Struct("<IIBqb")
+_OFFER = struct.Struct("<IBBdii")
+_BUNDLE = struct.Struct("<qbIIii")
+_BUNDLE_ITEM = struct.Struct("<Iqb")
+_COUPON = struct.Struct("<IqbqbqbIIII")
+
+# Size recorded for a source file that did not exist when the snapshot was built.
+_ABSENT = -1
+
+
+class SourceStamp(NamedTuple):
+    name: str
+    mtime_ns: int
+    size: int
+    sha256: bytes
+
+
+def build_snapshot(data_dir: Path, snapshot_path: Path):
+    """Parses the CSVs in data_dir and writes the snapshot; returns the source stamps recorded."""
+    # Stamp before parsing: a file changed while we read it then shows up as stale.
+    stamps = [_stamp(data_dir / name) for name in SOURCE_FILES]
+
+    catalog = FakeCatalog(ProductRegistry())
+    teller = Teller(catalog)
+    coupons = _load_csvs(data_dir, catalog, teller)
+
+    writer = _SnapshotWriter()
+    for stamp in stamps:
+        writer.sources.append(_SOURCE.pack(*writer.string(stamp.name), stamp.mtime_ns, stamp.size, stamp.sha256))
+    index = {}
+    for product in catalog.products.values():
+        index[product] = len(index)
+        writer.products.append(
+            _PRODUCT.pack(*writer.string(product.name), product.unit.value, *_pack_decimal(catalog.unit_price(product)))
+        )
+    for offer in teller.all_offers:
+        has_argument = offer.argument is not None
+        writer.offers.append(
+            _OFFER.pack(
+                index[offer.product],
+                offer.offer_type.value,
+                has_argument,
+                offer.argument if has_argument else 0,
+                *_pack_validity(offer),
+            )
+        )
+    for bundle_offer in teller.bundle_offers:
+        writer.bundles.append(
+            _BUNDLE.pack(
+                *_pack_decimal(bundle_offer.discount_percent),
+                len(writer.bundle_items),
+                len(bundle_offer.items_required),
+                *_pack_validity(bundle_offer),
+            )
+        )
+        for product, qty in bundle_offer.items_required.items():
+            writer.bundle_items.append(_BUNDLE_ITEM.pack(index[product], *_pack_decimal(qty)))
+    for coupon in coupons:
+        writer.coupons.append(
+            _COUPON.pack(
+                index[coupon.product],
+                *_pack_decimal(coupon.required_qty),
+                *_pack_decimal(coupon.discounted_qty),
+                *_pack_decimal(coupon.discount_percent),
+                coupon.valid_from.toordinal(),
+                coupon.valid_to.toordinal(),
+                *writer.string(coupon.description),
+            )
+        )
+    writer.write(snapshot_path)
+    return stamps
+
+
+def load_snapshot(snapshot_path: Path, catalog, teller):
+    """Loads the products into catalog and the offers and bundles into teller; returns the coupons."""
+    with _SnapshotReader(snapshot_path) as reader:
+        strings = reader.string
+        decimal = _decimal_cache()
+        units = {unit.value: unit for unit in ProductUnit}
+        offer_types = {offer_type.value: offer_type for offer_type in SpecialOfferType}
+        records = list(reader.records("products"))
+        products = [Product(strings(offset, length), units[unit]) for offset, length, unit, _, _ in records]
+        catalog.add_products(
+            zip(products, [decimal(coefficient, exponent) for _, _, _, coefficient, exponent in records])
+        )
+        del records
+        teller.add_special_offers(
+            (
+                offer_types[offer_type],
+                products[product],
+                argument if has_argument else None,
+                _unpack_date(valid_from),
+                _unpack_date(valid_to),
+            )
+            for product, offer_type, has_argument, argument, valid_from, valid_to in reader.records("offers")
+        )
+        bundle_items = list(reader.records("bundle_items"))
+        teller.add_bundle_offers(
+            (
+                {
+                    products[product]: decimal(coefficient, exponent)
+                    for product, coefficient, exponent in bundle_items[start:start + count]
+                },
+                decimal(percent, percent_exponent),
+                _unpack_date(valid_from),
+                _unpack_date(valid_to),
+            )
+            for percent, percent_exponent, start, count, valid_from, valid_to in reader.records("bundles")
+        )
+        return [
+            Coupon(
+                products[product],
+                decimal(required, required_exponent),
+                decimal(discounted, discounted_exponent),
+                decimal(percent, percent_exponent),
+                date.fromordinal(valid_from),
+                date.fromordinal(valid_to),
+                strings(description_offset, description_length),
+            )
+            for (
+                product, required, required_exponent, discounted, discounted_exponent, percent, percent_exponent,
+                valid_from, valid_to, description_offset, description_length,
+            ) in reader.records("coupons")
+        ]
+
+
+def read_sources(snapshot_path: Path):
+    """Returns the source stamps recorded in the snapshot."""
+    with _SnapshotReader(snapshot_path) as reader:
+        return [
+            SourceStamp(reader.string(offset, length), mtime_ns, size, digest)
+            for offset, length, mtime_ns, size, digest in reader.records("sources")
+        ]
+
+
+def stale_sources(snapshot_path: Path, data_dir: Path):
+    """Names of the source files that changed since the snapshot was built; all of them if there is no snapshot."""
+    if not snapshot_path.exists():
+        return list(SOURCE_FILES)
+    recorded = {stamp.name: stamp for stamp in read_sources(snapshot_path)}
+    stale = []
+    for name in SOURCE_FILES:
+        stamp = recorded.get(name)
+        if stamp is None or not _matches(data_dir / name, stamp):
+            stale.append(name)
+    return stale
+
+
+def verify_snapshot(snapshot_path: Path, data_dir: Path):
+    """Returns the snapshot's problems against data_dir, empty when it is good."""
+    stale = stale_sources(snapshot_path, data_dir)
+    if stale:
+        return [f"{name} changed since the snapshot was built" for name in stale]
+
+    problems = []
+    from_snapshot = _contents(lambda catalog, teller: load_snapshot(snapshot_path, catalog, teller))
+    from_csv = _contents(lambda catalog, teller: _load_csvs(data_dir, catalog, teller))
+    for section, expected, actual in zip(("products", "offers", "bundles", "coupons"), from_csv, from_snapshot):
+        if expected != actual:
+            problems.append(f"{section} differ from the CSV sources")
+    return problems
+
+
+def _load_csvs(data_dir, catalog, teller):
+    read_catalog(data_dir / "catalog.csv", catalog)
+    read_offers(data_dir / "offers.csv", teller, catalog)
+    read_bundle_offers(data_dir / "bundles.csv", teller, catalog)
+    return read_coupons(data_dir / "coupons.csv", catalog)
+
+
+def _contents(load):
+    catalog = FakeCatalog(ProductRegistry())
+    teller = Teller(catalog)
+    coupons = load(catalog, teller)
+    products = [(p.name, p.unit, catalog.unit_price(p)) for p in catalog.products.values()]
+    offers = [(o.product.name, o.offer_type, o.argument, o.valid_from, o.valid_to) for o in teller.all_offers]
+    bundles = [
+        (sorted((p.name, qty) for p, qty in b.items_required.items()), b.discount_percent, b.valid_from, b.valid_to)
+        for b in teller.bundle_offers
+    ]
+    coupons = [
+        (c.product.name, c.required_qty, c.discounted_qty, c.discount_percent, c.valid_from, c.valid_to, c.description)
+        for c in coupons
+    ]
+    return products, offers, bundles, coupons
+
+
+def _matches(path, stamp):
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return stamp.size == _ABSENT
+    if stat.st_size != stamp.size:
+        return False
+    if stat.st_mtime_ns == stamp.mtime_ns:
+        return True
+    return _sha256(path) == stamp.sha256
+
+
+def _stamp(path):
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return SourceStamp(path.name, 0, _ABSENT, bytes(32))
+    return SourceStamp(path.name, stat.st_mtime_ns, stat.st_size, _sha256(path))
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def _pack_decimal(value):
+    value = Decimal(value)
+    if not value.is_finite():
+        raise ValueError(f"cannot store {value} in a snapshot")
+    exponent = value.as_tuple().exponent
+    coefficient = int(value.scaleb(-exponent))
+    if not -128 <= exponent <= 127 or not -(1 << 63) <= coefficient < (1 << 63):
+        raise ValueError(f"{value} is out of range for a snapshot")
+    return coefficient, exponent
+
+
+def _pack_validity(promotion):
+    return (
+        promotion.valid_from.toordinal() if promotion.valid_from else 0,
+        promotion.valid_to.toordinal() if promotion.valid_to else 0,
+    )
+
+
+def _unpack_date(ordinal):
+    return date.fromordinal(ordinal) if ordinal else None
+
+
+def _unpack_decimal(coefficient, exponent):
+    return Decimal(coefficient).scaleb(exponent)
+
+
+def _decimal_cache():
+    # Prices repeat a lot across a catalog; Decimals are immutable, so equal ones are shared.
+    cache = {}
+
+    def decimal(coefficient, exponent):
+        key = (coefficient, exponent)
+        value = cache.get(key)
+        if value is None:
+            value = cache[key] = _unpack_decimal(coefficient, exponent)
+        return value
+
+    return decimal
+
+
+_SECTIONS = (
+    ("sources", _SOURCE),
+    ("products", _PRODUCT),
+    ("offers", _OFFER),
+    ("bundles", _BUNDLE),
+    ("bundle_items", _BUNDLE_ITEM),
+    ("coupons", _COUPON),
+)
+
+
+class _SnapshotWriter:
+    def __init__(self):
+        self.sources = []
+        self.products = []
+        self.offers = []
+        self.bundles = []
+        self.bundle_items = []
+        self.coupons = []
+        self._strings = bytearray()
+
+    def string(self, value):
+        encoded = value.encode("utf-8")
+        offset = len(self._strings)
+        self._strings += encoded
+        return offset, len(encoded)
+
+    def write(self, snapshot_path):
+        counts = [len(getattr(self, name)) for name, _ in _SECTIONS]
+        header = _HEADER.pack(MAGIC, VERSION, *counts, len(self._strings))
+        # Write next to the target and rename, so a reader never maps a half-written snapshot.
+        tmp_path = snapshot_path.with_name(snapshot_path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            for name, _ in _SECTIONS:
+                f.writelines(getattr(self, name))
+            f.write(self._strings)
+        os.replace(tmp_path, snapshot_path)
+
+
+class _SnapshotReader:
+    def __init__(self, snapshot_path):
+        with open(snapshot_path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else None
+        self._view = memoryview(self._map if self._map is not None else b"")
+        if len(self._view) < _HEADER.size:
+            self.close()
+            raise ValueError(f"{snapshot_path} is not a catalog snapshot")
+        magic, version, *counts, strings_size = _HEADER.unpack_from(self._view)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{snapshot_path} is not a version {VERSION} catalog snapshot")
+        self._sections = {}
+        offset = _HEADER.size
+        for (name, record), count in zip(_SECTIONS, counts):
+            self._sections[name] = (record, offset, offset + count * record.size)
+            offset += count * record.size
+        self._strings_start = offset
+        self._strings = None
+        if offset + strings_size != len(self._view):
+            self.close()
+            raise ValueError(f"{snapshot_path} is truncated")
+
+    def records(self, name):
+        record, start, end = self._sections[name]
+        return record.iter_unpack(self._view[start:end])
+
+    def string(self, offset, length):
+        # The string table is copied out once; slicing bytes is cheaper than slicing the map per string.
+        if self._strings is None:
+            self._strings = bytes(self._view[self._strings_start:])
+        return self._strings[offset:offset + length].decode("utf-8")
+
+    def close(self):
+        self._view.release()
+        if self._map is not None:
+            self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
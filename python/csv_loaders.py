@@ -1,75 +1,84 @@
 import csv
+import os
 from datetime import date
 from decimal import Decimal
 from pathlib import Path
+from typing import NamedTuple
 
 from model_objects import Coupon, Product, ProductUnit, SpecialOfferType
 
 
-def read_catalog(catalog_file: Path, catalog):
+DEFAULT_BATCH_SIZE = 10000
+
+
+class LoadProgress(NamedTuple):
+    rows: int
+    bytes_read: int
+    total_bytes: int
+
+
+def iter_catalog_batches(catalog_file: Path, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """Yields lists of (product, price) parsed from the catalog file, batch_size rows at a time."""
+    return _iter_batches(catalog_file, _parse_catalog_row, batch_size, progress)
+
+
+def iter_offer_batches(offers_file: Path, catalog, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """Yields lists of (offer_type, product, argument, valid_from, valid_to); the dates are None when blank."""
+    return _iter_batches(offers_file, lambda row: _parse_offer_row(row, catalog), batch_size, progress)
+
+
+def iter_bundle_batches(bundles_file: Path, catalog, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """Yields lists of (items_required, discount_percent, valid_from, valid_to); rows without items are skipped."""
+    return _iter_batches(
+        bundles_file, lambda row: _parse_bundle_row(row, catalog, bundles_file), batch_size, progress
+    )
+
+
+def iter_coupon_batches(coupons_file: Path, catalog, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """Yields lists of Coupon."""
+    return _iter_batches(
+        coupons_file, lambda row: _parse_coupon_row(row, catalog, coupons_file), batch_size, progress
+    )
+
+
+def read_catalog(catalog_file: Path, catalog, batch_size=DEFAULT_BATCH_SIZE, progress=None):
     if not catalog_file.exists():
         return catalog
-    with open(catalog_file, "r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            name = row["name"]
-            unit = ProductUnit[row["unit"]]
-            price = Decimal(row["price"])
-            product = Product(name, unit)
-            catalog.add_product(product, price)
+    for batch in iter_catalog_batches(catalog_file, batch_size, progress):
+        catalog.add_products(batch)
     return catalog
 
 
-def read_offers(offers_file: Path, teller, catalog):
+def read_offers(offers_file: Path, teller, catalog, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """
+    Expected CSV format (valid_from and valid_to are optional, blank for open-ended):
+      name,offer,argument,valid_from,valid_to
+      toothbrush,THREE_FOR_TWO,0,,
+      apples,TEN_PERCENT_DISCOUNT,20,2025-11-10,2025-11-16
+    """
     if not offers_file.exists():
         return
-    with open(offers_file, "r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            name = row["name"]
-            offer_type = SpecialOfferType[row["offer"]]
-            argument_raw = row.get("argument", "")
-            argument = float(argument_raw) if argument_raw else None
-            product = catalog.products[name]
-            teller.add_special_offer(offer_type, product, argument)
+    for batch in iter_offer_batches(offers_file, catalog, batch_size, progress):
+        teller.add_special_offers(batch)
 
 
-def read_bundle_offers(bundles_file: Path, teller, catalog) -> int:
+def read_bundle_offers(bundles_file: Path, teller, catalog, batch_size=DEFAULT_BATCH_SIZE, progress=None) -> int:
     """
-    Expected CSV format:
-      bundle_name,discount_percent,items
-      starter_pack,10,toothbrush:1;toothpaste:1
+    Expected CSV format (valid_from and valid_to are optional, as for offers):
+      bundle_name,discount_percent,items,valid_from,valid_to
+      starter_pack,10,toothbrush:1;toothpaste:1,,
     """
     if not bundles_file.exists():
         return 0
 
     count = 0
-    with open(bundles_file, "r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            items = (row.get("items") or "").strip()
-            if not items:
-                continue
-
-            items_required = {}
-            for item in items.split(";"):
-                item = item.strip()
-                if not item:
-                    continue
-                product_name, qty = item.split(":", 1)
-                product = catalog.products.get(product_name.strip())
-                if not product:
-                    raise ValueError(f"Unknown product '{product_name}' in {bundles_file}")
-                items_required[product] = Decimal(qty.strip())
-
-            discount_percent = Decimal((row.get("discount_percent") or "10").strip())
-            teller.add_bundle_offer(items_required, discount_percent=discount_percent)
-            count += 1
-
+    for batch in iter_bundle_batches(bundles_file, catalog, batch_size, progress):
+        teller.add_bundle_offers(batch)
+        count += len(batch)
     return count
 
 
-def read_coupons(coupons_file: Path, catalog):
+def read_coupons(coupons_file: Path, catalog, batch_size=DEFAULT_BATCH_SIZE, progress=None):
     """
     Expected CSV format:
       name,product,required_qty,discounted_qty,discount_percent,valid_from,valid_to,description
@@ -79,26 +88,97 @@ def read_coupons(coupons_file: Path, catalog):
         return []
 
     coupons = []
-    with open(coupons_file, "r", newline="", encoding="utf-8") as f:
+    for batch in iter_coupon_batches(coupons_file, catalog, batch_size, progress):
+        coupons.extend(batch)
+    return coupons
+
+
+def _iter_batches(path: Path, parse_row, batch_size, progress):
+    # Only one batch of parsed rows is alive at a time; progress is reported after each batch.
+    if batch_size < 1:
+        raise ValueError("batch_size must be >= 1")
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        total_bytes = os.fstat(f.fileno()).st_size
         reader = csv.DictReader(f)
+        rows = 0
+        batch = []
         for row in reader:
-            product_name = (row.get("product") or "").strip()
-            product = catalog.products.get(product_name)
-            if not product:
-                raise ValueError(f"Unknown product '{product_name}' in {coupons_file}")
-
-            coupons.append(
-                Coupon(
-                    product=product,
-                    required_qty=Decimal(row["required_qty"]),
-                    discounted_qty=Decimal(row["discounted_qty"]),
-                    discount_percent=Decimal(row["discount_percent"]),
-                    valid_from=date.fromisoformat(row["valid_from"]),
-                    valid_to=date.fromisoformat(row["valid_to"]),
-                    description=(row.get("description") or row.get("name") or "coupon").strip(),
-                )
-            )
-    return coupons
+            rows += 1
+            parsed = parse_row(row)
+            if parsed is not None:
+                batch.append(parsed)
+            if rows % batch_size == 0:
+                if batch:
+                    yield batch
+                    batch = []
+                if progress:
+                    progress(LoadProgress(rows, f.buffer.tell(), total_bytes))
+        if batch:
+            yield batch
+        if progress and rows % batch_size:
+            progress(LoadProgress(rows, total_bytes, total_bytes))
+
+
+def _parse_catalog_row(row):
+    name = row["name"]
+    unit = ProductUnit[row["unit"]]
+    price = Decimal(row["price"])
+    return Product(name, unit), price
+
+
+def _parse_offer_row(row, catalog):
+    name = row["name"]
+    offer_type = SpecialOfferType[row["offer"]]
+    argument_raw = row.get("argument", "")
+    argument = float(argument_raw) if argument_raw else None
+    product = catalog.products[name]
+    return offer_type, product, argument, *_parse_validity(row)
+
+
+def _parse_bundle_row(row, catalog, bundles_file):
+    items = (row.get("items") or "").strip()
+    if not items:
+        return None
+
+    items_required = {}
+    for item in items.split(";"):
+        item = item.strip()
+        if not item:
+            continue
+        product_name, qty = item.split(":", 1)
+        product = catalog.products.get(product_name.strip())
+        if not product:
+            raise ValueError(f"Unknown product '{product_name}' in {bundles_file}")
+        items_required[product] = Decimal(qty.strip())
+
+    discount_percent = Decimal((row.get("discount_percent") or "10").strip())
+    return items_required, discount_percent, *_parse_validity(row)
+
+
+def _parse_validity(row):
+    valid_from = (row.get("valid_from") or "").strip()
+    valid_to = (row.get("valid_to") or "").strip()
+    return (
+        date.fromisoformat(valid_from) if valid_from else None,
+        date.fromisoformat(valid_to) if valid_to else None,
+    )
+
+
+def _parse_coupon_row(row, catalog, coupons_file):
+    product_name = (row.get("product") or "").strip()
+    product = catalog.products.get(product_name)
+    if not product:
+        raise ValueError(f"Unknown product '{product_name}' in {coupons_file}")
+
+    return Coupon(
+        product=product,
+        required_qty=Decimal(row["required_qty"]),
+        discounted_qty=Decimal(row["discounted_qty"]),
+        discount_percent=Decimal(row["discount_percent"]),
+        valid_from=date.fromisoformat(row["valid_from"]),
+        valid_to=date.fromisoformat(row["valid_to"]),
+        description=(row.get("description") or row.get("name") or "coupon").strip(),
+    )
 
 
 def read_cart(cart_file: Path, catalog):
@@ -0,0 +1,318 @@
+import time
+from typing import NamedTuple
+
+DEFAULT_NODE_BUDGET = 20000
+
+# The search recurses once per consumer of a component; past this depth fall back to the greedy plans.
+MAX_CONSUMERS_PER_COMPONENT = 200
+
+_CLOCK_CHECK_INTERVAL = 256
+
+
+class DiscountPlan(NamedTuple):
+    discounts: list
+    savings: object
+    coupons_used: tuple
+
+
+class DiscountPlanOptimizer:
+    """
+    Finds the maximum-savings combination of bundles, coupons and per-product offers.
+
+    node_budget counts every evaluation; solve() returns None once it or time_budget (seconds) runs out.
+    """
+
+    def __init__(self, node_budget=DEFAULT_NODE_BUDGET, time_budget=None):
+        self.node_budget = node_budget
+        self.time_budget = time_budget
+
+    def solve(
+        self, quantities, bundle_offers, coupons, pricing_table, checkout_date, offer_calculator, component_cache=None,
+        instrumentation=None,
+    ):
+        search = _PlanSearch(self, pricing_table, checkout_date, offer_calculator)
+        try:
+            return search.run(quantities, bundle_offers, coupons, component_cache)
+        except _BudgetExhausted:
+            return None
+        finally:
+            if instrumentation:
+                instrumentation.count("search_nodes", search._nodes)
+
+
+class _BudgetExhausted(Exception):
+    pass
+
+
+class _BundleConsumer:
+    def __init__(self, bundle_offer):
+        self.bundle_offer = bundle_offer
+        self.source = bundle_offer
+        self.products = list(bundle_offer.items_required)
+        self._options = {}
+
+    def options(self, quantities, search):
+        calculator = search.offer_calculator
+        bundle_count = calculator.count_complete_bundles(self.bundle_offer, quantities)
+        for count in range(bundle_count, 0, -1):
+            option = self._options.get(count)
+            if option is None:
+                discount = calculator.bundle_discount(self.bundle_offer, count, search.pricing_table)
+                option = ((discount,), calculator.bundle_consumption(self.bundle_offer, count), ())
+                self._options[count] = option
+            yield option
+
+
+class _CouponWalletConsumer:
+    """The coupons of a wallet that target one product, searched as a single consumer."""
+
+    def __init__(self, product, coupons):
+        self.product = product
+        self.coupons = coupons
+        self.source = tuple(coupons)
+        self.products = [product]
+        self._options = {}
+        self._coupon_options_memo = {}
+
+    def options(self, quantities, search):
+        available = quantities.get(self.product)
+        if available is None:
+            return ()
+        options = self._options.get(available)
+        if options is None:
+            combinations = self._combinations(available, search)
+            options = [
+                (discounts, {self.product: consumed}, coupons_used)
+                for consumed, (savings, discounts, coupons_used) in sorted(
+                    combinations.items(), key=_first, reverse=True
+                )
+                if discounts
+            ]
+            self._options[available] = options
+        return options
+
+    def _combinations(self, available, search):
+        # {quantity consumed: (savings, discounts, coupons)}, keeping the best combination per quantity.
+        combinations = _NOTHING_CONSUMED
+        for position, coupon in enumerate(self.coupons):
+            extended = dict(combinations)
+            for total, (savings, discounts, coupons_used) in combinations.items():
+                for discount, consumed in self._coupon_options(position, available - total, search):
+                    search._tick()
+                    candidate = (savings - discount.amount, discounts + (discount,), coupons_used + (coupon,))
+                    best = extended.get(total + consumed)
+                    if best is None or candidate[0] > best[0]:
+                        extended[total + consumed] = candidate
+            combinations = extended
+        return combinations
+
+    def _coupon_options(self, position, remaining, search):
+        key = (position, remaining)
+        options = self._coupon_options_memo.get(key)
+        if options is not None:
+            return options
+        coupon = self.coupons[position]
+        calculator = search.offer_calculator
+        quantities = {self.product: remaining}
+        required_qty = calculator.to_quantity(coupon.required_qty)
+        max_discounted_qty = None
+        options = []
+        while True:
+            search._tick()
+            result = calculator.compute_coupon_discount(
+                coupon, quantities, search.pricing_table, search.checkout_date, max_discounted_qty
+            )
+            if not result:
+                break
+            discount, consumed = result
+            options.append((discount, consumed[self.product]))
+            # Discounting fewer units can leave room for bundles, offers or other coupons on the same product.
+            max_discounted_qty = consumed[self.product] - required_qty - calculator.unit_quantity
+        self._coupon_options_memo[key] = options
+        return options
+
+
+_NOTHING_CONSUMED = {0: (0, (), ())}
+
+
+class _PlanSearch:
+    def __init__(self, optimizer, pricing_table, checkout_date, offer_calculator):
+        self.pricing_table = pricing_table
+        self.checkout_date = checkout_date
+        self.offer_calculator = offer_calculator
+        self._node_budget = optimizer.node_budget
+        self._deadline = None
+        if optimizer.time_budget is not None:
+            self._deadline = time.perf_counter() + optimizer.time_budget
+        self._nodes = 0
+        self._regular_memo = {}
+
+    def run(self, quantities, bundle_offers, coupons, component_cache=None):
+        wallets = {}
+        for coupon in self._applicable_coupons(coupons or (), quantities):
+            wallets.setdefault(coupon.product, []).append(coupon)
+        bundle_consumers = [
+            _BundleConsumer(bundle_offer)
+            for bundle_offer in bundle_offers
+            if bundle_offer.items_required and all(p in quantities for p in bundle_offer.items_required)
+        ]
+        # A product's coupons go right after the last bundle using it: the product is settled
+        # (see _solve_component) as soon as its coupons have been tried.
+        last_bundle = {}
+        for position, consumer in enumerate(bundle_consumers):
+            for product in consumer.products:
+                last_bundle[product] = position
+        consumers = []
+        for position, consumer in enumerate(bundle_consumers):
+            consumers.append(consumer)
+            for product in consumer.products:
+                if last_bundle[product] == position and product in wallets:
+                    consumers.append(_CouponWalletConsumer(product, wallets.pop(product)))
+        consumers.extend(_CouponWalletConsumer(product, wallet) for product, wallet in wallets.items())
+
+        discounts = []
+        savings = 0
+        coupons_used = ()
+        for products, component_consumers in _components(list(quantities), consumers):
+            state = tuple(quantities[p] for p in products)
+            if component_cache is None:
+                result = self._solve_component(products, component_consumers, state)
+            else:
+                key = (tuple(products), state, tuple(consumer.source for consumer in component_consumers))
+                result = component_cache.get(key)
+                if result is None:
+                    result = self._solve_component(products, component_consumers, state)
+                    component_cache[key] = result
+            component_savings, component_discounts, component_coupons = result
+            discounts.extend(component_discounts)
+            savings += component_savings
+            coupons_used += component_coupons
+        return DiscountPlan(discounts, savings, coupons_used)
+
+    def _applicable_coupons(self, coupons, quantities):
+        to_quantity = self.offer_calculator.to_quantity
+        # dict.fromkeys drops a coupon listed twice (teller wallet and checkout wallet) and keeps the order.
+        for coupon in dict.fromkeys(coupons):
+            available = quantities.get(coupon.product)
+            if available is None or available <= to_quantity(coupon.required_qty):
+                continue
+            if coupon.is_valid_on(self.checkout_date):
+                yield coupon
+
+    def _solve_component(self, products, consumers, state):
+        if len(consumers) > MAX_CONSUMERS_PER_COMPONENT:
+            raise _BudgetExhausted()
+        index = {product: i for i, product in enumerate(products)}
+        # A product is settled after the last consumer touching it: its leftover is priced with the
+        # per-product offers there and zeroed in the state, so states differing only in settled
+        # products share one memo entry. Wallets with several coupons per product rely on this.
+        last_consumer = {}
+        for position, consumer in enumerate(consumers):
+            for product in consumer.products:
+                last_consumer[index[product]] = position
+        settled_after = [[] for _ in consumers]
+        for i, position in sorted(last_consumer.items()):
+            settled_after[position].append(i)
+        everything = range(len(products))
+        memo = {}
+
+        def advance(position, state):
+            savings, regular, state = self._settle(products, state, settled_after[position])
+            next_savings, discounts, next_regular, coupons_used = best(position + 1, state)
+            return next_savings + savings, discounts, regular + next_regular, coupons_used
+
+        def best(position, state):
+            key = (position, state)
+            cached = memo.get(key)
+            if cached is not None:
+                return cached
+            self._tick()
+
+            if position == len(consumers):
+                savings, regular, _ = self._settle(products, state, everything)
+                result = (savings, (), regular, ())
+            else:
+                consumer = consumers[position]
+                quantities = {p: state[index[p]] for p in consumer.products if state[index[p]] > 0}
+                result = None
+                for option_discounts, consumed, option_coupons in consumer.options(quantities, self):
+                    self._tick()
+                    next_state = list(state)
+                    for product, qty in consumed.items():
+                        next_state[index[product]] -= qty
+                    savings, discounts, regular, coupons_used = advance(position, tuple(next_state))
+                    for discount in option_discounts:
+                        savings -= discount.amount
+                    if result is None or savings > result[0]:
+                        result = (savings, option_discounts + discounts, regular, option_coupons + coupons_used)
+                skipped = advance(position, state)
+                if result is None or skipped[0] > result[0]:
+                    result = skipped
+
+            memo[key] = result
+            return result
+
+        savings, discounts, regular, coupons_used = best(0, state)
+        # Consumer discounts first, then the per-product offers in product order.
+        return savings, discounts + tuple(discount for _, discount in sorted(regular, key=_first)), coupons_used
+
+    def _settle(self, products, state, positions):
+        # Prices the leftover of the products at positions with their offers; returns them zeroed in the state.
+        savings = 0
+        regular = ()
+        if not positions:
+            return savings, regular, state
+        state = list(state)
+        for i in positions:
+            quantity = state[i]
+            if quantity <= 0:
+                continue
+            key = (products[i], quantity)
+            if key in self._regular_memo:
+                discount = self._regular_memo[key]
+            else:
+                self._tick()
+                discount = self.offer_calculator.regular_discount(self.pricing_table, products[i], quantity)
+                self._regular_memo[key] = discount
+            if discount:
+                savings -= discount.amount
+                regular += ((i, discount),)
+            state[i] = 0
+        return savings, regular, tuple(state)
+
+    def _tick(self):
+        self._nodes += 1
+        if self._nodes > self._node_budget:
+            raise _BudgetExhausted()
+        if self._deadline is not None and self._nodes % _CLOCK_CHECK_INTERVAL == 0:
+            if time.perf_counter() > self._deadline:
+                raise _BudgetExhausted()
+
+
+def _first(item):
+    return item[0]
+
+
+def _components(products, consumers):
+    # Union-find over the products a consumer touches; products in no bundle stay on their own.
+    parent = {product: product for product in products}
+
+    def find(product):
+        while parent[product] is not product:
+            parent[product] = parent[parent[product]]
+            product = parent[product]
+        return product
+
+    for consumer in consumers:
+        root = find(consumer.products[0])
+        for product in consumer.products[1:]:
+            other = find(product)
+            if other is not root:
+                parent[other] = root
+
+    groups = {}
+    for product in products:
+        groups.setdefault(find(product), ([], []))[0].append(product)
+    for consumer in consumers:
+        groups[find(consumer.products[0])][1].append(consumer)
+    return list(groups.values())
@@ -3,13 +3,29 @@ from __future__ import annotations
 from dataclasses import dataclass
 from decimal import Decimal
 
+from fixed_point import (
+    PERCENT_SCALE,
+    PRICE_SCALE,
+    PRICE_TO_AMOUNT,
+    QUANTITY_SCALE,
+    FixedDiscount,
+    line_total,
+    to_fixed,
+)
 from model_objects import Discount, SpecialOfferType
 
 
 class DiscountStrategy:
+    # Scale of the integer argument passed to calculate_fixed (None when the offer takes no argument).
+    argument_scale = None
+
     def calculate(self, offer, product, quantity, unit_price):
         raise NotImplementedError
 
+    def calculate_fixed(self, offer, product, quantity, unit_price, argument):
+        """Integer counterpart of calculate(); returns a FixedDiscount or None."""
+        raise NotImplementedError
+
 
 class ThreeForTwoStrategy(DiscountStrategy):
     def calculate(self, offer, product, quantity, unit_price):
@@ -24,17 +40,33 @@ class ThreeForTwoStrategy(DiscountStrategy):
         )
         return Discount(product, "3 for 2", -discount_amount)
 
+    def calculate_fixed(self, offer, product, quantity, unit_price, argument):
+        quantity_as_int = quantity // QUANTITY_SCALE
+        if quantity_as_int <= 2:
+            return None
+
+        trios = quantity_as_int // 3
+        paid = (trios * 2 + quantity_as_int % 3) * unit_price * PRICE_TO_AMOUNT
+        return FixedDiscount(product, "3 for 2", -(line_total(quantity, unit_price) - paid))
+
 
 class PercentDiscountStrategy(DiscountStrategy):
+    argument_scale = PERCENT_SCALE
+
     def calculate(self, offer, product, quantity, unit_price):
         quantity_dec = Decimal(str(quantity))
         percent = Decimal(str(offer.argument))
         return Discount(product, f"{percent}% off", -(quantity_dec * unit_price * percent / Decimal("100")))
 
+    def calculate_fixed(self, offer, product, quantity, unit_price, argument):
+        # quantity * unit_price * argument already sits at AMOUNT_SCALE, the "/ 100" included.
+        return FixedDiscount(product, f"{offer.argument}% off", -(quantity * unit_price * argument))
+
 
 @dataclass(frozen=True)
 class NForAmountStrategy(DiscountStrategy):
     group_size: int
+    argument_scale = PRICE_SCALE
 
     def calculate(self, offer, product, quantity, unit_price):
         quantity_dec = Decimal(str(quantity))
@@ -49,6 +81,18 @@ class NForAmountStrategy(DiscountStrategy):
         discount_amount = (unit_price * quantity_dec) - total
         return Discount(product, f"{self.group_size} for {offer_amount_dec}", -discount_amount)
 
+    def calculate_fixed(self, offer, product, quantity, unit_price, argument):
+        quantity_as_int = quantity // QUANTITY_SCALE
+        if quantity_as_int < self.group_size:
+            return None
+
+        groups_total, remainder = divmod(argument * PRICE_TO_AMOUNT * quantity_as_int, self.group_size)
+        if remainder:
+            raise ValueError(f"{self.group_size} for {offer.argument} cannot be split exactly in fixed point")
+        total = groups_total + (quantity_as_int % self.group_size) * unit_price * PRICE_TO_AMOUNT
+        discount_amount = line_total(quantity, unit_price) - total
+        return FixedDiscount(product, f"{self.group_size} for {offer.argument}", -discount_amount)
+
 
 class BundleStrategy:
     def count_complete_bundles(self, bundle_offer, quantities):
@@ -63,11 +107,11 @@ class BundleStrategy:
     def consume_bundle_quantities(self, bundle_offer, bundle_count, quantities):
         for product, required_qty in bundle_offer.items_required.items():
             if product in quantities:
-                quantities[product] -= required_qty * Decimal(bundle_count)
+                quantities[product] -= required_qty * bundle_count
                 if quantities[product] <= 0:
                     quantities.pop(product)
 
-    def best_bundle_discount(self, bundle_offer, bundle_count, quantities, offers, catalog, offer_calculator):
+    def bundle_discount(self, bundle_offer, bundle_count, catalog):
         bundle_total = Decimal("0")
         for product, required_qty in bundle_offer.items_required.items():
             unit_price = catalog.unit_price(product)
@@ -76,6 +120,13 @@ class BundleStrategy:
         bundle_discount_amount = bundle_total * bundle_offer.discount_percent / Decimal("100")
         bundle_discount_amount *= Decimal(bundle_count)
 
+        description = f"bundle {bundle_offer.discount_percent}% off"
+        first_product = next(iter(bundle_offer.items_required.keys()))
+        return Discount(first_product, description, -bundle_discount_amount)
+
+    def best_bundle_discount(self, bundle_offer, bundle_count, quantities, offers, catalog, offer_calculator):
+        bundle_discount = self.bundle_discount(bundle_offer, bundle_count, catalog)
+
         alternative_discount = Decimal("0")
         for product, _required_qty in bundle_offer.items_required.items():
             offer = offers.get(product)
@@ -87,15 +138,40 @@ class BundleStrategy:
             if alt:
                 alternative_discount += alt.amount
 
-        if bundle_discount_amount >= abs(alternative_discount):
-            description = f"bundle {bundle_offer.discount_percent}% off"
-            first_product = next(iter(bundle_offer.items_required.keys()))
-            return Discount(first_product, description, -bundle_discount_amount), True
+        if -bundle_discount.amount >= abs(alternative_discount):
+            return bundle_discount, True
+        return None, False
+
+    def bundle_discount_fixed(self, fixed_bundle, bundle_count, pricing_table):
+        bundle_total = 0
+        for product, required_qty in fixed_bundle.items_required.items():
+            bundle_total += pricing_table.fixed_entry(product).unit_price * required_qty
+        bundle_discount_amount = bundle_total * fixed_bundle.discount_percent * bundle_count
+
+        description = f"bundle {fixed_bundle.source.discount_percent}% off"
+        first_product = next(iter(fixed_bundle.items_required.keys()))
+        return FixedDiscount(first_product, description, -bundle_discount_amount)
+
+    def best_bundle_discount_fixed(self, fixed_bundle, bundle_count, quantities, pricing_table):
+        bundle_discount = self.bundle_discount_fixed(fixed_bundle, bundle_count, pricing_table)
+
+        alternative_discount = 0
+        for product in fixed_bundle.items_required:
+            entry = pricing_table.fixed_entry(product)
+            if entry.strategy is None:
+                continue
+            available_qty = quantities.get(product, 0)
+            alt = entry.strategy.calculate_fixed(entry.offer, product, available_qty, entry.unit_price, entry.argument)
+            if alt:
+                alternative_discount += alt.amount
+
+        if -bundle_discount.amount >= abs(alternative_discount):
+            return bundle_discount, True
         return None, False
 
 
 class CouponStrategy:
-    def compute_discount(self, coupon, quantities, catalog, checkout_date):
+    def compute_discount(self, coupon, quantities, catalog, checkout_date, max_discounted_qty=None):
         if not coupon or not coupon.is_valid_on(checkout_date):
             return None
 
@@ -106,6 +182,8 @@ class CouponStrategy:
 
         unit_price = catalog.unit_price(product)
         discounted_qty = min(available - coupon.required_qty, coupon.discounted_qty)
+        if max_discounted_qty is not None:
+            discounted_qty = min(discounted_qty, max_discounted_qty)
         if discounted_qty <= 0:
             return None
 
@@ -113,3 +191,25 @@ class CouponStrategy:
         description = f"{coupon.description} {coupon.discount_percent}% off"
         consumed = {product: coupon.required_qty + discounted_qty}
         return Discount(product, description, -discount_amount), consumed
+
+    def compute_discount_fixed(self, coupon, quantities, pricing_table, checkout_date, max_discounted_qty=None):
+        if not coupon or not coupon.is_valid_on(checkout_date):
+            return None
+
+        product = coupon.product
+        required_qty = to_fixed(coupon.required_qty, QUANTITY_SCALE)
+        available = quantities.get(product, 0)
+        if available <= required_qty:
+            return None
+
+        unit_price = pricing_table.fixed_entry(product).unit_price
+        discounted_qty = min(available - required_qty, to_fixed(coupon.discounted_qty, QUANTITY_SCALE))
+        if max_discounted_qty is not None:
+            discounted_qty = min(discounted_qty, max_discounted_qty)
+        if discounted_qty <= 0:
+            return None
+
+        discount_amount = unit_price * discounted_qty * to_fixed(coupon.discount_percent, PERCENT_SCALE)
+        description = f"{coupon.description} {coupon.discount_percent}% off"
+        consumed = {product: required_qty + discounted_qty}
+        return FixedDiscount(product, description, -discount_amount), consumed
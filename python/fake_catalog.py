@@ -1,17 +1,67 @@
+from collections.abc import Mapping
 from decimal import Decimal
 
 from catalog import SupermarketCatalog
+from product_registry import ProductRegistry
 
 
 class FakeCatalog(SupermarketCatalog):
-    def __init__(self):
+    def __init__(self, registry=None):
+        # A catalog gets its own registry, so its price list is sized by its own products; pass one to share it.
+        self.registry = registry if registry is not None else ProductRegistry()
         self.products = {}
-        self.prices = {}
+        # Prices indexed by the registry's product id.
+        self._prices = []
 
     def add_product(self, product, price):
+        product = self.registry.intern(product)
         self.products[product.name] = product
-        self.prices[product.name] = Decimal(str(price))
+        product_id = self.registry.id_of(product)
+        if product_id >= len(self._prices):
+            self._prices.extend([None] * (product_id + 1 - len(self._prices)))
+        self._prices[product_id] = Decimal(str(price))
+        self.version += 1
+
+    def add_products(self, products_and_prices):
+        # Bulk insert: intern the whole batch, then grow the price list once.
+        registry = self.registry
+        entries = []
+        for product, price in products_and_prices:
+            product = registry.intern(product)
+            self.products[product.name] = product
+            entries.append((registry.id_of(product), price))
+        if not entries:
+            return
+        size = max(product_id for product_id, _ in entries) + 1
+        if size > len(self._prices):
+            self._prices.extend([None] * (size - len(self._prices)))
+        prices = self._prices
+        for product_id, price in entries:
+            prices[product_id] = price if isinstance(price, Decimal) else Decimal(str(price))
+        self.version += 1
+
+    @property
+    def prices(self):
+        """Read-only view of the prices by product name."""
+        return _PricesByName(self)
 
     def unit_price(self, product):
-        return self.prices[product.name]
+        product_id = self.registry.id_of(product)
+        price = self._prices[product_id] if product_id < len(self._prices) else None
+        if price is None:
+            raise KeyError(product.name)
+        return price
+
+
+class _PricesByName(Mapping):
+    def __init__(self, catalog):
+        self._catalog = catalog
+
+    def __getitem__(self, name):
+        return self._catalog.unit_price(self._catalog.products[name])
+
+    def __iter__(self):
+        return iter(self._catalog.products)
 
+    def __len__(self):
+        return len(self._catalog.products)
@@ -0,0 +1,56 @@
+from decimal import Decimal
+from typing import NamedTuple
+
+from model_objects import Discount
+
+# Prices are held in cents, quantities in milli-units (grams for products sold by the kilo)
+# and percentages in hundredths of a percent.
+PRICE_SCALE = 100
+QUANTITY_SCALE = 1000
+PERCENT_SCALE = 100
+
+# Computed amounts (line totals, discounts) are held at a finer scale on which
+# price * quantity * percent / 100 is still an integer, so no rounding ever happens
+# before the receipt is printed and results match the Decimal engine exactly.
+AMOUNT_SCALE = PRICE_SCALE * QUANTITY_SCALE * PERCENT_SCALE * 100
+PRICE_TO_AMOUNT = AMOUNT_SCALE // PRICE_SCALE
+LINE_TO_AMOUNT = AMOUNT_SCALE // (PRICE_SCALE * QUANTITY_SCALE)
+
+
+class FixedBundleOffer(NamedTuple):
+    source: object
+    items_required: dict
+    discount_percent: int
+
+
+class FixedDiscount(NamedTuple):
+    product: object
+    description: str
+    amount: int
+
+    def to_discount(self):
+        return Discount(self.product, self.description, from_fixed(self.amount, AMOUNT_SCALE))
+
+
+def to_fixed(value, scale):
+    if isinstance(value, int):
+        return value * scale
+    value_dec = value if isinstance(value, Decimal) else Decimal(str(value))
+    scaled = value_dec * scale
+    units = int(scaled)
+    if units != scaled:
+        raise ValueError(f"{value} cannot be represented exactly at scale 1/{scale}")
+    return units
+
+
+def from_fixed(units, scale):
+    return Decimal(units) / scale
+
+
+def line_total(quantity, unit_price):
+    return quantity * unit_price * LINE_TO_AMOUNT
+
+
+def fixed_bundle_offer(bundle_offer):
+    items_required = {product: to_fixed(qty, QUANTITY_SCALE) for product, qty in bundle_offer.items_required.items()}
+    return FixedBundleOffer(bundle_offer, items_required, to_fixed(bundle_offer.discount_percent, PERCENT_SCALE))
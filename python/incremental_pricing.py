@@ -0,0 +1,143 @@
+from datetime import date
+
+
+class IncrementalPricing:
+    """Running totals for a cart, re-planning only the scanned product's component on each scan."""
+
+    def __init__(self, cart, offer_calculator, teller, checkout_date=None):
+        self._cart = cart
+        self._offer_calculator = offer_calculator
+        self._teller = teller
+        self._checkout_date = checkout_date or date.today()
+        self._snapshot = None
+        self._pricing_table = None
+        self._catalog_version = None
+        self._component_cache = {}
+        self._subtotal = 0
+        self._savings = 0
+        # product -> component root, root -> its products, root -> (savings or None, cache keys).
+        self._root = {}
+        self._members = {}
+        self._results = {}
+        self._position = {}
+        self._exhausted = set()
+        self._refresh()
+
+    @property
+    def running_subtotal(self):
+        return self._offer_calculator.to_money(self._subtotal)
+
+    @property
+    def running_savings(self):
+        return self._offer_calculator.to_money(self._savings_total())
+
+    @property
+    def running_total(self):
+        return self._offer_calculator.to_money(self._subtotal - self._savings_total())
+
+    def scan(self, product, quantity):
+        # The cart has already recorded the scan; a refresh re-prices every line including it.
+        if self._refresh():
+            return
+        self._subtotal += self._offer_calculator.line_total(self._pricing_table, product, quantity)
+        root = self._root.get(product)
+        if root is None:
+            root = self._add_product(product)
+        self._solve(root)
+
+    def component_cache_for(self, pricing_table):
+        if pricing_table is not self._pricing_table:
+            return {}
+        return self._component_cache
+
+    def _refresh(self):
+        snapshot = self._teller.promotions_on(self._checkout_date)
+        catalog_version = self._teller.catalog.version
+        if snapshot is self._snapshot and catalog_version == self._catalog_version:
+            return False
+        self._snapshot = snapshot
+        self._pricing_table = snapshot.pricing_table
+        self._catalog_version = catalog_version
+        self._component_cache = {}
+        self._subtotal = 0
+        for pq in self._cart.items:
+            self._subtotal += self._offer_calculator.line_total(self._pricing_table, pq.product, pq.quantity)
+        self._savings = 0
+        self._root, self._members, self._results, self._position = {}, {}, {}, {}
+        self._exhausted = set()
+        for product in self._cart.product_quantities:
+            self._add_product(product)
+        for root in list(self._members):
+            self._solve(root)
+        return True
+
+    def _add_product(self, product):
+        self._position[product] = len(self._position)
+        self._root[product] = product
+        self._members[product] = [product]
+        root = product
+        # Only bundles using this product can have just become complete (among the products added so far).
+        for bundle_offer in self._snapshot.bundle_offers_for((product,), self._position):
+            for other in bundle_offer.items_required:
+                root = self._union(root, self._root[other])
+        return root
+
+    def _union(self, root, other):
+        if root is other:
+            return root
+        if len(self._members[root]) < len(self._members[other]):
+            root, other = other, root
+        self._forget(other)
+        for product in self._members[other]:
+            self._root[product] = root
+        self._members[root].extend(self._members.pop(other))
+        return root
+
+    def _forget(self, root):
+        savings, cache_keys = self._results.pop(root, (0, ()))
+        for key in cache_keys:
+            self._component_cache.pop(key, None)
+        if savings is None:
+            self._exhausted.discard(root)
+        else:
+            self._savings -= savings
+
+    def _solve(self, root):
+        self._forget(root)
+        teller = self._teller
+        quantities = self._cart.product_quantities
+        # Cart order, consumers in the order a full checkout passes them: the cache keys then match its own.
+        products = sorted(self._members[root], key=self._position.__getitem__)
+        solved = {}
+        plan = teller.plan_optimizer.solve(
+            {product: quantities[product] for product in products},
+            self._snapshot.bundle_offers_for(products, quantities),
+            self._snapshot.coupons_for(products),
+            self._pricing_table,
+            self._checkout_date,
+            self._offer_calculator,
+            solved,
+        )
+        self._component_cache.update(solved)
+        if plan is None:
+            self._results[root] = (None, tuple(solved))
+            self._exhausted.add(root)
+        else:
+            self._results[root] = (plan.savings, tuple(solved))
+            self._savings += plan.savings
+
+    def _savings_total(self):
+        if not self._exhausted:
+            return self._savings
+        teller = self._teller
+        quantities = self._cart.product_quantities
+        plan = self._cart._plan_discounts(
+            self._snapshot.offers,
+            self._snapshot.bundle_offers_for(quantities),
+            self._snapshot.coupons,
+            self._pricing_table,
+            self._checkout_date,
+            teller.plan_optimizer,
+            self._component_cache,
+        )
+        return plan.savings
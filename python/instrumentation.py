@@ -0,0 +1,93 @@
+import copy
+import json
+import time
+from contextlib import contextmanager, nullcontext
+
+_DISABLED = nullcontext()
+
+
+class Instrumentation:
+    """Per-phase durations and counters; each top-level operation becomes one record for the sinks."""
+
+    def __init__(self, *sinks, clock=time.perf_counter):
+        self.sinks = list(sinks)
+        self._clock = clock
+        self._depth = 0
+        self._phases = {}
+        self._counters = {}
+
+    @contextmanager
+    def operation(self, event):
+        self._depth += 1
+        started = self._clock()
+        try:
+            yield self
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                record = {
+                    "event": event,
+                    "timestamp": time.time(),
+                    "duration_s": self._clock() - started,
+                    "phases": self._phases,
+                    "counters": self._counters,
+                }
+                self._phases = {}
+                self._counters = {}
+                for sink in self.sinks:
+                    sink(record)
+
+    @contextmanager
+    def phase(self, name):
+        started = self._clock()
+        try:
+            yield
+        finally:
+            self._phases[name] = self._phases.get(name, 0.0) + (self._clock() - started)
+
+    def count(self, name, amount=1):
+        self._counters[name] = self._counters.get(name, 0) + amount
+
+
+def operation(instrumentation, event):
+    return _DISABLED if instrumentation is None else instrumentation.operation(event)
+
+
+def phase(instrumentation, name):
+    return _DISABLED if instrumentation is None else instrumentation.phase(name)
+
+
+class MetricsRegistry:
+    """In-process sink aggregating records per event."""
+
+    def __init__(self):
+        self._events = {}
+
+    def record(self, record):
+        event = self._events.setdefault(record["event"], {"count": 0, "duration_s": 0.0, "phases": {}, "counters": {}})
+        event["count"] += 1
+        event["duration_s"] += record["duration_s"]
+        for name, seconds in record["phases"].items():
+            totals = event["phases"].setdefault(name, {"total_s": 0.0, "max_s": 0.0, "count": 0})
+            totals["total_s"] += seconds
+            totals["max_s"] = max(totals["max_s"], seconds)
+            totals["count"] += 1
+        for name, value in record["counters"].items():
+            event["counters"][name] = event["counters"].get(name, 0) + value
+
+    def snapshot(self):
+        return copy.deepcopy(self._events)
+
+    def reset(self):
+        self._events = {}
+
+
+class JsonLinesSink:
+    """Appends each record as one JSON line. The file is opened per record, so the sink can be pickled."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __call__(self, record):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, sort_keys=True) + "\n")
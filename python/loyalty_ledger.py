@@ -0,0 +1,267 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+from model_objects import LoyaltyAccount
+
+LOG_NAME = "ledger.log"
+SNAPSHOT_NAME = "ledger.snapshot.json"
+
+
+class LoyaltyEvent(NamedTuple):
+    seq: int
+    account_id: str
+    kind: str
+    points: int
+    timestamp: float
+
+
+class LoyaltyLedger:
+    """Loyalty balances per account id, kept as a group-committed append-only event log."""
+
+    def __init__(self, directory, durable=True, commit_interval=0.005, snapshot_every=100_000, keep_history=False):
+        if snapshot_every < 1:
+            raise ValueError("snapshot_every must be >= 1")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.durable = durable
+        self.snapshot_every = snapshot_every
+        self.keep_history = keep_history
+        # Lock order: _io_lock (log file writes and swaps) before _lock (balances and buffer).
+        self._io_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._committed = threading.Condition(threading.Lock())
+        self._balances = {}
+        self._buffer = []
+        self._seq = 0
+        self._durable_seq = 0
+        self._log_start = 1
+        self._committing = False
+        self._closed = False
+        self._load()
+        self._log = open(self.directory / LOG_NAME, "ab")
+        self._flusher = None
+        if not durable:
+            self._stop = threading.Event()
+            self._flusher = threading.Thread(
+                target=self._flush_periodically, args=(commit_interval,), name="loyalty-ledger", daemon=True
+            )
+            self._flusher.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def balance(self, account_id):
+        return self._balances.get(account_id, 0)
+
+    def account(self, account_id):
+        return LedgerAccount(self, account_id)
+
+    def earn(self, account_id, points):
+        return self._record(account_id, "earn", points)
+
+    def redeem(self, account_id, points):
+        """Debits exactly points, or raises ValueError("insufficient points") without recording anything."""
+        return self._record(account_id, "redeem", points)
+
+    def redeem_up_to(self, account_id, points):
+        """Debits as many of points as the balance covers and returns that amount."""
+        return self._record(account_id, "redeem", points, partial=True)
+
+    def flush(self):
+        """Commits every event recorded so far."""
+        self._wait_durable(self._seq)
+
+    def snapshot(self):
+        """Writes the balances to the snapshot file and starts an empty log."""
+        with self._io_lock, self._lock:
+            self._write_snapshot()
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        if self._flusher:
+            self._stop.set()
+            self._flusher.join()
+        self.flush()
+        with self._io_lock:
+            self._log.close()
+
+    def _record(self, account_id, kind, points, partial=False):
+        points = int(points)
+        if points < 0:
+            raise ValueError("points must be >= 0")
+        with self._lock:
+            if self._closed:
+                raise ValueError("the ledger is closed")
+            balance = self._balances.get(account_id, 0)
+            if kind == "redeem":
+                if partial:
+                    points = min(points, balance)
+                elif points > balance:
+                    raise ValueError("insufficient points")
+                balance -= points
+            else:
+                balance += points
+            if not points:
+                return 0
+            self._balances[account_id] = balance
+            self._seq += 1
+            seq = self._seq
+            self._buffer.append(_encode(LoyaltyEvent(seq, account_id, kind, points, time.time())))
+            compact = seq - self._log_start + 1 >= self.snapshot_every
+        if compact:
+            with self._io_lock, self._lock:
+                if self._seq - self._log_start + 1 >= self.snapshot_every:
+                    self._write_snapshot()
+        if self.durable:
+            self._wait_durable(seq)
+        return points
+
+    def _wait_durable(self, seq):
+        # Group commit: one caller at a time writes and syncs everything buffered, the others wait for it.
+        with self._committed:
+            while self._durable_seq < seq:
+                if self._committing:
+                    self._committed.wait()
+                    continue
+                self._committing = True
+                self._committed.release()
+                try:
+                    committed = self._commit_buffer()
+                finally:
+                    self._committed.acquire()
+                    self._committing = False
+                    self._committed.notify_all()
+                self._durable_seq = max(self._durable_seq, committed)
+
+    def _commit_buffer(self):
+        with self._io_lock:
+            with self._lock:
+                lines, self._buffer = self._buffer, []
+                upto = self._seq
+            if lines:
+                self._log.write(b"".join(lines))
+                self._log.flush()
+                os.fsync(self._log.fileno())
+        return upto
+
+    def _write_snapshot(self):
+        # Called under both locks: nothing can be recorded or committed until the new log is in place.
+        if self._buffer:
+            self._log.write(b"".join(self._buffer))
+            self._buffer = []
+        self._log.flush()
+        os.fsync(self._log.fileno())
+        document = {"seq": self._seq, "balances": self._balances}
+        _write_atomically(self.directory / SNAPSHOT_NAME, json.dumps(document).encode("utf-8"))
+        self._log.close()
+        log_path = self.directory / LOG_NAME
+        if self.keep_history and self._seq >= self._log_start:
+            os.replace(log_path, self.directory / f"ledger.{self._log_start}-{self._seq}.log")
+        self._log = open(log_path, "wb")
+        _sync_directory(self.directory)
+        self._log_start = self._seq + 1
+        with self._committed:
+            self._durable_seq = max(self._durable_seq, self._seq)
+            self._committed.notify_all()
+
+    def _load(self):
+        snapshot_path = self.directory / SNAPSHOT_NAME
+        if snapshot_path.exists():
+            document = json.loads(snapshot_path.read_text(encoding="utf-8"))
+            self._seq = document["seq"]
+            self._balances = {account_id: int(points) for account_id, points in document["balances"].items()}
+        snapshot_seq = self._seq
+        log_path = self.directory / LOG_NAME
+        if log_path.exists():
+            valid_length = 0
+            with open(log_path, "rb") as f:
+                for line in f:
+                    event = _decode(line)
+                    if event is None:
+                        break
+                    valid_length += len(line)
+                    # Events up to the snapshot are already in it (a crash may have come before the log was emptied).
+                    if event.seq > snapshot_seq:
+                        change = event.points if event.kind == "earn" else -event.points
+                        self._balances[event.account_id] = self._balances.get(event.account_id, 0) + change
+                        self._seq = max(self._seq, event.seq)
+            if valid_length < log_path.stat().st_size:
+                os.truncate(log_path, valid_length)
+        self._durable_seq = self._seq
+        self._log_start = snapshot_seq + 1
+
+    def _flush_periodically(self, interval):
+        while not self._stop.wait(interval):
+            self.flush()
+
+
+class LedgerAccount:
+    """A ledger account behind the LoyaltyAccount interface; pickles as a plain LoyaltyAccount."""
+
+    __slots__ = ("ledger", "account_id")
+
+    def __init__(self, ledger, account_id):
+        self.ledger = ledger
+        self.account_id = account_id
+
+    @property
+    def points(self):
+        return self.ledger.balance(self.account_id)
+
+    def earn(self, points):
+        return self.ledger.earn(self.account_id, points)
+
+    def redeem(self, points):
+        return self.ledger.redeem(self.account_id, points)
+
+    def redeem_up_to(self, points):
+        return self.ledger.redeem_up_to(self.account_id, points)
+
+    def __reduce__(self):
+        return LoyaltyAccount, (self.points,)
+
+
+def _encode(event):
+    return (json.dumps(event._asdict(), separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def _decode(line):
+    if not line.endswith(b"\n"):
+        return None
+    try:
+        return LoyaltyEvent(**json.loads(line))
+    except (ValueError, TypeError):
+        return None
+
+
+def _write_atomically(path, data):
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _sync_directory(directory):
+    # Makes renames durable; not possible on every platform (e.g. Windows).
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
@@ -0,0 +1,56 @@
+from collections import OrderedDict
+from typing import NamedTuple
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+
+
+class LruCache:
+    """Bounded LRU mapping with hit, miss and eviction counters; not thread-safe."""
+
+    __slots__ = ("max_size", "_entries", "_hits", "_misses", "_evictions")
+
+    def __init__(self, max_size):
+        if max_size < 0:
+            raise ValueError("max_size must be >= 0")
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        entries = self._entries
+        if key in entries:
+            entries.move_to_end(key)
+            self._hits += 1
+            return entries[key]
+        self._misses += 1
+        return default
+
+    def put(self, key, value):
+        if self.max_size == 0:
+            return
+        entries = self._entries
+        entries[key] = value
+        entries.move_to_end(key)
+        if len(entries) > self.max_size:
+            entries.popitem(last=False)
+            self._evictions += 1
+
+    def pop(self, key):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    @property
+    def stats(self):
+        return CacheStats(self._hits, self._misses, self._evictions, len(self._entries))
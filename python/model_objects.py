@@ -3,18 +3,40 @@ from enum import Enum
 
 
 class Product:
+    # Immutable so the hash can be computed once; products are dict keys on every pricing path.
+    # product_id is the dense id given by the ProductRegistry that first interned the product.
+    __slots__ = ("name", "unit", "product_id", "_hash")
+
     def __init__(self, name, unit):
-        self.name = name
-        self.unit = unit
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "unit", unit)
+        object.__setattr__(self, "product_id", None)
+        object.__setattr__(self, "_hash", hash((name, unit)))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        return Product, (self.name, self.unit)
+
+    def _assign_id(self, product_id):
+        object.__setattr__(self, "product_id", product_id)
 
     def __eq__(self, other):
-        return isinstance(other, Product) and self.name == other.name and self.unit == other.unit
+        return self is other or (
+            isinstance(other, Product) and self.name == other.name and self.unit == other.unit
+        )
 
     def __hash__(self):
-        return hash((self.name, self.unit))
+        return self._hash
 
 
 class ProductQuantity:
+    __slots__ = ("product", "quantity")
+
     def __init__(self, product, quantity):
         self.product = product
         self.quantity = quantity
@@ -25,6 +47,11 @@ class ProductUnit(Enum):
     KILO = 2
 
 
+class PricingMode(Enum):
+    DECIMAL = 1
+    FIXED_POINT = 2
+
+
 class SpecialOfferType(Enum):
     THREE_FOR_TWO = 1
     TEN_PERCENT_DISCOUNT = 2
@@ -34,17 +61,27 @@ class SpecialOfferType(Enum):
     COUPON = 6
 
 class Offer:
-    def __init__(self, offer_type, product, argument):
+    # valid_from/valid_to bound the days the offer applies (inclusive); None leaves that side open.
+    __slots__ = ("offer_type", "product", "argument", "valid_from", "valid_to")
+
+    def __init__(self, offer_type, product, argument, valid_from=None, valid_to=None):
         self.offer_type = offer_type
         self.product = product
         self.argument = argument
+        self.valid_from = valid_from
+        self.valid_to = valid_to
+
+    def is_active_on(self, date):
+        return _within(date, self.valid_from, self.valid_to)
 
 
 class Discount:
+    __slots__ = ("product", "description", "amount")
+
     def __init__(self, product, description, discount_amount):
         self.product = product
         self.description = description
-        self.amount = Decimal(str(discount_amount))
+        self.amount = discount_amount if isinstance(discount_amount, Decimal) else Decimal(str(discount_amount))
 
     @property
     def discount_amount(self):
@@ -52,9 +89,14 @@ class Discount:
 
 
 class BundleOffer:
-    def __init__(self, items_required, discount_percent=10):
+    def __init__(self, items_required, discount_percent=10, valid_from=None, valid_to=None):
         self.items_required = {product: Decimal(str(qty)) for product, qty in items_required.items()}
         self.discount_percent = Decimal(str(discount_percent))
+        self.valid_from = valid_from
+        self.valid_to = valid_to
+
+    def is_active_on(self, date):
+        return _within(date, self.valid_from, self.valid_to)
 
 
 class Coupon:
@@ -85,9 +127,17 @@ class LoyaltyAccount:
         self.points -= points
         return points
 
+    def redeem_up_to(self, points):
+        """Redeems as many of points as the balance covers; returns the points redeemed."""
+        return self.redeem(min(int(points), self.points))
+
     def earn(self, points):
         points = int(points)
         if points < 0:
             raise ValueError("points must be >= 0")
         self.points += points
         return points
+
+
+def _within(date, valid_from, valid_to):
+    return (valid_from is None or valid_from <= date) and (valid_to is None or date <= valid_to)
@@ -1,3 +1,4 @@
+import threading
 from decimal import Decimal
 
 from discount_strategies import (
@@ -7,10 +8,79 @@ from discount_strategies import (
     PercentDiscountStrategy,
     ThreeForTwoStrategy,
 )
-from model_objects import SpecialOfferType
+from fixed_point import (
+    AMOUNT_SCALE,
+    QUANTITY_SCALE,
+    FixedDiscount,
+    fixed_bundle_offer,
+    from_fixed,
+    line_total,
+    to_fixed,
+)
+from lru_cache import LruCache
+from model_objects import Discount, SpecialOfferType
+
+DEFAULT_MEMO_SIZE = 8192
+
+_MISSING = object()
+_FIXED = object()
+
+
+class StrategyMemo:
+    """Bounded LRU of regular-offer results shared by every cart; each lookup returns a new discount."""
+
+    def __init__(self, max_size=DEFAULT_MEMO_SIZE):
+        self._cache = LruCache(max_size)
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def discount(self, strategy, offer, product, quantity, unit_price):
+        key = (type(strategy), offer.offer_type, offer.argument, str(offer.argument), quantity, unit_price)
+        result = self._lookup(key, lambda: strategy.calculate(offer, product, quantity, unit_price))
+        return None if result is None else Discount(product, *result)
+
+    def fixed_discount(self, strategy, offer, product, quantity, unit_price, argument):
+        # Integer quantities and prices could equal Decimal ones, hence the marker.
+        key = (_FIXED, type(strategy), offer.offer_type, argument, str(offer.argument), quantity, unit_price)
+        result = self._lookup(key, lambda: strategy.calculate_fixed(offer, product, quantity, unit_price, argument))
+        return None if result is None else FixedDiscount(product, *result)
+
+    def _lookup(self, key, calculate):
+        # Entries are (description, amount) tuples, never the Discount a receipt gets to keep.
+        with self._lock:
+            result = self._cache.get(key, _MISSING)
+        if result is _MISSING:
+            discount = calculate()
+            result = None if discount is None else (discount.description, discount.amount)
+            with self._lock:
+                self._cache.put(key, result)
+        return result
+
+    @property
+    def stats(self):
+        with self._lock:
+            return self._cache.stats
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
 
 
 class OfferCalculator:
+    # One whole unit in this calculator's quantity representation.
+    unit_quantity = Decimal("1")
+    # Set by the cart while it is instrumented (see instrumentation.py).
+    instrumentation = None
+    # Set by the cart to its pricing table's StrategyMemo while it is priced.
+    memo = None
 
     def __init__(self):
         self._regular_strategies = {
@@ -22,18 +92,52 @@ class OfferCalculator:
         self._bundle_strategy = BundleStrategy()
         self._coupon_strategy = CouponStrategy()
 
+    def strategy_for(self, offer_type):
+        return self._regular_strategies.get(offer_type)
+
     def calculate_discount(self, offer, product, quantity, unit_price):
-        strategy = self._regular_strategies.get(offer.offer_type)
+        strategy = self.strategy_for(offer.offer_type)
         if not strategy:
             return None
+        if self.instrumentation:
+            _count_strategy_call(self.instrumentation, offer)
+        if self.memo is not None:
+            return self.memo.discount(strategy, offer, product, quantity, unit_price)
         return strategy.calculate(offer, product, quantity, unit_price)
 
+    def regular_discount(self, pricing_table, product, quantity):
+        entry = pricing_table.entry(product)
+        if entry.strategy is None:
+            return None
+        if self.instrumentation:
+            _count_strategy_call(self.instrumentation, entry.offer)
+        if self.memo is not None:
+            return self.memo.discount(entry.strategy, entry.offer, product, quantity, entry.unit_price)
+        return entry.strategy.calculate(entry.offer, product, quantity, entry.unit_price)
+
+    def to_receipt_discount(self, discount):
+        return discount
+
+    def line_total(self, pricing_table, product, quantity):
+        return pricing_table.unit_price(product) * quantity
+
+    def to_money(self, amount):
+        return amount
+
     def calculate_discount_for_quantity(self, offer, product, quantity, unit_price):
         return self.calculate_discount(offer, product, quantity, unit_price)
 
     def count_complete_bundles(self, bundle_offer, quantities):
+        if self.instrumentation:
+            self.instrumentation.count("bundles_evaluated")
         return self._bundle_strategy.count_complete_bundles(bundle_offer, quantities)
 
+    def bundle_discount(self, bundle_offer, bundle_count, catalog):
+        return self._bundle_strategy.bundle_discount(bundle_offer, bundle_count, catalog)
+
+    def bundle_consumption(self, bundle_offer, bundle_count):
+        return {product: qty * bundle_count for product, qty in bundle_offer.items_required.items()}
+
     def best_bundle_discount(self, bundle_offer, bundle_count, quantities, offers, catalog):
         return self._bundle_strategy.best_bundle_discount(bundle_offer, bundle_count, quantities, offers, catalog, self)
 
@@ -48,5 +152,85 @@ class OfferCalculator:
         coupon.redeemed = True
         return discount, consumed
 
-    def compute_coupon_discount(self, coupon, quantities, catalog, checkout_date):
-        return self._coupon_strategy.compute_discount(coupon, quantities, catalog, checkout_date)
+    def compute_coupon_discount(self, coupon, quantities, catalog, checkout_date, max_discounted_qty=None):
+        if self.instrumentation:
+            self.instrumentation.count("coupon_evaluations")
+        return self._coupon_strategy.compute_discount(coupon, quantities, catalog, checkout_date, max_discounted_qty)
+
+    def to_quantity(self, value):
+        return value
+
+
+class FixedPointOfferCalculator:
+    """OfferCalculator for PricingMode.FIXED_POINT carts."""
+    unit_quantity = QUANTITY_SCALE
+    instrumentation = None
+    memo = None
+
+    def __init__(self):
+        self._bundle_strategy = BundleStrategy()
+        self._coupon_strategy = CouponStrategy()
+        self._fixed_bundles = {}
+
+    def regular_discount(self, pricing_table, product, quantity):
+        entry = pricing_table.fixed_entry(product)
+        if entry.strategy is None:
+            return None
+        if self.instrumentation:
+            _count_strategy_call(self.instrumentation, entry.offer)
+        if self.memo is not None:
+            return self.memo.fixed_discount(
+                entry.strategy, entry.offer, product, quantity, entry.unit_price, entry.argument
+            )
+        return entry.strategy.calculate_fixed(entry.offer, product, quantity, entry.unit_price, entry.argument)
+
+    def to_receipt_discount(self, discount):
+        return discount.to_discount()
+
+    def line_total(self, pricing_table, product, quantity):
+        return line_total(quantity, pricing_table.fixed_entry(product).unit_price)
+
+    def to_money(self, amount):
+        return from_fixed(amount, AMOUNT_SCALE)
+
+    def count_complete_bundles(self, bundle_offer, quantities):
+        if self.instrumentation:
+            self.instrumentation.count("bundles_evaluated")
+        return self._bundle_strategy.count_complete_bundles(self._fixed_bundle(bundle_offer), quantities)
+
+    def bundle_discount(self, bundle_offer, bundle_count, pricing_table):
+        fixed_bundle = self._fixed_bundle(bundle_offer)
+        return self._bundle_strategy.bundle_discount_fixed(fixed_bundle, bundle_count, pricing_table)
+
+    def bundle_consumption(self, bundle_offer, bundle_count):
+        items_required = self._fixed_bundle(bundle_offer).items_required
+        return {product: qty * bundle_count for product, qty in items_required.items()}
+
+    def best_bundle_discount(self, bundle_offer, bundle_count, quantities, offers, pricing_table):
+        return self._bundle_strategy.best_bundle_discount_fixed(
+            self._fixed_bundle(bundle_offer), bundle_count, quantities, pricing_table
+        )
+
+    def consume_bundle_quantities(self, bundle_offer, bundle_count, quantities):
+        self._bundle_strategy.consume_bundle_quantities(self._fixed_bundle(bundle_offer), bundle_count, quantities)
+
+    def compute_coupon_discount(self, coupon, quantities, pricing_table, checkout_date, max_discounted_qty=None):
+        if self.instrumentation:
+            self.instrumentation.count("coupon_evaluations")
+        return self._coupon_strategy.compute_discount_fixed(
+            coupon, quantities, pricing_table, checkout_date, max_discounted_qty
+        )
+
+    def to_quantity(self, value):
+        return to_fixed(value, QUANTITY_SCALE)
+
+    def _fixed_bundle(self, bundle_offer):
+        fixed = self._fixed_bundles.get(bundle_offer)
+        if fixed is None:
+            fixed = fixed_bundle_offer(bundle_offer)
+            self._fixed_bundles[bundle_offer] = fixed
+        return fixed
+
+
+def _count_strategy_call(instrumentation, offer):
+    instrumentation.count(f"strategy_calls.{offer.offer_type.name}")
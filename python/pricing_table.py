@@ -0,0 +1,94 @@
+from decimal import Decimal
+from typing import NamedTuple
+
+from fixed_point import PRICE_SCALE, to_fixed
+from model_objects import Offer
+
+# Price entries kept before the table starts over; the catalog's own cache, if any, stays the bounded one.
+DEFAULT_MAX_PRICES = 65_536
+
+
+class PricingEntry(NamedTuple):
+    unit_price: Decimal
+    offer: Offer
+    strategy: object
+    argument: object
+
+
+class PricingTable:
+    """Per-product prices and compiled regular offers; prices are refetched when catalog.version moves."""
+
+    def __init__(self, catalog, offers, offer_calculator, memo=None, max_prices=DEFAULT_MAX_PRICES):
+        self._catalog = catalog
+        self.memo = memo
+        self.max_prices = max_prices
+        # (catalog version, entries, fixed-point entries), swapped as one reference.
+        self._prices = (catalog.version, {}, {})
+        self._compiled_offers = {}
+        for product, offer in offers.items():
+            strategy = offer_calculator.strategy_for(offer.offer_type)
+            if strategy is None:
+                continue
+            compiled = Offer(offer.offer_type, product, _parse_argument(offer.argument))
+            self._compiled_offers[product] = (compiled, strategy)
+
+    def entry(self, product):
+        entries = self._current_prices()[1]
+        entry = entries.get(product)
+        if entry is None:
+            entry = self._new_entry(entries, product, self._catalog.unit_price(product))
+        return entry
+
+    def prefetch(self, products):
+        """Fetches the prices of the products not in the table yet with a single catalog.unit_prices() call."""
+        missing = self.missing(products)
+        if missing:
+            self.add_prices(self._catalog.unit_prices(missing))
+
+    def missing(self, products):
+        entries = self._current_prices()[1]
+        return [product for product in products if product not in entries]
+
+    def add_prices(self, prices):
+        """Adds entries for prices fetched elsewhere, e.g. from an async catalog; known products are kept."""
+        entries = self._current_prices()[1]
+        for product, unit_price in prices.items():
+            if product not in entries:
+                self._new_entry(entries, product, unit_price)
+
+    def fixed_entry(self, product):
+        fixed_entries = self._current_prices()[2]
+        entry = fixed_entries.get(product)
+        if entry is None:
+            unit_price, offer, strategy, argument = self.entry(product)
+            if strategy is not None and strategy.argument_scale:
+                argument = to_fixed(argument, strategy.argument_scale)
+            else:
+                argument = None
+            entry = PricingEntry(to_fixed(unit_price, PRICE_SCALE), offer, strategy, argument)
+            fixed_entries[product] = entry
+        return entry
+
+    def unit_price(self, product):
+        return self.entry(product).unit_price
+
+    def _current_prices(self):
+        prices = self._prices
+        version = self._catalog.version
+        if prices[0] != version or len(prices[1]) >= self.max_prices:
+            # A price fetched meanwhile for the old version lands in the old dicts, not in these.
+            prices = self._prices = (version, {}, {})
+        return prices
+
+    def _new_entry(self, entries, product, unit_price):
+        offer, strategy = self._compiled_offers.get(product, (None, None))
+        argument = offer.argument if offer else None
+        entry = PricingEntry(unit_price, offer, strategy, argument)
+        entries[product] = entry
+        return entry
+
+
+def _parse_argument(argument):
+    if argument is None or isinstance(argument, Decimal):
+        return argument
+    return Decimal(str(argument))
@@ -0,0 +1,29 @@
+class ProductRegistry:
+    """Interns products and numbers them densely in registration order."""
+
+    def __init__(self):
+        self._ids = {}
+        self._products = []
+
+    def __len__(self):
+        return len(self._products)
+
+    def intern(self, product):
+        product_id = self._ids.get(product)
+        if product_id is None:
+            product_id = len(self._products)
+            self._ids[product] = product_id
+            self._products.append(product)
+        if product.product_id is None:
+            product._assign_id(product_id)
+        return self._products[product_id]
+
+    def id_of(self, product):
+        product_id = product.product_id
+        if product_id is not None and product_id < len(self._products) and self._products[product_id] == product:
+            return product_id
+        return self._ids[product]
+
+    def product(self, product_id):
+        return self._products[product_id]
+
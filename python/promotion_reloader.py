@@ -0,0 +1,91 @@
+"""Hot reload of a data directory's offers, bundles and coupons into a running teller."""
+import os
+import threading
+from pathlib import Path
+
+from csv_loaders import read_bundle_offers, read_coupons, read_offers
+from teller import Teller
+
+PROMOTION_FILES = ("offers.csv", "bundles.csv", "coupons.csv")
+
+
+class PromotionReloader:
+    """Polls data_dir and swaps changed promotions into the teller; a failed load is kept in last_error."""
+
+    def __init__(self, teller, data_dir, interval=1.0, wallet=True):
+        if interval <= 0:
+            raise ValueError("interval must be > 0")
+        self.teller = teller
+        self.data_dir = Path(data_dir)
+        self.interval = interval
+        self.wallet = wallet
+        self.last_error = None
+        self._stamps = self._current_stamps()
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._poll, name="promotion-reloader", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def check(self):
+        """Reloads if a promotion file changed since the last load; returns the new promo_version or None."""
+        if self._current_stamps() == self._stamps:
+            return None
+        return self.reload()
+
+    def reload(self):
+        """Loads the promotion files and swaps them in; returns the new promo_version, or None if loading failed."""
+        with self._reload_lock:
+            # Stamp before parsing: a file changed while we read it is then read again on the next check.
+            self._stamps = self._current_stamps()
+            try:
+                offers, bundle_offers, coupons = self._load()
+            # KeyError: an unknown product or offer type, or a missing column; ArithmeticError: a malformed number.
+            except (OSError, ValueError, KeyError, ArithmeticError) as exc:
+                self.last_error = exc
+                return None
+            self.last_error = None
+            return self.teller.replace_promotions(offers, bundle_offers, coupons)
+
+    def _load(self):
+        catalog = self.teller.catalog
+        # A scratch teller collects the parsed offers and bundles, with read_offers' replacement rules.
+        staging = Teller(catalog, memo_size=0)
+        offers_file, bundles_file, coupons_file = (self.data_dir / name for name in PROMOTION_FILES)
+        read_offers(offers_file, staging, catalog)
+        read_bundle_offers(bundles_file, staging, catalog)
+        coupons = read_coupons(coupons_file, catalog) if self.wallet else None
+        return staging.all_offers, staging.bundle_offers, coupons
+
+    def _current_stamps(self):
+        names = PROMOTION_FILES if self.wallet else PROMOTION_FILES[:2]
+        return tuple(_stamp(self.data_dir / name) for name in names)
+
+    def _poll(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+
+def _stamp(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
@@ -0,0 +1,118 @@
+from bisect import bisect_right
+from datetime import date
+
+_OPEN_START = date.min.toordinal()
+_OPEN_END = date.max.toordinal()
+
+
+class PromotionSchedule:
+    """Promotions with optional validity intervals, indexed by date."""
+
+    def __init__(self, build=tuple):
+        self._build = build
+        self._entries = {}
+        self._next_key = 0
+        self._index = None
+        self._by_segment = {}
+        self._by_day = {}
+
+    def __getstate__(self):
+        # The built results are caches (holding pricing tables full of fetched prices); a copy rebuilds them.
+        state = self.__dict__.copy()
+        state["_index"] = None
+        state["_by_segment"] = {}
+        state["_by_day"] = {}
+        return state
+
+    def add(self, promotion, valid_from=None, valid_to=None, key=None):
+        """Registers a promotion; one added under an existing key replaces it and keeps its registration order."""
+        self.add_all([(promotion, valid_from, valid_to, key)])
+
+    def add_all(self, entries):
+        """Registers (promotion, valid_from, valid_to, key) entries; nothing is added if one is invalid."""
+        entries = list(entries)
+        for _, valid_from, valid_to, _ in entries:
+            if valid_from is not None and valid_to is not None and valid_from > valid_to:
+                raise ValueError(f"valid_from {valid_from} is after valid_to {valid_to}")
+        for promotion, valid_from, valid_to, key in entries:
+            if key is None:
+                key = self._next_key
+                self._next_key += 1
+            self._entries[key] = (valid_from, valid_to, promotion)
+        self._index = None
+        if self._by_segment:
+            self.invalidate()
+
+    def remove_where(self, predicate):
+        """Unregisters every promotion for which predicate(promotion) is true."""
+        kept = {key: entry for key, entry in self._entries.items() if not predicate(entry[2])}
+        if len(kept) == len(self._entries):
+            return
+        self._entries = kept
+        self._index = None
+        if self._by_segment:
+            self.invalidate()
+
+    def promotions(self):
+        """Every registered promotion, active or not, in registration order."""
+        return [promotion for _, _, promotion in self._entries.values()]
+
+    def active_on(self, day):
+        built = self._by_day.get(day)
+        if built is None:
+            index = self._index or self._build_index()
+            segment = bisect_right(index.boundaries, day.toordinal())
+            built = self._by_segment.get(segment)
+            if built is None:
+                built = self._build(index.active_in(segment))
+                self._by_segment[segment] = built
+            self._by_day[day] = built
+        return built
+
+    def invalidate(self):
+        self._by_segment = {}
+        self._by_day = {}
+
+    def _build_index(self):
+        self._index = _IntervalIndex(self._entries.values())
+        return self._index
+
+
+class _IntervalIndex:
+    def __init__(self, entries):
+        boundaries = set()
+        self._always = []
+        dated = []
+        for rank, (valid_from, valid_to, promotion) in enumerate(entries):
+            if valid_from is None and valid_to is None:
+                self._always.append((rank, promotion))
+                continue
+            start = valid_from.toordinal() if valid_from is not None else _OPEN_START
+            end = valid_to.toordinal() if valid_to is not None else _OPEN_END
+            if valid_from is not None:
+                boundaries.add(start)
+            if valid_to is not None:
+                boundaries.add(end + 1)
+            dated.append((start, end, rank, promotion))
+        dated.sort(key=_first)
+        self.boundaries = sorted(boundaries)
+        self._dated = dated
+        self._starts = [start for start, _, _, _ in dated]
+
+    def active_in(self, segment):
+        # Any day of the segment will do; the first boundary - 1 stands for the days before it.
+        if segment:
+            day = self.boundaries[segment - 1]
+        elif self.boundaries:
+            day = self.boundaries[0] - 1
+        else:
+            day = _OPEN_START
+        started = self._dated[:bisect_right(self._starts, day)]
+        active = self._always + [(rank, promotion) for _, end, rank, promotion in started if end >= day]
+        if started:
+            active.sort(key=_first)
+        return [promotion for _, promotion in active]
+
+
+def _first(entry):
+    return entry[0]
@@ -1,7 +1,9 @@
-
+from collections.abc import Sequence
 from decimal import Decimal
 
 class ReceiptItem:
+    __slots__ = ("product", "quantity", "price", "total_price")
+
     def __init__(self, product, quantity, price, total_price):
         self.product = product
         self.quantity = quantity
@@ -10,46 +12,94 @@ class ReceiptItem:
 
 
 class Payment:
+    __slots__ = ("description", "amount")
+
     def __init__(self, description, amount):
         self.description = description
         self.amount = amount
 
 
+class ListView(Sequence):
+    """Read-only view of a list; compares equal to lists and tuples with the same elements."""
+
+    __slots__ = ("_items",)
+    __hash__ = None
+
+    def __init__(self, items):
+        self._items = items
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __eq__(self, other):
+        if isinstance(other, ListView):
+            other = other._items
+        if not isinstance(other, (list, tuple)):
+            return NotImplemented
+        return len(self._items) == len(other) and all(a == b for a, b in zip(self._items, other))
+
+    def __repr__(self):
+        return f"ListView({self._items!r})"
+
+
 class Receipt:
     def __init__(self):
         self._items = []
         self._discounts = []
         self._payments = []
+        self._items_view = ListView(self._items)
+        self._discounts_view = ListView(self._discounts)
+        self._payments_view = ListView(self._payments)
+        # Running totals, kept up to date by the add_* methods.
+        self._subtotal = Decimal("0")
+        self._discount_total = Decimal("0")
+        self._payment_total = Decimal("0")
         self.points_earned = 0
         self.points_redeemed = 0
+        # The teller's promo_version for the offers, bundles and coupons that priced the receipt.
+        self.promo_version = None
 
     def total_price(self):
-        total = Decimal("0")
-        for item in self.items:
-            total += item.total_price
-        for discount in self.discounts:
-            total += discount.amount
-        for payment in self.payments:
-            total += payment.amount
-        return total
+        return self._subtotal + self._discount_total + self._payment_total
+
+    @property
+    def subtotal(self):
+        return self._subtotal
+
+    @property
+    def discount_total(self):
+        return self._discount_total
+
+    @property
+    def payment_total(self):
+        return self._payment_total
 
     def add_product(self, product, quantity, price, total_price):
         self._items.append(ReceiptItem(product, quantity, price, total_price))
+        self._subtotal += total_price
 
     def add_discount(self, discount):
         self._discounts.append(discount)
+        self._discount_total += discount.amount
 
     def add_payment(self, description, amount):
         self._payments.append(Payment(description, amount))
+        self._payment_total += amount
 
     @property
     def items(self):
-        return self._items[:]
+        return self._items_view
 
     @property
     def discounts(self):
-        return self._discounts[:]
+        return self._discounts_view
 
     @property
     def payments(self):
-        return self._payments[:]
+        return self._payments_view
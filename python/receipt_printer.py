@@ -1,28 +1,41 @@
 from model_objects import ProductUnit
 from decimal import Decimal, ROUND_HALF_UP
+from instrumentation import operation
 
 class ReceiptPrinter:
 
-    def __init__(self, columns=40):
+    def __init__(self, columns=40, instrumentation=None):
         self.columns = columns
+        self.instrumentation = instrumentation
   
     def print_receipt(self, receipt):
-        result = ""
+        with operation(self.instrumentation, "print_receipt"):
+            return "".join(self.iter_receipt_lines(receipt))
+
+    def iter_receipt_lines(self, receipt):
         for item in receipt.items:
-            receipt_item = self.print_receipt_item(item)
-            result += receipt_item
+            yield self.print_receipt_item(item)
 
         for discount in receipt.discounts:
-            discount_presentation = self.print_discount(discount)
-            result += discount_presentation
+            yield self.print_discount(discount)
 
         for payment in receipt.payments:
-            payment_presentation = self.print_payment(payment)
-            result += payment_presentation
+            yield self.print_payment(payment)
+
+        yield "\n"
+        yield self.present_total(receipt)
 
-        result += "\n"
-        result += self.present_total(receipt)
-        return str(result)
+    def write_receipt(self, receipt, stream):
+        with operation(self.instrumentation, "print_receipt"):
+            stream.writelines(self.iter_receipt_lines(receipt))
+
+    def write_journal(self, receipts, stream, separator="\n"):
+        # Receipts are rendered one at a time straight into the stream; nothing is accumulated.
+        with operation(self.instrumentation, "write_journal"):
+            for index, receipt in enumerate(receipts):
+                if index and separator:
+                    stream.write(separator)
+                self.write_receipt(receipt, stream)
 
     def print_receipt_item(self, item):
         total_price_printed = self.print_price(item.total_price)
@@ -33,13 +46,8 @@ class ReceiptPrinter:
         return line
 
     def format_line_with_whitespace(self, name, value):
-        line = name
         whitespace_size = self.columns - len(name) - len(value)
-        for _ in range(whitespace_size):
-            line += " "
-        line += value
-        line += "\n"
-        return line
+        return f"{name}{' ' * whitespace_size}{value}\n"
 
     def print_price(self, price):
         if isinstance(price, Decimal):
@@ -0,0 +1,133 @@
+"""
+Async checkout throughput against a stand-in price service with injected latency.
+
+    python scripts/async_checkout_demo.py [--latency 0.02] [--connections 8] [--checkouts 400]
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+_PYTHON_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_PYTHON_ROOT))
+
+from async_catalog import AsyncSupermarketCatalog, BatchingPriceClient
+from catalog import SupermarketCatalog
+from fake_catalog import FakeCatalog
+from model_objects import Product, ProductUnit, SpecialOfferType
+from product_registry import ProductRegistry
+from shopping_cart import ShoppingCart
+from teller import Teller
+
+
+class StandInPriceService:
+    def __init__(self, catalog, latency, connections):
+        self.catalog = catalog
+        self.latency = latency
+        self.requests = 0
+        self._connections = asyncio.Semaphore(connections)
+
+    async def fetch_prices(self, products):
+        async with self._connections:
+            self.requests += 1
+            await asyncio.sleep(self.latency)
+            return {product: self.catalog.unit_price(product) for product in products}
+
+
+class DirectPriceClient(AsyncSupermarketCatalog):
+    # One request per unit_prices() call, i.e. per checkout.
+    def __init__(self, service):
+        self._service = service
+
+    async def unit_prices(self, products):
+        return await self._service.fetch_prices(list(products))
+
+
+class BlockingCatalog(SupermarketCatalog):
+    def __init__(self, catalog, latency):
+        self._catalog = catalog
+        self._latency = latency
+
+    def unit_price(self, product):
+        return self.unit_prices([product])[product]
+
+    def unit_prices(self, products):
+        time.sleep(self._latency)
+        return {product: self._catalog.unit_price(product) for product in products}
+
+
+def build_workload(product_count, cart_count, seed=1):
+    rng = random.Random(seed)
+    catalog = FakeCatalog(ProductRegistry())
+    products = [Product(f"sku{i}", ProductUnit.EACH) for i in range(product_count)]
+    catalog.add_products((product, Decimal(rng.randint(50, 2000)) / 100) for product in products)
+    offers = [(SpecialOfferType.TEN_PERCENT_DISCOUNT, product, 10.0) for product in products[::7]]
+    carts = []
+    for _ in range(cart_count):
+        cart = ShoppingCart()
+        for product in rng.sample(products, 8):
+            cart.add_item_quantity(product, rng.randint(1, 4))
+        carts.append(cart)
+    return catalog, offers, carts
+
+
+def new_teller(catalog, offers):
+    # A fresh teller per run, so no run benefits from prices cached by an earlier one.
+    teller = Teller(catalog)
+    teller.add_special_offers(offers)
+    return teller
+
+
+async def run_async(teller, carts, concurrency):
+    slots = asyncio.Semaphore(concurrency)
+
+    async def check_out(cart):
+        async with slots:
+            return await teller.checks_out_articles_from_async(cart)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(check_out(cart) for cart in carts))
+    return time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per price service request")
+    parser.add_argument("--connections", type=int, default=8, help="requests the service serves at once")
+    parser.add_argument("--checkouts", type=int, default=400)
+    parser.add_argument("--products", type=int, default=20000)
+    parser.add_argument("--window", type=float, default=0.002, help="BatchingPriceClient window in seconds")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 64, 256])
+    args = parser.parse_args(argv)
+
+    catalog, offers, carts = build_workload(args.products, args.checkouts)
+
+    # The blocking baseline pays the full latency per checkout, a sample is enough.
+    baseline_carts = carts[:50]
+    teller = new_teller(BlockingCatalog(catalog, args.latency), offers)
+    started = time.perf_counter()
+    for cart in baseline_carts:
+        teller.checks_out_articles_from(cart)
+    elapsed = time.perf_counter() - started
+    print(f"sync baseline: {len(baseline_carts) / elapsed:8.1f} checkouts/s")
+    print()
+    print(f"{'concurrency':>11}  {'direct/s':>9}  {'requests':>8}  {'batched/s':>9}  {'requests':>8}")
+
+    for concurrency in args.concurrency:
+        row = [f"{concurrency:>11}"]
+        for make_client in (DirectPriceClient, lambda service: BatchingPriceClient(service.fetch_prices, args.window)):
+            async def measure():
+                service = StandInPriceService(catalog, args.latency, args.connections)
+                elapsed = await run_async(new_teller(make_client(service), offers), carts, concurrency)
+                return elapsed, service.requests
+
+            elapsed, requests = asyncio.run(measure())
+            row.append(f"{len(carts) / elapsed:9.1f}  {requests:>8}")
+        print("  ".join(row))
+
+
+if __name__ == "__main__":
+    main()
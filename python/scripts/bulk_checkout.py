@@ -0,0 +1,91 @@
+"""
+Prices many carts without prompting, streaming the receipts as they are priced.
+
+    python scripts/bulk_checkout.py CARTS [--input-format csv|jsonl] [--format text|jsonl]
+        [--output FILE] [--workers N] [--chunksize 64] [--date YYYY-MM-DD] [--data-dir DIR]
+        [--reload-interval SECONDS]
+"""
+import argparse
+import sys
+from datetime import date
+from pathlib import Path
+
+_PYTHON_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_PYTHON_ROOT))
+
+from bulk_checkout import (
+    JsonLinesReceiptWriter,
+    TextReceiptWriter,
+    iter_cart_records,
+    iter_cart_rows,
+    run_bulk_checkout,
+)
+from catalog_snapshot import DEFAULT_SNAPSHOT_NAME, load_snapshot, stale_sources
+from csv_loaders import read_bundle_offers, read_catalog, read_coupons, read_offers
+from fake_catalog import FakeCatalog
+from model_objects import PricingMode
+from promotion_reloader import PromotionReloader
+from receipt_printer import ReceiptPrinter
+from teller import Teller
+
+
+def load_teller(data_dir):
+    """Returns (teller, coupons) for the data directory; the coupons are not put in the teller's wallet."""
+    catalog = FakeCatalog()
+    teller = Teller(catalog)
+    snapshot_path = data_dir / DEFAULT_SNAPSHOT_NAME
+    if not stale_sources(snapshot_path, data_dir):
+        return teller, load_snapshot(snapshot_path, catalog, teller)
+    read_catalog(data_dir / "catalog.csv", catalog)
+    read_offers(data_dir / "offers.csv", teller, catalog)
+    read_bundle_offers(data_dir / "bundles.csv", teller, catalog)
+    return teller, read_coupons(data_dir / "coupons.csv", catalog)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("carts", help='cart lines file, or "-" for stdin')
+    parser.add_argument("--input-format", choices=("csv", "jsonl"), help="defaults to the file extension, else csv")
+    parser.add_argument("--format", choices=("text", "jsonl"), default="text", help="receipt output format")
+    parser.add_argument("--output", type=Path, help="file to write the receipts to (default stdout)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: price in this process)")
+    parser.add_argument("--chunksize", type=int, default=64, help="carts sent to a worker at a time")
+    parser.add_argument("--date", type=date.fromisoformat, help="checkout date (default today)")
+    parser.add_argument("--fixed-point", action="store_true", help="price in PricingMode.FIXED_POINT")
+    parser.add_argument("--data-dir", type=Path, default=_PYTHON_ROOT / "data")
+    parser.add_argument("--reload-interval", type=float, help="seconds between checks for changed offers and bundles")
+    args = parser.parse_args(argv)
+
+    input_format = args.input_format or ("jsonl" if args.carts.endswith((".jsonl", ".ndjson")) else "csv")
+    pricing_mode = PricingMode.FIXED_POINT if args.fixed_point else PricingMode.DECIMAL
+    teller, coupons = load_teller(args.data_dir)
+    if not teller.catalog.products:
+        print(f"No catalog found in {args.data_dir}", file=sys.stderr)
+        return 1
+
+    reloader = None
+    if args.reload_interval:
+        reloader = PromotionReloader(teller, args.data_dir, args.reload_interval, wallet=False)
+        reloader.start()
+    source = sys.stdin if args.carts == "-" else open(args.carts, newline="", encoding="utf-8")
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        if args.format == "jsonl":
+            write = JsonLinesReceiptWriter(output)
+        else:
+            write = TextReceiptWriter(output, ReceiptPrinter())
+        records = iter_cart_records(iter_cart_rows(source, input_format), teller.catalog, coupons, pricing_mode)
+        summary = run_bulk_checkout(teller, records, write, args.date, args.workers, args.chunksize)
+    finally:
+        if reloader:
+            reloader.stop()
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+    print(f"Priced {summary.carts} carts, total {summary.total}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
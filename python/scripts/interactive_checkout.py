@@ -7,6 +7,7 @@ import sys
 _PYTHON_ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(_PYTHON_ROOT))
 
+from catalog_snapshot import DEFAULT_SNAPSHOT_NAME, load_snapshot, stale_sources
 from cli_prompts import parse_date, parse_decimal, prompt_with_default, yes_no
 from csv_loaders import read_bundle_offers, read_cart, read_catalog, read_coupons, read_offers
 from model_objects import LoyaltyAccount
@@ -60,14 +61,16 @@ def build_cart(catalog):
     return cart
 
 
-def configure_bundle_offers(teller, catalog):
-    data_dir = _PYTHON_ROOT / "data"
-    bundles_file = data_dir / "bundles.csv"
-    loaded = 0
-    try:
-        loaded = read_bundle_offers(bundles_file, teller, catalog)
-    except Exception as exc:
-        print(f"Failed to read {bundles_file}: {exc}")
+def configure_bundle_offers(teller, catalog, loaded=None):
+    # loaded is the number of bundles already taken from the snapshot; None reads bundles.csv.
+    if loaded is None:
+        data_dir = _PYTHON_ROOT / "data"
+        bundles_file = data_dir / "bundles.csv"
+        loaded = 0
+        try:
+            loaded = read_bundle_offers(bundles_file, teller, catalog)
+        except Exception as exc:
+            print(f"Failed to read {bundles_file}: {exc}")
 
     raw = "n" if loaded else "y"
     while True:
@@ -109,14 +112,15 @@ def configure_bundle_offers(teller, catalog):
         print("Bundle offer added.")
 
 
-def configure_coupon(teller, catalog):
-    data_dir = _PYTHON_ROOT / "data"
-    coupons_file = data_dir / "coupons.csv"
-    try:
-        coupons = read_coupons(coupons_file, catalog)
-    except Exception as exc:
-        print(f"Failed to read {coupons_file}: {exc}")
-        coupons = []
+def configure_coupon(teller, catalog, coupons=None):
+    if coupons is None:
+        data_dir = _PYTHON_ROOT / "data"
+        coupons_file = data_dir / "coupons.csv"
+        try:
+            coupons = read_coupons(coupons_file, catalog)
+        except Exception as exc:
+            print(f"Failed to read {coupons_file}: {exc}")
+            coupons = []
 
     if coupons:
         print("Available coupons:")
@@ -181,16 +185,24 @@ def configure_loyalty():
 def main():
     data_dir = _PYTHON_ROOT / "data"
     catalog = FakeCatalog()
-    read_catalog(data_dir / "catalog.csv", catalog)
+    teller = Teller(catalog)
+    snapshot_path = data_dir / DEFAULT_SNAPSHOT_NAME
+    loaded_bundles = coupons = None
+    # A current snapshot (scripts/manage_snapshot.py build) replaces parsing the four CSVs.
+    if not stale_sources(snapshot_path, data_dir):
+        coupons = load_snapshot(snapshot_path, catalog, teller)
+        loaded_bundles = len(teller.bundle_offers)
+    else:
+        read_catalog(data_dir / "catalog.csv", catalog)
     if not catalog.products:
         print("No catalog found. Create a 'data/catalog.csv' first (columns: name, unit, price).")
         return
 
-    teller = Teller(catalog)
-    read_offers(data_dir / "offers.csv", teller, catalog)
+    if coupons is None:
+        read_offers(data_dir / "offers.csv", teller, catalog)
 
-    configure_bundle_offers(teller, catalog)
-    configure_coupon(teller, catalog)
+    configure_bundle_offers(teller, catalog, loaded_bundles)
+    configure_coupon(teller, catalog, coupons)
 
     cart = build_cart(catalog)
     checkout_date = parse_date("Checkout date (YYYY-MM-DD, empty = today):", "2025-12-14") or date.today()
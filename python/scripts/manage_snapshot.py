@@ -0,0 +1,48 @@
+"""
+Builds or verifies the compiled catalog snapshot (see catalog_snapshot.py).
+
+    python scripts/manage_snapshot.py build [--data-dir DIR] [--snapshot FILE]
+    python scripts/manage_snapshot.py verify [--data-dir DIR] [--snapshot FILE]
+
+verify exits with status 1 when the snapshot is missing, stale or differs from the CSVs.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+_PYTHON_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_PYTHON_ROOT))
+
+from catalog_snapshot import DEFAULT_SNAPSHOT_NAME, build_snapshot, verify_snapshot
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("command", choices=("build", "verify"))
+    parser.add_argument("--data-dir", type=Path, default=_PYTHON_ROOT / "data")
+    parser.add_argument("--snapshot", type=Path, help=f"defaults to <data-dir>/{DEFAULT_SNAPSHOT_NAME}")
+    args = parser.parse_args(argv)
+    snapshot_path = args.snapshot or args.data_dir / DEFAULT_SNAPSHOT_NAME
+
+    if args.command == "build":
+        started = time.perf_counter()
+        build_snapshot(args.data_dir, snapshot_path)
+        elapsed = time.perf_counter() - started
+        print(f"Wrote {snapshot_path} ({snapshot_path.stat().st_size} bytes) in {elapsed * 1000:.1f} ms")
+        return 0
+
+    if not snapshot_path.exists():
+        print(f"{snapshot_path} does not exist")
+        return 1
+    problems = verify_snapshot(snapshot_path, args.data_dir)
+    for problem in problems:
+        print(problem)
+    if problems:
+        return 1
+    print(f"{snapshot_path} is up to date")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
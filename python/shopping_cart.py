@@ -1,14 +1,29 @@
+from collections.abc import MutableMapping
 from decimal import Decimal
-from model_objects import ProductQuantity
-from offer_calculator import OfferCalculator
+from discount_optimizer import DiscountPlan, DiscountPlanOptimizer
+from fixed_point import QUANTITY_SCALE, to_fixed
+from incremental_pricing import IncrementalPricing
+from instrumentation import phase
+from model_objects import PricingMode, ProductQuantity
+from offer_calculator import FixedPointOfferCalculator, OfferCalculator
+from pricing_table import PricingTable
 
 
 class ShoppingCart:
 
-    def __init__(self):
+    def __init__(self, pricing_mode=PricingMode.DECIMAL):
+        # In FIXED_POINT mode quantities are stored as integer milli-units (see fixed_point.py).
+        self.pricing_mode = pricing_mode
         self._items = []
         self._product_quantities = {}
-        self._offer_calculator = OfferCalculator()
+        # FIXED_POINT only: each line's quantity as scanned, for the receipt.
+        self._scanned_quantities = []
+        if pricing_mode is PricingMode.FIXED_POINT:
+            self._offer_calculator = FixedPointOfferCalculator()
+        else:
+            self._offer_calculator = OfferCalculator()
+        self._incremental_pricing = None
+        self._instrumentation = None
 
     @property
     def items(self):
@@ -21,89 +36,184 @@ class ShoppingCart:
     def product_quantities(self):
         return self._product_quantities
 
+    @property
+    def scanned_quantities(self):
+        return self._scanned_quantities
+
     def add_item_quantity(self, product, quantity):
-        quantity_dec = Decimal(str(quantity))
-        self._items.append(ProductQuantity(product, quantity_dec))
+        if self.pricing_mode is PricingMode.FIXED_POINT:
+            parsed_quantity = to_fixed(quantity, QUANTITY_SCALE)
+            self._scanned_quantities.append(quantity)
+        else:
+            parsed_quantity = Decimal(str(quantity))
+        self._items.append(ProductQuantity(product, parsed_quantity))
         if product in self._product_quantities:
-            self._product_quantities[product] = self._product_quantities[product] + quantity_dec
+            self._product_quantities[product] = self._product_quantities[product] + parsed_quantity
         else:
-            self._product_quantities[product] = quantity_dec
+            self._product_quantities[product] = parsed_quantity
+        if self._incremental_pricing:
+            self._incremental_pricing.scan(product, parsed_quantity)
 
-    def handle_offers(self, receipt, offers, bundle_offers, coupon, catalog, checkout_date):
-        best = self._select_best_discount_plan(offers, bundle_offers, coupon, catalog, checkout_date)
-        for discount in best:
-            receipt.add_discount(discount)
+    @property
+    def incremental_pricing(self):
+        return self._incremental_pricing
 
-    def _select_best_discount_plan(self, offers, bundle_offers, coupon, catalog, checkout_date):
-        base_quantities = dict(self._product_quantities)
+    @property
+    def instrumentation(self):
+        return self._instrumentation
 
-        plans = [
-            self._compute_plan_no_coupon(base_quantities, offers, bundle_offers, catalog),
-        ]
+    @instrumentation.setter
+    def instrumentation(self, instrumentation):
+        # The calculator counts strategy calls, bundle and coupon evaluations.
+        self._instrumentation = instrumentation
+        self._offer_calculator.instrumentation = instrumentation
 
-        if coupon and coupon.is_valid_on(checkout_date):
-            # Evaluate coupon before bundles/offers and also after bundles (both can be optimal depending on quantities).
-            plans.append(
-                self._compute_plan_coupon_first(base_quantities, offers, bundle_offers, coupon, catalog, checkout_date)
-            )
-            plans.append(
-                self._compute_plan_coupon_after_bundles(base_quantities, offers, bundle_offers, coupon, catalog, checkout_date)
-            )
+    def enable_incremental_pricing(self, teller, checkout_date=None):
+        self._incremental_pricing = IncrementalPricing(self, self._offer_calculator, teller, checkout_date)
+        return self._incremental_pricing
 
-        # Choose the plan with the largest savings (most negative sum of discount amounts).
-        best_discounts, best_savings, uses_coupon = max(plans, key=lambda p: p[1])
-        if coupon and uses_coupon:
-            coupon.redeemed = True
-        return best_discounts
+    def handle_offers(
+        self, receipt, offers, bundle_offers, coupons, catalog, checkout_date, pricing_table=None, plan_optimizer=None,
+        instrumentation=None, claim_coupons=None,
+    ):
+        # coupons is the wallet for this checkout: every coupon the chosen plan uses is marked redeemed.
+        # claim_coupons(coupons_used) does the marking; when it returns False (a coupon was taken by a
+        # concurrent checkout, see Teller._claim_coupons) the plan is searched again without it.
+        # The pricing table stands in for the catalog below: it answers unit_price() from its entries.
+        if pricing_table is None:
+            # Tables resolve offers through a decimal OfferCalculator whatever the cart's pricing mode.
+            pricing_table = PricingTable(catalog, offers, OfferCalculator())
+        plan_optimizer = plan_optimizer or DiscountPlanOptimizer()
+        probe = instrumentation or self._instrumentation
+        self._offer_calculator.instrumentation = probe
+        self._offer_calculator.memo = pricing_table.memo
+        try:
+            with phase(probe, "discounts"):
+                best = self._select_best_discount_plan(
+                    offers, bundle_offers, coupons, pricing_table, checkout_date, plan_optimizer, probe,
+                    claim_coupons,
+                )
+                for discount in best:
+                    receipt.add_discount(self._offer_calculator.to_receipt_discount(discount))
+        finally:
+            self._offer_calculator.instrumentation = self._instrumentation
+            self._offer_calculator.memo = None
 
-    def _compute_plan_no_coupon(self, quantities, offers, bundle_offers, catalog):
-        remaining = dict(quantities)
-        discounts = []
-
-        discounts.extend(self._apply_bundles(remaining, offers, bundle_offers, catalog))
-        discounts.extend(self._apply_regular_offers(remaining, offers, catalog))
+    def _select_best_discount_plan(
+        self, offers, bundle_offers, coupons, pricing_table, checkout_date, plan_optimizer, instrumentation=None,
+        claim_coupons=None,
+    ):
+        component_cache = None
+        if self._incremental_pricing:
+            component_cache = self._incremental_pricing.component_cache_for(pricing_table)
+        claim_coupons = claim_coupons or _redeem
+        while True:
+            # Coupons redeemed since the last round are no longer valid, so the plans leave them out.
+            best_discounts, best_savings, coupons_used = self._plan_discounts(
+                offers, bundle_offers, coupons, pricing_table, checkout_date, plan_optimizer, component_cache,
+                instrumentation,
+            )
+            if claim_coupons(coupons_used):
+                return best_discounts
 
-        savings = self._savings_from_discounts(discounts)
-        return discounts, savings, False
+    def _plan_discounts(
+        self, offers, bundle_offers, coupons, pricing_table, checkout_date, plan_optimizer, component_cache=None,
+        instrumentation=None,
+    ):
+        base_quantities = dict(self._product_quantities)
 
-    def _compute_plan_coupon_first(self, quantities, offers, bundle_offers, coupon, catalog, checkout_date):
-        remaining = dict(quantities)
-        discounts = []
-        uses_coupon = False
+        with phase(instrumentation, "plan_search"):
+            best = plan_optimizer.solve(
+                base_quantities, bundle_offers, coupons, pricing_table, checkout_date, self._offer_calculator,
+                component_cache, instrumentation,
+            )
+        if best is None:
+            if instrumentation:
+                instrumentation.count("search_budget_exhausted")
+            best = DiscountPlan(*self._select_greedy_discount_plan(
+                base_quantities, offers, bundle_offers, coupons, pricing_table, checkout_date, instrumentation
+            ))
+        return best
 
-        coupon_discount = self._offer_calculator.compute_coupon_discount(coupon, remaining, catalog, checkout_date)
-        if coupon_discount:
-            discount, consumed = coupon_discount
-            discounts.append(discount)
-            self._consume(consumed, remaining)
-            uses_coupon = True
+    def _select_greedy_discount_plan(
+        self, base_quantities, offers, bundle_offers, coupons, pricing_table, checkout_date, instrumentation=None
+    ):
+        # Fallback when the optimizer runs out of budget: three fixed plans, bundles applied greedily in list order.
+        # The plans fork copy-on-write views of the quantities instead of copying them. The bundle phase on the
+        # full quantities runs once, and a regular-offer result is reused wherever a plan leaves its product's
+        # quantity as the bundle phase did.
+        with phase(instrumentation, "plan.no_coupon"):
+            after_bundles = _RemainingQuantities(base_quantities)
+            with phase(instrumentation, "bundles"):
+                bundle_discounts = self._apply_bundles(after_bundles, offers, bundle_offers, pricing_table)
+            regular = self._regular_discounts(after_bundles, pricing_table)
+            plans = [self._plan(bundle_discounts, regular, ())]
 
-        discounts.extend(self._apply_bundles(remaining, offers, bundle_offers, catalog))
-        discounts.extend(self._apply_regular_offers(remaining, offers, catalog))
+        coupons = [coupon for coupon in dict.fromkeys(coupons or ()) if coupon.is_valid_on(checkout_date)]
+        if coupons:
+            # Coupons before bundles/offers and also after bundles (either can win depending on quantities).
+            with phase(instrumentation, "plan.coupon_first"):
+                plans.append(
+                    self._compute_plan_coupon_first(
+                        base_quantities, offers, bundle_offers, coupons, pricing_table, checkout_date,
+                        (after_bundles, bundle_discounts, regular), instrumentation,
+                    )
+                )
+            with phase(instrumentation, "plan.coupon_after_bundles"):
+                remaining = _RemainingQuantities(after_bundles)
+                coupon_discounts = []
+                coupons_used = self._apply_coupons(remaining, coupons, pricing_table, checkout_date, coupon_discounts)
+                plans.append(
+                    self._plan(
+                        bundle_discounts + coupon_discounts,
+                        self._regular_discounts(remaining, pricing_table, regular),
+                        coupons_used,
+                    )
+                )
+        if instrumentation:
+            instrumentation.count("plans_computed", len(plans))
 
-        savings = self._savings_from_discounts(discounts)
-        return discounts, savings, uses_coupon
+        # Choose the plan with the largest savings (most negative sum of discount amounts).
+        return max(plans, key=lambda p: p[1])
 
-    def _compute_plan_coupon_after_bundles(self, quantities, offers, bundle_offers, coupon, catalog, checkout_date):
-        remaining = dict(quantities)
+    def _compute_plan_coupon_first(
+        self, quantities, offers, bundle_offers, coupons, pricing_table, checkout_date, bundle_phase,
+        instrumentation=None,
+    ):
+        after_bundles, bundle_discounts, regular = bundle_phase
+        remaining = _RemainingQuantities(quantities)
         discounts = []
-        uses_coupon = False
 
-        discounts.extend(self._apply_bundles(remaining, offers, bundle_offers, catalog))
+        coupons_used = self._apply_coupons(remaining, coupons, pricing_table, checkout_date, discounts)
+        if all(remaining.unchanged(bundle_offer.items_required) for bundle_offer in bundle_offers):
+            # The coupons took nothing any bundle needs, so the bundle phase goes as it did on the full quantities.
+            discounts.extend(bundle_discounts)
+            remaining = remaining.rebased(after_bundles)
+        else:
+            with phase(instrumentation, "bundles"):
+                discounts.extend(self._apply_bundles(remaining, offers, bundle_offers, pricing_table))
 
-        coupon_discount = self._offer_calculator.compute_coupon_discount(coupon, remaining, catalog, checkout_date)
-        if coupon_discount:
-            discount, consumed = coupon_discount
-            discounts.append(discount)
-            self._consume(consumed, remaining)
-            uses_coupon = True
+        return self._plan(discounts, self._regular_discounts(remaining, pricing_table, regular), coupons_used)
 
-        discounts.extend(self._apply_regular_offers(remaining, offers, catalog))
+    def _plan(self, discounts, regular, coupons_used):
+        discounts = discounts + [discount for _, discount in regular.values() if discount]
+        return discounts, self._savings_from_discounts(discounts), coupons_used
 
-        savings = self._savings_from_discounts(discounts)
-        return discounts, savings, uses_coupon
+    def _apply_coupons(self, remaining_quantities, coupons, pricing_table, checkout_date, discounts):
+        # Greedy: each coupon in wallet order takes as many units as it can from what is left.
+        coupons_used = ()
+        for coupon in coupons:
+            coupon_discount = self._offer_calculator.compute_coupon_discount(
+                coupon, remaining_quantities, pricing_table, checkout_date
+            )
+            if coupon_discount:
+                discount, consumed = coupon_discount
+                discounts.append(discount)
+                self._consume(consumed, remaining_quantities)
+                coupons_used += (coupon,)
+        return coupons_used
 
-    def _apply_bundles(self, remaining_quantities, offers, bundle_offers, catalog):
+    def _apply_bundles(self, remaining_quantities, offers, bundle_offers, pricing_table):
         discounts = []
         for bundle_offer in bundle_offers:
             bundle_count = self._offer_calculator.count_complete_bundles(bundle_offer, remaining_quantities)
@@ -111,24 +221,22 @@ class ShoppingCart:
                 continue
 
             bundle_discount, applied = self._offer_calculator.best_bundle_discount(
-                bundle_offer, bundle_count, remaining_quantities, offers, catalog
+                bundle_offer, bundle_count, remaining_quantities, offers, pricing_table
             )
             if applied:
                 discounts.append(bundle_discount)
                 self._offer_calculator.consume_bundle_quantities(bundle_offer, bundle_count, remaining_quantities)
         return discounts
 
-    def _apply_regular_offers(self, remaining_quantities, offers, catalog):
-        discounts = []
-        for product, quantity in list(remaining_quantities.items()):
-            offer = offers.get(product)
-            if not offer:
-                continue
-            unit_price = catalog.unit_price(product)
-            discount = self._offer_calculator.calculate_discount(offer, product, quantity, unit_price)
-            if discount:
-                discounts.append(discount)
-        return discounts
+    def _regular_discounts(self, remaining_quantities, pricing_table, known=None):
+        # product -> (quantity, discount or None), in cart order; results in known are reused for equal quantities.
+        results = {}
+        for product, quantity in remaining_quantities.items():
+            result = known.get(product) if known else None
+            if result is None or result[0] != quantity:
+                result = (quantity, self._offer_calculator.regular_discount(pricing_table, product, quantity))
+            results[product] = result
+        return results
 
     def _consume(self, consumed, remaining_quantities):
         for product, qty in consumed.items():
@@ -143,3 +251,59 @@ class ShoppingCart:
         for d in discounts:
             total += (-d.amount)
         return total
+
+
+def _redeem(coupons):
+    for coupon in coupons:
+        coupon.redeemed = True
+    return True
+
+
+_REMOVED = object()
+
+
+class _RemainingQuantities(MutableMapping):
+    """Copy-on-write view of the quantities a greedy plan has left."""
+
+    __slots__ = ("_base", "_changes")
+
+    def __init__(self, base, changes=None):
+        self._base = base
+        self._changes = changes or {}
+
+    def __getitem__(self, product):
+        value = self._changes.get(product, self._base.get(product, _REMOVED))
+        if value is _REMOVED:
+            raise KeyError(product)
+        return value
+
+    def get(self, product, default=None):
+        value = self._changes.get(product, self._base.get(product, _REMOVED))
+        return default if value is _REMOVED else value
+
+    def __contains__(self, product):
+        return self.get(product, _REMOVED) is not _REMOVED
+
+    def __setitem__(self, product, quantity):
+        self._changes[product] = quantity
+
+    def __delitem__(self, product):
+        if product not in self:
+            raise KeyError(product)
+        self._changes[product] = _REMOVED
+
+    def __iter__(self):
+        changes = self._changes
+        for product in self._base:
+            if changes.get(product) is not _REMOVED:
+                yield product
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def unchanged(self, products):
+        return self._changes.keys().isdisjoint(products)
+
+    def rebased(self, base):
+        """This view's changes over another base, e.g. the same state with the bundle phase applied."""
+        return _RemainingQuantities(base, dict(self._changes))
@@ -0,0 +1,191 @@
+import queue
+import sqlite3
+import threading
+from collections.abc import Mapping
+from contextlib import contextmanager
+from decimal import Decimal
+
+from catalog import SupermarketCatalog
+from lru_cache import LruCache
+from model_objects import Product, ProductUnit
+
+DEFAULT_CACHE_SIZE = 4096
+DEFAULT_POOL_SIZE = 4
+
+# Bulk lookups bind at most this many names per query (SQLite's historical limit is 999).
+_MAX_BATCH = 256
+
+_SCHEMA = "CREATE TABLE IF NOT EXISTS products (name TEXT PRIMARY KEY, unit TEXT NOT NULL, price TEXT NOT NULL)"
+
+
+class SqliteCatalog(SupermarketCatalog):
+    """Catalog stored in a SQLite file, with a bounded price cache and a connection pool."""
+
+    def __init__(self, path, cache_size=DEFAULT_CACHE_SIZE, pool_size=DEFAULT_POOL_SIZE):
+        if cache_size < 0:
+            raise ValueError("cache_size must be >= 0")
+        if pool_size < 1:
+            raise ValueError("pool_size must be >= 1")
+        self.path = str(path)
+        self.cache_size = cache_size
+        self._cache = LruCache(cache_size)
+        self._cache_lock = threading.Lock()
+        self._pool = queue.LifoQueue()
+        self._pool_size = pool_size
+        self._opened = 0
+        self._pool_lock = threading.Lock()
+        self.products = _ProductsByName(self)
+        with self._connection() as connection:
+            connection.execute(_SCHEMA)
+
+    def add_product(self, product, price):
+        self.add_products([(product, price)])
+
+    def add_products(self, products_and_prices):
+        rows = [(product.name, product.unit.name, str(Decimal(str(price)))) for product, price in products_and_prices]
+        with self._connection() as connection:
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO products (name, unit, price) VALUES (?, ?, ?)", rows
+                )
+        with self._cache_lock:
+            # A name maps to one row, so drop the cached price under every unit the name may have had.
+            for name, _, _ in rows:
+                for unit in ProductUnit:
+                    self._cache.pop(Product(name, unit))
+            self.version += 1
+
+    def unit_price(self, product):
+        return self.unit_prices([product])[product]
+
+    def unit_prices(self, products):
+        prices = {}
+        missing = {}
+        with self._cache_lock:
+            for product in products:
+                if product in prices or product in missing:
+                    continue
+                price = self._cache.get(product)
+                if price is None:
+                    missing[product] = None
+                else:
+                    prices[product] = price
+        if not missing:
+            return prices
+
+        fetched = self._fetch(missing)
+        for product in missing:
+            if product not in fetched:
+                raise KeyError(product.name)
+        prices.update(fetched)
+        with self._cache_lock:
+            for product, price in fetched.items():
+                self._cache.put(product, price)
+        return prices
+
+    @property
+    def cache_stats(self):
+        with self._cache_lock:
+            return self._cache.stats
+
+    def clear_cache(self):
+        with self._cache_lock:
+            self._cache.clear()
+
+    def close(self):
+        while True:
+            try:
+                connection = self._pool.get_nowait()
+            except queue.Empty:
+                return
+            connection.close()
+
+    def __getstate__(self):
+        # Connections and locks stay behind; a copy (e.g. in a checkout_many worker) opens its own pool.
+        return self.path, self.cache_size, self._pool_size
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _fetch(self, products):
+        wanted = {(product.name, product.unit.name): product for product in products}
+        names = list({product.name for product in products})
+        fetched = {}
+        with self._connection() as connection:
+            for start in range(0, len(names), _MAX_BATCH):
+                batch = _padded(names[start:start + _MAX_BATCH])
+                for name, unit, price in connection.execute(_select_names(len(batch)), batch):
+                    product = wanted.get((name, unit))
+                    if product is not None:
+                        fetched[product] = Decimal(price)
+        return fetched
+
+    @contextmanager
+    def _connection(self):
+        connection = self._acquire()
+        try:
+            yield connection
+        finally:
+            self._pool.put(connection)
+
+    def _acquire(self):
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+        with self._pool_lock:
+            can_open = self._opened < self._pool_size
+            if can_open:
+                self._opened += 1
+        if not can_open:
+            return self._pool.get()
+        return sqlite3.connect(self.path, check_same_thread=False)
+
+
+class _ProductsByName(Mapping):
+    # Read-through name -> product view, so the CSV loaders and scripts can use SqliteCatalog like FakeCatalog.
+
+    def __init__(self, catalog):
+        self._catalog = catalog
+
+    def __getitem__(self, name):
+        with self._catalog._connection() as connection:
+            row = connection.execute("SELECT unit FROM products WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            raise KeyError(name)
+        return Product(name, ProductUnit[row[0]])
+
+    def __iter__(self):
+        with self._catalog._connection() as connection:
+            names = [name for name, in connection.execute("SELECT name FROM products ORDER BY rowid")]
+        return iter(names)
+
+    def __len__(self):
+        with self._catalog._connection() as connection:
+            return connection.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+
+def _padded(names):
+    # Repeat the last name up to the next power of two so the statement text is one of a few cached ones.
+    size = 1
+    while size < len(names):
+        size *= 2
+    return names + [names[-1]] * (size - len(names))
+
+
+_SELECT_BY_SIZE = {}
+
+
+def _select_names(count):
+    statement = _SELECT_BY_SIZE.get(count)
+    if statement is None:
+        placeholders = ", ".join("?" * count)
+        statement = f"SELECT name, unit, price FROM products WHERE name IN ({placeholders})"
+        _SELECT_BY_SIZE[count] = statement
+    return statement
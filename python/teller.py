@@ -1,45 +1,392 @@
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from decimal import Decimal, ROUND_FLOOR
 from datetime import date
+from itertools import islice
+from types import MappingProxyType
+from typing import NamedTuple
 
-from model_objects import Offer, BundleOffer, Coupon
+from discount_optimizer import DiscountPlanOptimizer
+from fixed_point import PRICE_SCALE, QUANTITY_SCALE, from_fixed
+from instrumentation import operation, phase
+from model_objects import Offer, BundleOffer, Coupon, PricingMode
+from offer_calculator import DEFAULT_MEMO_SIZE, OfferCalculator, StrategyMemo
+from pricing_table import PricingTable
+from promotion_schedule import PromotionSchedule
 from receipt import Receipt
 
 
+class PricingSnapshot:
+    """The offers, bundles and coupons active on a day, with their pricing table; never changes once built."""
+
+    __slots__ = (
+        "_offers", "_bundle_offers", "_coupons", "_pricing_table", "_bundles_by_product", "_coupons_by_product",
+        "_version",
+    )
+
+    def __init__(self, offers, bundle_offers, coupons, pricing_table, version=0):
+        self._version = version
+        self._offers = MappingProxyType(dict(offers))
+        self._bundle_offers = tuple(bundle_offers)
+        self._coupons = tuple(coupons)
+        self._pricing_table = pricing_table
+        self._bundles_by_product = {}
+        for position, bundle_offer in enumerate(self._bundle_offers):
+            for product in bundle_offer.items_required:
+                self._bundles_by_product.setdefault(product, []).append((position, bundle_offer))
+        self._coupons_by_product = {}
+        for position, coupon in enumerate(self._coupons):
+            self._coupons_by_product.setdefault(coupon.product, []).append((position, coupon))
+
+    def __reduce__(self):
+        # mappingproxy cannot be pickled; rebuild the snapshot from its parts instead.
+        args = (dict(self._offers), self._bundle_offers, self._coupons, self._pricing_table, self._version)
+        return PricingSnapshot, args
+
+    @property
+    def offers(self):
+        return self._offers
+
+    @property
+    def bundle_offers(self):
+        return self._bundle_offers
+
+    @property
+    def coupons(self):
+        return self._coupons
+
+    @property
+    def pricing_table(self):
+        return self._pricing_table
+
+    @property
+    def version(self):
+        return self._version
+
+    def bundle_offers_for(self, products, present=None):
+        """The bundles using any of products whose products are all in present (default: products)."""
+        present = products if present is None else present
+        candidates = {}
+        for product in products:
+            for position, bundle_offer in self._bundles_by_product.get(product, ()):
+                candidates[position] = bundle_offer
+        return [
+            bundle_offer
+            for _, bundle_offer in sorted(candidates.items())
+            if all(product in present for product in bundle_offer.items_required)
+        ]
+
+    def coupons_for(self, products):
+        """The coupons targeting any of products, in wallet order."""
+        candidates = []
+        for product in products:
+            candidates.extend(self._coupons_by_product.get(product, ()))
+        return [coupon for _, coupon in sorted(candidates, key=_first)]
+
+
+class CheckoutRequest(NamedTuple):
+    """One checkout for Teller.iter_checkouts(): the arguments of checks_out_articles_from()."""
+    cart: object
+    loyalty_account: object = None
+    points_to_redeem: int = 0
+    coupons: tuple = ()
+
+
 class Teller:
+    """Prices carts against the offers, bundles and coupons added to it; safe to share between threads."""
 
-    def __init__(self, catalog):
+    def __init__(self, catalog, plan_optimizer=None, instrumentation=None, memo_size=DEFAULT_MEMO_SIZE):
         self.catalog = catalog
-        self.offers = {}
-        self.bundle_offers = []
-        self.coupon = None
+        self.plan_optimizer = plan_optimizer or DiscountPlanOptimizer()
+        self.instrumentation = instrumentation
+        # Regular-offer results shared by every checkout; memo_size=0 turns it off. See StrategyMemo.
+        self.strategy_memo = StrategyMemo(memo_size) if memo_size else None
+        # Offers, bundles and wallet coupons, indexed by validity; see promotions_on().
+        self._schedule = PromotionSchedule(self._build_snapshot)
+        self.promo_version = 0
+        self._offer_calculator = OfferCalculator()
+        # _lock guards the schedule; _redemption_lock makes claiming a checkout's coupons atomic.
+        self._lock = threading.RLock()
+        self._redemption_lock = threading.Lock()
+
+    def __getstate__(self):
+        # Locks stay behind; a copy (e.g. in a checkout_many worker) gets its own.
+        state = self.__dict__.copy()
+        del state["_lock"], state["_redemption_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+        self._redemption_lock = threading.Lock()
+
+    def add_special_offer(self, offer_type, product, argument, valid_from=None, valid_to=None):
+        self._add_offers([Offer(offer_type, product, argument, valid_from, valid_to)])
+
+    def add_special_offers(self, offers):
+        """Adds (offer_type, product, argument[, valid_from, valid_to]) tuples as one change."""
+        self._add_offers(
+            [Offer(offer_type, product, argument, *validity) for offer_type, product, argument, *validity in offers]
+        )
 
-    def add_special_offer(self, offer_type, product, argument):
-        self.offers[product] = Offer(offer_type, product, argument)
+    def _add_offers(self, offers):
+        entries = [(offer, offer.valid_from, offer.valid_to, _offer_key(offer)) for offer in offers]
+        with self._lock:
+            self._schedule.add_all(entries)
+            self.promo_version += 1
+            self._clear_strategy_memo()
 
-    def add_bundle_offer(self, items_required, discount_percent=10):
-        self.bundle_offers.append(BundleOffer(items_required, discount_percent))
+    def add_bundle_offer(self, items_required, discount_percent=10, valid_from=None, valid_to=None):
+        self._add_bundle_offers([BundleOffer(items_required, discount_percent, valid_from, valid_to)])
+
+    def add_bundle_offers(self, bundle_offers):
+        """Adds (items_required, discount_percent[, valid_from, valid_to]) tuples as one change."""
+        self._add_bundle_offers(
+            [
+                BundleOffer(items_required, discount_percent, *validity)
+                for items_required, discount_percent, *validity in bundle_offers
+            ]
+        )
+
+    def _add_bundle_offers(self, bundle_offers):
+        entries = [(offer, offer.valid_from, offer.valid_to, None) for offer in bundle_offers]
+        with self._lock:
+            self._schedule.add_all(entries)
+            self.promo_version += 1
+
+    def replace_promotions(self, offers, bundle_offers, coupons=None):
+        """Replaces every offer and bundle, and the wallet unless coupons is None; returns the new promo_version."""
+        schedule = PromotionSchedule(self._build_snapshot)
+        for offer in offers:
+            schedule.add(offer, offer.valid_from, offer.valid_to, key=_offer_key(offer))
+        for bundle_offer in bundle_offers:
+            schedule.add(bundle_offer, bundle_offer.valid_from, bundle_offer.valid_to)
+        with self._lock:
+            wallet = self.coupons
+            if coupons is not None:
+                wallet = _carry_over_coupons(coupons, wallet)
+            for coupon in wallet:
+                schedule.add(coupon, coupon.valid_from, coupon.valid_to)
+            self._schedule = schedule
+            self.promo_version += 1
+            self._clear_strategy_memo()
+            return self.promo_version
+
+    def bundle_offers_for(self, products, checkout_date=None):
+        """The bundles active on the date whose products are all present, in the order added."""
+        return self.promotions_on(checkout_date or date.today()).bundle_offers_for(products)
+
+    def promotions_on(self, day):
+        """The PricingSnapshot for a day."""
+        with self._lock:
+            return self._schedule.active_on(day)
+
+    @property
+    def offers(self):
+        """The offers active today, by product."""
+        return self.promotions_on(date.today()).offers
+
+    @property
+    def all_offers(self):
+        """Every offer added, active or not, in the order added."""
+        return self._promotions(Offer)
+
+    @property
+    def bundle_offers(self):
+        """Every bundle added, active or not, in the order added."""
+        return self._promotions(BundleOffer)
+
+    @property
+    def coupons(self):
+        """The teller's coupon wallet, including coupons outside their dates."""
+        return self._promotions(Coupon)
+
+    def _promotions(self, kind):
+        with self._lock:
+            return [p for p in self._schedule.promotions() if isinstance(p, kind)]
+
+    @property
+    def pricing_table(self):
+        """The pricing table for today's offers; checkouts use the one for their checkout date."""
+        return self.promotions_on(date.today()).pricing_table
+
+    def invalidate_pricing(self):
+        # Pricing tables follow catalog.version; call this when prices change behind the catalog's back
+        # (e.g. an AsyncSupermarketCatalog's service).
+        with self._lock:
+            self._schedule.invalidate()
+            self._clear_strategy_memo()
+
+    def _clear_strategy_memo(self):
+        if self.strategy_memo is not None:
+            self.strategy_memo.clear()
+
+    def _build_snapshot(self, promotions):
+        dated_offers = []
+        offers = {}
+        bundle_offers = []
+        coupons = []
+        for promotion in promotions:
+            if isinstance(promotion, Offer):
+                if promotion.valid_from is None and promotion.valid_to is None:
+                    offers[promotion.product] = promotion
+                else:
+                    dated_offers.append(promotion)
+            elif isinstance(promotion, BundleOffer):
+                bundle_offers.append(promotion)
+            else:
+                coupons.append(promotion)
+        for offer in dated_offers:
+            offers[offer.product] = offer
+        pricing_table = PricingTable(self.catalog, offers, self._offer_calculator, self.strategy_memo)
+        # Built under the teller's lock (see promotions_on), so promo_version matches the promotions.
+        return PricingSnapshot(offers, bundle_offers, coupons, pricing_table, self.promo_version)
 
     def create_coupon(self, product, required_qty, discounted_qty, discount_percent, valid_from, valid_to, description=None):
         return Coupon(product, required_qty, discounted_qty, discount_percent, valid_from, valid_to, description)
 
     def use_coupon(self, coupon):
-        self.coupon = coupon
+        """Makes coupon the only one in the teller's wallet; None empties the wallet."""
+        with self._lock:
+            self._schedule.remove_where(lambda promotion: isinstance(promotion, Coupon))
+            if coupon is not None:
+                self._schedule.add(coupon, coupon.valid_from, coupon.valid_to)
+            self.promo_version += 1
+
+    def use_coupons(self, coupons):
+        """Adds coupons to the teller's wallet; checkouts pick the best subset of the wallet."""
+        entries = [(coupon, coupon.valid_from, coupon.valid_to, None) for coupon in coupons]
+        with self._lock:
+            self._schedule.add_all(entries)
+            self.promo_version += 1
 
-    def checks_out_articles_from(self, the_cart, checkout_date=None, loyalty_account=None, points_to_redeem=0):
+    def checks_out_articles_from(
+        self, the_cart, checkout_date=None, loyalty_account=None, points_to_redeem=0, coupons=None
+    ):
+        """coupons is the customer's wallet for this checkout, searched together with the teller's own coupons."""
+        with operation(self.instrumentation, "checkout"):
+            return self._check_out(the_cart, checkout_date, loyalty_account, points_to_redeem, coupons)
+
+    def _check_out(self, the_cart, checkout_date, loyalty_account, points_to_redeem, coupons=None, snapshot=None):
+        probe = self.instrumentation
         checkout_date = checkout_date or date.today()
         receipt = Receipt()
+        # Everything below prices against this one snapshot, whatever is added to the teller meanwhile.
+        if snapshot is None:
+            snapshot = self.promotions_on(checkout_date)
+        receipt.promo_version = snapshot.version
+        with phase(probe, "price_lookup"):
+            pricing_table = snapshot.pricing_table
+            # One catalog round-trip for every product in the cart; bundles and the coupon only price cart products.
+            pricing_table.prefetch(the_cart.product_quantities)
+            self._add_items(receipt, the_cart, pricing_table)
+        if probe:
+            probe.count("lines", len(the_cart.items))
+
+        bundle_offers = snapshot.bundle_offers_for(the_cart.product_quantities)
+        wallet = snapshot.coupons + tuple(coupons) if coupons else snapshot.coupons
+        the_cart.handle_offers(
+            receipt, snapshot.offers, bundle_offers, wallet, self.catalog, checkout_date, pricing_table,
+            self.plan_optimizer, probe, self._claim_coupons,
+        )
+
+        with phase(probe, "loyalty"):
+            self._apply_loyalty(loyalty_account, receipt, points_to_redeem)
+        return receipt
+
+    async def checks_out_articles_from_async(
+        self, the_cart, checkout_date=None, loyalty_account=None, points_to_redeem=0, coupons=None
+    ):
+        """Checkout against an AsyncSupermarketCatalog, awaiting the cart's missing prices in one call."""
+        checkout_date = checkout_date or date.today()
+        # Loop in case the pricing table is rebuilt (offers added) while the prices are awaited.
+        while True:
+            snapshot = self.promotions_on(checkout_date)
+            missing = snapshot.pricing_table.missing(the_cart.product_quantities)
+            if not missing:
+                break
+            snapshot.pricing_table.add_prices(await self.catalog.unit_prices(missing))
+        # Priced against the table just filled: a snapshot built since would call the async catalog synchronously.
+        with operation(self.instrumentation, "checkout"):
+            return self._check_out(the_cart, checkout_date, loyalty_account, points_to_redeem, coupons, snapshot)
+
+    def checkout_many(self, carts, checkout_date=None, processes=None, chunksize=64, mp_context=None):
+        """Prices every cart and returns the receipts in input order, in worker processes if processes is set."""
+        return list(self.iter_checkouts(carts, checkout_date, processes, chunksize, mp_context))
+
+    def iter_checkouts(self, requests, checkout_date=None, processes=None, chunksize=64, mp_context=None):
+        """Lazy checkout_many(): yields the receipts in input order."""
+        checkout_date = checkout_date or date.today()
+        if processes is None:
+            for request in requests:
+                yield self._check_out_request(_as_request(request), checkout_date)
+            return
+
+        if any(not coupon.redeemed for coupon in self.coupons):
+            raise ValueError("single-use coupons cannot be shared across worker processes")
+        if chunksize < 1:
+            raise ValueError("chunksize must be >= 1")
+
+        requests = map(_as_request, requests)
+        pool = ProcessPoolExecutor(
+            max_workers=processes, mp_context=mp_context, initializer=_init_worker, initargs=(self,)
+        )
+        with pool:
+            pending = deque()
+            while True:
+                chunk = list(islice(requests, chunksize))
+                if chunk:
+                    without_loyalty = [request._replace(loyalty_account=None) for request in chunk]
+                    pending.append((chunk, pool.submit(_checkout_in_worker, without_loyalty, checkout_date)))
+                if pending and (not chunk or len(pending) >= 2 * processes):
+                    chunk, future = pending.popleft()
+                    for request, (receipt, redeemed) in zip(chunk, future.result()):
+                        self._settle(request, receipt, redeemed)
+                        yield receipt
+                elif not chunk:
+                    return
+
+    def _check_out_request(self, request, checkout_date):
+        return self.checks_out_articles_from(
+            request.cart, checkout_date, request.loyalty_account, request.points_to_redeem, request.coupons
+        )
+
+    def _settle(self, request, receipt, redeemed):
+        # Applies a worker's receipt to the caller's objects: the coupons its copies redeemed, then the loyalty points.
+        for i in redeemed:
+            request.coupons[i].redeemed = True
+        self._apply_loyalty(request.loyalty_account, receipt, request.points_to_redeem)
+
+    def _claim_coupons(self, coupons):
+        """Marks the coupons redeemed if none of them is yet; False when a concurrent checkout took one first."""
+        with self._redemption_lock:
+            if any(coupon.redeemed for coupon in coupons):
+                return False
+            for coupon in coupons:
+                coupon.redeemed = True
+            return True
+
+    def _add_items(self, receipt, the_cart, pricing_table):
+        if the_cart.pricing_mode is PricingMode.FIXED_POINT:
+            self._add_fixed_point_items(receipt, the_cart, pricing_table)
+            return
         product_quantities = the_cart.items
         for pq in product_quantities:
             p = pq.product
             quantity = pq.quantity
-            unit_price = self.catalog.unit_price(p)
+            unit_price = pricing_table.unit_price(p)
             price = unit_price * Decimal(str(quantity))
             receipt.add_product(p, quantity, unit_price, price)
 
-        the_cart.handle_offers(receipt, self.offers, self.bundle_offers, self.coupon, self.catalog, checkout_date)
-
-        self._apply_loyalty(loyalty_account, receipt, points_to_redeem)
-        return receipt
+    def _add_fixed_point_items(self, receipt, the_cart, pricing_table):
+        # Amounts are built exactly from the integers; the quantity printed is the one scanned, as on the Decimal path.
+        for pq, scanned in zip(the_cart.items, the_cart.scanned_quantities):
+            p = pq.product
+            entry = pricing_table.fixed_entry(p)
+            price = from_fixed(pq.quantity * entry.unit_price, PRICE_SCALE * QUANTITY_SCALE)
+            quantity = scanned if isinstance(scanned, Decimal) else Decimal(str(scanned))
+            receipt.add_product(p, quantity, pricing_table.unit_price(p), price)
 
     def _apply_loyalty(self, loyalty_account, receipt, points_to_redeem):
         if not loyalty_account:
@@ -51,9 +398,9 @@ class Teller:
 
         total_due = receipt.total_price()
         max_points_for_due = int((total_due * 100).to_integral_value(rounding=ROUND_FLOOR))
-        points_redeemed = min(points_to_redeem, max_points_for_due, loyalty_account.points)
+        # One call checks and debits the balance, so a shared account (see loyalty_ledger.py) cannot be overdrawn.
+        points_redeemed = loyalty_account.redeem_up_to(min(points_to_redeem, max_points_for_due))
         if points_redeemed:
-            loyalty_account.redeem(points_redeemed)
             value = (Decimal(points_redeemed) / Decimal("100"))
             receipt.add_payment("Loyalty points", -value)
             receipt.points_redeemed = points_redeemed
@@ -62,3 +409,51 @@ class Teller:
         points_earned = int((total_paid * 100).to_integral_value(rounding=ROUND_FLOOR))
         loyalty_account.earn(points_earned)
         receipt.points_earned = points_earned
+
+
+def _first(item):
+    return item[0]
+
+
+def _offer_key(offer):
+    # A product keeps one offer per validity interval; adding it again replaces that offer.
+    return offer.product, offer.valid_from, offer.valid_to
+
+
+def _coupon_terms(coupon):
+    return (
+        coupon.product, coupon.required_qty, coupon.discounted_qty, coupon.discount_percent, coupon.valid_from,
+        coupon.valid_to, coupon.description,
+    )
+
+
+def _carry_over_coupons(coupons, wallet):
+    previous = {}
+    for coupon in wallet:
+        previous.setdefault(_coupon_terms(coupon), deque()).append(coupon)
+    carried = []
+    for coupon in coupons:
+        same_terms = previous.get(_coupon_terms(coupon))
+        carried.append(same_terms.popleft() if same_terms else coupon)
+    return carried
+
+
+_worker_teller = None
+
+
+def _init_worker(teller):
+    global _worker_teller
+    _worker_teller = teller
+
+
+def _checkout_in_worker(requests, checkout_date):
+    results = []
+    for request in requests:
+        receipt = _worker_teller._check_out_request(request, checkout_date)
+        results.append((receipt, [i for i, coupon in enumerate(request.coupons or ()) if coupon.redeemed]))
+    return results
+
+
+def _as_request(request):
+    return request if isinstance(request, CheckoutRequest) else CheckoutRequest(request)
+
@@ -0,0 +1,139 @@
+import asyncio
+import unittest
+from decimal import Decimal
+
+from async_catalog import BatchingPriceClient
+from fake_catalog import FakeCatalog
+from model_objects import Product, ProductUnit, SpecialOfferType
+from product_registry import ProductRegistry
+from shopping_cart import ShoppingCart
+from teller import Teller
+
+
+class FakePriceService:
+    def __init__(self, catalog, latency=0.001):
+        self.catalog = catalog
+        self.latency = latency
+        self.requests = []
+
+    async def fetch_prices(self, products):
+        self.requests.append(sorted(product.name for product in products))
+        await asyncio.sleep(self.latency)
+        return {product: self.catalog.unit_price(product) for product in products if product.name in self.catalog.products}
+
+
+class InvalidatingTeller(Teller):
+    """Invalidates its pricing right after the async checkout has found every price."""
+
+    def __init__(self, catalog):
+        super().__init__(catalog)
+        self.lookups = 0
+
+    def promotions_on(self, day):
+        snapshot = super().promotions_on(day)
+        self.lookups += 1
+        if self.lookups == 2:
+            self.invalidate_pricing()
+        return snapshot
+
+
+class AsyncCheckoutTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = FakeCatalog(ProductRegistry())
+        self.products = [Product(f"item{i}", ProductUnit.EACH) for i in range(6)]
+        self.catalog.add_products((product, Decimal(f"{i + 1}.50")) for i, product in enumerate(self.products))
+        self.service = FakePriceService(self.catalog)
+        self.client = BatchingPriceClient(self.service.fetch_prices, window=0.005)
+
+    def test_concurrent_lookups_are_coalesced_into_one_request(self):
+        first, second, third = self.products[:3]
+
+        async def look_up():
+            return await asyncio.gather(
+                self.client.unit_prices([first, second]),
+                self.client.unit_prices([second, third]),
+                self.client.unit_price(third),
+            )
+
+        results = asyncio.run(look_up())
+
+        self.assertEqual(
+            [{first: Decimal("1.50"), second: Decimal("2.50")}, {second: Decimal("2.50"), third: Decimal("3.50")},
+             Decimal("3.50")],
+            results,
+        )
+        self.assertEqual([["item0", "item1", "item2"]], self.service.requests)
+        self.assertEqual((5, 1), (self.client.lookups, self.client.requests))
+
+    def test_full_batches_are_sent_without_waiting_for_the_window(self):
+        client = BatchingPriceClient(self.service.fetch_prices, window=60, max_batch=2)
+
+        async def look_up():
+            return await asyncio.wait_for(
+                asyncio.gather(client.unit_prices(self.products[:2]), client.unit_prices(self.products[2:4])), 5
+            )
+
+        asyncio.run(look_up())
+
+        self.assertEqual([["item0", "item1"], ["item2", "item3"]], self.service.requests)
+
+    def test_unknown_products_fail_only_their_callers(self):
+        unknown = Product("unknown", ProductUnit.EACH)
+
+        async def look_up():
+            return await asyncio.gather(
+                self.client.unit_price(unknown), self.client.unit_price(self.products[0]), return_exceptions=True
+            )
+
+        missing, price = asyncio.run(look_up())
+
+        self.assertIsInstance(missing, KeyError)
+        self.assertEqual(Decimal("1.50"), price)
+
+    def test_async_checkouts_match_sync_receipts_with_one_request(self):
+        sync_teller = Teller(self.catalog)
+        async_teller = Teller(self.client)
+        for teller in (sync_teller, async_teller):
+            teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, self.products[0], None)
+            teller.add_bundle_offer({self.products[1]: 1, self.products[2]: 1}, discount_percent=20)
+        carts = []
+        for i in range(5):
+            cart = ShoppingCart()
+            cart.add_item_quantity(self.products[0], 3 + i)
+            cart.add_item_quantity(self.products[1 + i % 2], 1)
+            cart.add_item_quantity(self.products[2 + i % 4], 2)
+            carts.append(cart)
+
+        async def check_out():
+            return await asyncio.gather(*(async_teller.checks_out_articles_from_async(cart) for cart in carts))
+
+        receipts = asyncio.run(check_out())
+
+        self.assertEqual(
+            [sync_teller.checks_out_articles_from(cart).total_price() for cart in carts],
+            [receipt.total_price() for receipt in receipts],
+        )
+        self.assertEqual(1, len(self.service.requests))
+
+    def test_service_errors_reach_every_waiting_caller(self):
+        async def failing_fetch(products):
+            raise ConnectionError("price service unavailable")
+
+        client = BatchingPriceClient(failing_fetch)
+
+        async def look_up():
+            return await asyncio.gather(
+                client.unit_price(self.products[0]), client.unit_price(self.products[1]), return_exceptions=True
+            )
+
+        self.assertTrue(all(isinstance(result, ConnectionError) for result in asyncio.run(look_up())))
+
+    def test_checkout_prices_against_the_table_it_filled(self):
+        teller = InvalidatingTeller(self.client)
+        cart = ShoppingCart()
+        cart.add_item_quantity(self.products[0], 2)
+
+        receipt = asyncio.run(teller.checks_out_articles_from_async(cart))
+
+        self.assertEqual(Decimal("3.00"), receipt.total_price())
+        self.assertEqual(1, len(self.service.requests))
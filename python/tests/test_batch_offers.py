@@ -0,0 +1,57 @@
+import random
+import unittest
+
+from fixed_point import AMOUNT_SCALE, PERCENT_SCALE, PRICE_SCALE, QUANTITY_SCALE, from_fixed
+from model_objects import Offer, Product, ProductUnit, SpecialOfferType
+from offer_calculator import OfferCalculator
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+if np is not None:
+    from batch_offers import batch_discounts
+
+
+@unittest.skipUnless(np is not None, "numpy is not installed")
+class BatchOffersTest(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(1114)
+        self.calculator = OfferCalculator()
+        self.product = Product("toothpaste", ProductUnit.EACH)
+
+    def random_corpus(self, size, kilo=False):
+        if kilo:
+            quantities = [self.rng.randint(1, 5000) for _ in range(size)]
+        else:
+            quantities = [self.rng.randint(0, 40) * QUANTITY_SCALE for _ in range(size)]
+        unit_prices = [self.rng.randint(1, 99999) for _ in range(size)]
+        return quantities, unit_prices
+
+    def assert_matches_scalar(self, offer_type, arguments, argument_scale, kilo=False):
+        strategy = self.calculator.strategy_for(offer_type)
+        quantities, unit_prices = self.random_corpus(5000, kilo)
+
+        batch = batch_discounts(strategy, np.array(quantities), np.array(unit_prices), np.array(arguments))
+
+        for quantity, unit_price, argument, amount in zip(quantities, unit_prices, arguments, batch.tolist()):
+            offer_argument = from_fixed(argument, argument_scale) if argument_scale else None
+            offer = Offer(offer_type, self.product, offer_argument)
+            scalar = strategy.calculate(
+                offer, self.product, from_fixed(quantity, QUANTITY_SCALE), from_fixed(unit_price, PRICE_SCALE)
+            )
+            expected = scalar.amount if scalar else 0
+            self.assertEqual(expected, from_fixed(amount, AMOUNT_SCALE))
+
+    def test_three_for_two_matches_scalar_strategy(self):
+        self.assert_matches_scalar(SpecialOfferType.THREE_FOR_TWO, [0] * 5000, None)
+
+    def test_percent_discount_matches_scalar_strategy_on_weighted_products(self):
+        percents = [self.rng.choice([500, 1000, 1250, 2000, 3333]) for _ in range(5000)]
+        self.assert_matches_scalar(SpecialOfferType.TEN_PERCENT_DISCOUNT, percents, PERCENT_SCALE, kilo=True)
+
+    def test_n_for_amount_matches_scalar_strategy(self):
+        amounts = [self.rng.randint(50, 2500) for _ in range(5000)]
+        self.assert_matches_scalar(SpecialOfferType.TWO_FOR_AMOUNT, amounts, PRICE_SCALE)
+        self.assert_matches_scalar(SpecialOfferType.FIVE_FOR_AMOUNT, amounts, PRICE_SCALE)
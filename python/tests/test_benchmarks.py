@@ -0,0 +1,78 @@
+import json
+import tempfile
+import unittest
+from collections import Counter
+from pathlib import Path
+
+from benchmarks import compare_results, run_benchmarks
+from benchmarks.workload import WorkloadSpec, generate_workload, write_csvs
+from csv_loaders import read_bundle_offers, read_catalog, read_coupons, read_offers
+from fake_catalog import FakeCatalog
+from product_registry import ProductRegistry
+from teller import Teller
+
+
+class WorkloadTest(unittest.TestCase):
+    spec = WorkloadSpec(products=500, carts=100, cart_lines=10, bundles=5, coupons=3)
+
+    def test_workloads_are_deterministic_for_a_seed(self):
+        first = generate_workload(self.spec)
+        second = generate_workload(self.spec)
+        other_seed = generate_workload(self.spec._replace(seed=2))
+
+        def names(workload):
+            return [[(p.name, q) for p, q in lines] for lines in workload.carts]
+
+        self.assertEqual(names(first), names(second))
+        self.assertNotEqual(names(first), names(other_seed))
+
+    def test_popularity_follows_the_rank(self):
+        workload = generate_workload(self.spec)
+        picks = Counter(product for lines in workload.carts for product, _ in lines)
+
+        self.assertGreater(picks[workload.products[0]], 10 * picks[workload.products[99]])
+        self.assertEqual(100, len(workload.shopping_carts()))
+        self.assertEqual(100, len(workload.offers))
+
+    def test_csvs_load_back_with_the_loaders(self):
+        workload = generate_workload(self.spec)
+        with tempfile.TemporaryDirectory() as tmp:
+            data_dir = Path(tmp)
+            write_csvs(workload, data_dir)
+            catalog = FakeCatalog(ProductRegistry())
+            read_catalog(data_dir / "catalog.csv", catalog)
+            teller = Teller(catalog)
+            read_offers(data_dir / "offers.csv", teller, catalog)
+            bundles = read_bundle_offers(data_dir / "bundles.csv", teller, catalog)
+            coupons = read_coupons(data_dir / "coupons.csv", catalog)
+
+        self.assertEqual(500, len(catalog.products))
+        self.assertEqual(100, len(teller.offers))
+        self.assertEqual(len(workload.bundles), bundles)
+        self.assertEqual(3, len(coupons))
+        product = workload.products[7]
+        self.assertEqual(workload.prices[product], catalog.unit_price(catalog.products[product.name]))
+
+
+class BenchmarkRunnerTest(unittest.TestCase):
+    def test_results_are_written_as_json_and_compared(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = Path(tmp) / "run.json"
+            run_benchmarks.main(
+                ["--sizes", "50", "--repeat", "1", "--carts", "5", "--cart-lines", "4", "--output", str(output)]
+            )
+            document = json.loads(output.read_text(encoding="utf-8"))
+
+            self.assertEqual(
+                ["checkout", "plan_selection", "greedy_plans", "print_receipt", "csv_loaders"],
+                [result["case"] for result in document["results"]],
+            )
+            self.assertTrue(all(result["products"] == 50 for result in document["results"]))
+            self.assertEqual(5, document["workload"]["carts"])
+
+            slower = json.loads(json.dumps(document))
+            slower["results"][0]["best_per_op_us"] *= 2
+            rows, regressions = compare_results.compare(document, slower, threshold=0.5)
+
+            self.assertEqual(5, len(rows))
+            self.assertEqual([("checkout", 50)], [row[:2] for row in regressions])
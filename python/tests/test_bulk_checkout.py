@@ -0,0 +1,206 @@
+import io
+import json
+import unittest
+from datetime import date
+from decimal import Decimal
+
+from bulk_checkout import JsonLinesReceiptWriter, iter_cart_records, iter_cart_rows, run_bulk_checkout
+from model_objects import LoyaltyAccount, Product, ProductUnit, SpecialOfferType
+from shopping_cart import ShoppingCart
+from teller import CheckoutRequest, Teller
+from fake_catalog import FakeCatalog
+
+
+class BulkCheckoutTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = FakeCatalog()
+        self.teller = Teller(self.catalog)
+        self.toothbrush = self.add_product("toothbrush", ProductUnit.EACH, 0.99)
+        self.toothpaste = self.add_product("toothpaste", ProductUnit.EACH, 1.79)
+        self.apples = self.add_product("apples", ProductUnit.KILO, 1.99)
+        self.teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, self.toothbrush, None)
+        self.teller.add_special_offer(SpecialOfferType.TEN_PERCENT_DISCOUNT, self.apples, 20.0)
+        self.teller.add_bundle_offer({self.toothbrush: 1, self.toothpaste: 1})
+
+    def add_product(self, name, unit, price):
+        product = Product(name, unit)
+        self.catalog.add_product(product, price)
+        return product
+
+    def build_carts(self, count):
+        carts = []
+        for i in range(count):
+            cart = ShoppingCart()
+            cart.add_item_quantity(self.toothbrush, 1 + i % 4)
+            if i % 2:
+                cart.add_item_quantity(self.toothpaste, 1 + i % 3)
+            cart.add_item_quantity(self.apples, Decimal("0.5") * (1 + i % 5))
+            carts.append(cart)
+        return carts
+
+    def price_stream(self, stream, input_format, processes=None):
+        coupon = self.teller.create_coupon(
+            self.toothpaste, 1, 1, 50, date(2025, 11, 13), date(2025, 11, 15), "toothpaste coupon"
+        )
+        records = iter_cart_records(iter_cart_rows(stream, input_format), self.catalog, [coupon])
+        output = io.StringIO()
+        summary = run_bulk_checkout(
+            self.teller, records, JsonLinesReceiptWriter(output), date(2025, 11, 14), processes, chunksize=1
+        )
+        return summary, [json.loads(line) for line in output.getvalue().splitlines()]
+
+    def test_checkout_many_in_process_matches_single_checkouts(self):
+        carts = self.build_carts(6)
+        checkout_date = date(2025, 11, 14)
+
+        receipts = self.teller.checkout_many(carts, checkout_date=checkout_date)
+
+        expected = [self.teller.checks_out_articles_from(cart, checkout_date=checkout_date) for cart in carts]
+        self.assertEqual([r.total_price() for r in expected], [r.total_price() for r in receipts])
+
+    def test_checkout_many_with_process_pool_keeps_input_order(self):
+        carts = self.build_carts(20)
+        checkout_date = date(2025, 11, 14)
+
+        receipts = self.teller.checkout_many(carts, checkout_date=checkout_date, processes=2, chunksize=3)
+
+        expected = self.teller.checkout_many(carts, checkout_date=checkout_date)
+        self.assertEqual(len(carts), len(receipts))
+        self.assertEqual([r.total_price() for r in expected], [r.total_price() for r in receipts])
+        self.assertEqual(
+            [[d.description for d in r.discounts] for r in expected],
+            [[d.description for d in r.discounts] for r in receipts],
+        )
+
+    def test_checkout_many_with_process_pool_rejects_shared_coupon(self):
+        coupon = self.teller.create_coupon(
+            self.toothpaste, 1, 1, 50, date(2025, 11, 13), date(2025, 11, 15)
+        )
+        self.teller.use_coupon(coupon)
+
+        with self.assertRaises(ValueError):
+            self.teller.checkout_many(self.build_carts(2), processes=2)
+
+    def test_iter_checkouts_settles_loyalty_and_coupons_from_workers(self):
+        checkout_date = date(2025, 11, 14)
+
+        def requests():
+            free_apples = [
+                self.teller.create_coupon(self.apples, 1, 1, 100, date(2025, 11, 13), date(2025, 11, 15))
+                for _ in range(6)
+            ]
+            return [
+                CheckoutRequest(cart, LoyaltyAccount(100), 50, (coupon,))
+                for cart, coupon in zip(self.build_carts(6), free_apples)
+            ]
+
+        in_process = requests()
+        in_workers = requests()
+        expected = list(self.teller.iter_checkouts(in_process, checkout_date))
+        receipts = list(self.teller.iter_checkouts(in_workers, checkout_date, processes=2, chunksize=2))
+
+        self.assertEqual([r.total_price() for r in expected], [r.total_price() for r in receipts])
+        self.assertEqual(
+            [r.loyalty_account.points for r in in_process], [r.loyalty_account.points for r in in_workers]
+        )
+        self.assertEqual(
+            [r.coupons[0].redeemed for r in in_process], [r.coupons[0].redeemed for r in in_workers]
+        )
+        self.assertTrue(any(r.coupons[0].redeemed for r in in_workers))
+
+    def test_an_account_shared_by_carts_in_workers_is_debited_as_in_process(self):
+        checkout_date = date(2025, 11, 14)
+        accounts = [LoyaltyAccount(100), LoyaltyAccount(100)]
+        receipts = {}
+        for processes, account in zip((None, 2), accounts):
+            requests = [CheckoutRequest(cart, account, 10000) for cart in self.build_carts(4)]
+            receipts[processes] = list(self.teller.checkout_many(requests, checkout_date, processes, chunksize=1))
+
+        self.assertEqual(accounts[0].points, accounts[1].points)
+        self.assertEqual(
+            [(r.points_redeemed, r.points_earned, r.total_price()) for r in receipts[None]],
+            [(r.points_redeemed, r.points_earned, r.total_price()) for r in receipts[2]],
+        )
+        # Later carts spend the points earned by the earlier ones.
+        self.assertEqual(100, receipts[None][0].points_redeemed)
+        self.assertGreater(sum(r.points_redeemed for r in receipts[None]), 100)
+
+    def test_csv_lines_are_grouped_by_cart_id(self):
+        stream = io.StringIO(
+            "cart_id,name,quantity,loyalty_points,points_to_redeem,coupons\n"
+            "a,toothbrush,3,100,50,\n"
+            "a,toothpaste,3,,,toothpaste coupon\n"
+            "b,apples,1.5,,,\n"
+        )
+
+        for processes in (None, 2):
+            with self.subTest(processes=processes):
+                stream.seek(0)
+                summary, documents = self.price_stream(stream, "csv", processes)
+
+                self.assertEqual(["a", "b"], [d["cart_id"] for d in documents])
+                self.assertEqual(
+                    {"3 for 2", "toothpaste coupon 50% off"}, {d["description"] for d in documents[0]["discounts"]}
+                )
+                self.assertEqual(50, documents[0]["points_redeemed"])
+                self.assertEqual(100 - 50 + documents[0]["points_earned"], documents[0]["loyalty_balance"])
+                self.assertIsNone(documents[1]["loyalty_balance"])
+                self.assertEqual(2, summary.carts)
+                self.assertEqual(sum(Decimal(d["total"]) for d in documents), summary.total)
+
+    def test_json_lines_match_csv(self):
+        csv_summary, csv_documents = self.price_stream(
+            io.StringIO("cart_id,name,quantity\nx,toothbrush,4\nx,apples,2\ny,toothpaste,2\n"), "csv"
+        )
+        jsonl_summary, jsonl_documents = self.price_stream(
+            io.StringIO(
+                '{"cart_id": "x", "name": "toothbrush", "quantity": 4}\n'
+                '{"cart_id": "x", "name": "apples", "quantity": "2"}\n'
+                "\n"
+                '{"cart_id": "y", "name": "toothpaste", "quantity": 2}\n'
+            ),
+            "jsonl",
+        )
+
+        self.assertEqual(csv_summary, jsonl_summary)
+        self.assertEqual(csv_documents, jsonl_documents)
+
+    def test_unknown_products_and_coupons_are_reported_with_their_cart(self):
+        for line, message in [("z,caviar,1,", "caviar"), ("z,toothbrush,1,free lunch", "free lunch")]:
+            with self.subTest(line=line):
+                stream = io.StringIO(f"cart_id,name,quantity,coupons\n{line}\n")
+                with self.assertRaisesRegex(ValueError, f"{message}.*cart z"):
+                    self.price_stream(stream, "csv")
+
+    def test_an_explicit_zero_points_to_redeem_is_kept(self):
+        stream = io.StringIO(
+            "cart_id,name,quantity,loyalty_points,points_to_redeem,coupons\n"
+            "a,toothbrush,1,100,0,\n"
+            "a,apples,1,,50,\n"
+        )
+
+        _, documents = self.price_stream(stream, "csv")
+
+        self.assertEqual(0, documents[0]["points_redeemed"])
+
+    def test_coupons_sharing_a_description_are_reported(self):
+        valid = (date(2025, 11, 13), date(2025, 11, 15))
+        coupons = [
+            self.teller.create_coupon(self.toothpaste, 1, 1, 50, *valid, "toothpaste coupon"),
+            self.teller.create_coupon(self.apples, 1, 1, 50, *valid, "toothpaste coupon"),
+        ]
+        rows = iter_cart_rows(io.StringIO("cart_id,name,quantity\na,toothpaste,2\n"))
+
+        with self.assertRaisesRegex(ValueError, "Duplicate coupon description 'toothpaste coupon'"):
+            list(iter_cart_records(rows, self.catalog, coupons))
+
+    def test_a_coupon_named_twice_in_a_cart_is_reported(self):
+        lines = [
+            "a,toothpaste,2,toothpaste coupon;toothpaste coupon",
+            "a,toothpaste,2,toothpaste coupon\na,toothbrush,1,toothpaste coupon",
+        ]
+        for line in lines:
+            with self.subTest(line=line):
+                stream = io.StringIO(f"cart_id,name,quantity,coupons\n{line}\n")
+                with self.assertRaisesRegex(ValueError, "Duplicate coupon 'toothpaste coupon' in cart a"):
+                    self.price_stream(stream, "csv")
@@ -86,3 +86,19 @@ class BundleOfferTest(unittest.TestCase):
         expected_total = Decimal("7.49") + Decimal("0.99")
         self.assert_money_equal(expected_total, receipt.total_price())
         self.assertEqual(1, len(receipt.discounts))
+
+    def test_only_bundles_fully_present_in_cart_are_candidates(self):
+        toothbrush = self.add_product("toothbrush", ProductUnit.EACH, 0.99)
+        toothpaste = self.add_product("toothpaste", ProductUnit.EACH, 1.79)
+        floss = self.add_product("floss", ProductUnit.EACH, 2.49)
+        for i in range(200):
+            other = self.add_product(f"other {i}", ProductUnit.EACH, 1.00)
+            self.teller.add_bundle_offer({other: 1, floss: 1})
+        self.teller.add_bundle_offer({toothbrush: 1, toothpaste: 1}, discount_percent=10)
+        self.teller.add_bundle_offer({toothbrush: 1, floss: 1}, discount_percent=20)
+
+        candidates = self.teller.bundle_offers_for({toothbrush: 1, toothpaste: 1, floss: 1})
+
+        self.assertEqual([Decimal("10"), Decimal("20")], [b.discount_percent for b in candidates])
+        receipt = self.build_receipt([(toothbrush, 1), (toothpaste, 1)])
+        self.assertEqual(1, len(receipt.discounts))
@@ -0,0 +1,114 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+from catalog_snapshot import SOURCE_FILES, build_snapshot, load_snapshot, stale_sources, verify_snapshot
+from fake_catalog import FakeCatalog
+from model_objects import ProductUnit, SpecialOfferType
+from product_registry import ProductRegistry
+from teller import Teller
+
+_DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+
+
+class CatalogSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.data_dir = Path(self._tmp.name)
+        for name in SOURCE_FILES:
+            shutil.copy(_DATA_DIR / name, self.data_dir / name)
+        self.snapshot_path = self.data_dir / "catalog.snapshot"
+        build_snapshot(self.data_dir, self.snapshot_path)
+
+    def _load(self):
+        catalog = FakeCatalog(ProductRegistry())
+        teller = Teller(catalog)
+        coupons = load_snapshot(self.snapshot_path, catalog, teller)
+        return catalog, teller, coupons
+
+    def test_snapshot_loads_what_the_csvs_contain(self):
+        catalog, teller, coupons = self._load()
+
+        apples = catalog.products["apples"]
+        self.assertEqual(ProductUnit.KILO, apples.unit)
+        self.assertEqual(Decimal("1.99"), catalog.unit_price(apples))
+        self.assertEqual("1.50", str(catalog.unit_price(catalog.products["milk"])))
+        self.assertEqual(SpecialOfferType.FIVE_FOR_AMOUNT, teller.offers[catalog.products["toothpaste"]].offer_type)
+        self.assertEqual(7.49, teller.offers[catalog.products["toothpaste"]].argument)
+        self.assertEqual(Decimal("10"), teller.bundle_offers[0].discount_percent)
+        self.assertEqual(
+            {catalog.products["toothbrush"]: Decimal("1"), catalog.products["toothpaste"]: Decimal("1")},
+            teller.bundle_offers[0].items_required,
+        )
+        self.assertEqual(["orange juice coupon"], [coupon.description for coupon in coupons])
+        self.assertEqual([], verify_snapshot(self.snapshot_path, self.data_dir))
+
+    def test_offer_and_bundle_validity_dates_are_kept(self):
+        (self.data_dir / "offers.csv").write_text(
+            "name,offer,argument,valid_from,valid_to\n"
+            "toothbrush,THREE_FOR_TWO,,2025-11-10,2025-11-16\n"
+            "apples,TEN_PERCENT_DISCOUNT,20,,\n",
+            encoding="utf-8",
+        )
+        (self.data_dir / "bundles.csv").write_text(
+            "bundle_name,discount_percent,items,valid_from,valid_to\nweekly,10,toothbrush:1;toothpaste:1,,2025-11-16\n",
+            encoding="utf-8",
+        )
+        build_snapshot(self.data_dir, self.snapshot_path)
+
+        catalog, teller, _ = self._load()
+
+        toothbrush = catalog.products["toothbrush"]
+        self.assertEqual(
+            [(date(2025, 11, 10), date(2025, 11, 16)), (None, None)],
+            [(offer.valid_from, offer.valid_to) for offer in teller.all_offers],
+        )
+        self.assertIn(toothbrush, teller.promotions_on(date(2025, 11, 12)).offers)
+        self.assertNotIn(toothbrush, teller.promotions_on(date(2025, 11, 17)).offers)
+        bundle_offer = teller.bundle_offers[0]
+        self.assertEqual((None, date(2025, 11, 16)), (bundle_offer.valid_from, bundle_offer.valid_to))
+        self.assertEqual([], verify_snapshot(self.snapshot_path, self.data_dir))
+
+    def test_touching_a_source_without_changing_it_keeps_the_snapshot(self):
+        offers = self.data_dir / "offers.csv"
+        stat = offers.stat()
+        os.utime(offers, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+
+        self.assertEqual([], stale_sources(self.snapshot_path, self.data_dir))
+
+    def test_changed_sources_make_the_snapshot_stale(self):
+        offers = self.data_dir / "offers.csv"
+        content = offers.read_text(encoding="utf-8")
+        stat = offers.stat()
+        offers.write_text(content.replace("7.49", "7.99"), encoding="utf-8")
+        os.utime(offers, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+        (self.data_dir / "coupons.csv").unlink()
+
+        self.assertEqual(["offers.csv", "coupons.csv"], stale_sources(self.snapshot_path, self.data_dir))
+        self.assertEqual(
+            ["offers.csv changed since the snapshot was built", "coupons.csv changed since the snapshot was built"],
+            verify_snapshot(self.snapshot_path, self.data_dir),
+        )
+
+    def test_missing_sources_are_recorded_and_stay_missing(self):
+        (self.data_dir / "bundles.csv").unlink()
+        build_snapshot(self.data_dir, self.snapshot_path)
+
+        catalog, teller, _ = self._load()
+
+        self.assertEqual([], teller.bundle_offers)
+        self.assertEqual(7, len(catalog.products))
+        self.assertEqual([], stale_sources(self.snapshot_path, self.data_dir))
+
+    def test_missing_snapshot_is_stale_and_foreign_files_are_rejected(self):
+        self.snapshot_path.unlink()
+        self.assertEqual(list(SOURCE_FILES), stale_sources(self.snapshot_path, self.data_dir))
+
+        self.snapshot_path.write_bytes(b"name,unit,price\n")
+        with self.assertRaises(ValueError):
+            self._load()
@@ -0,0 +1,131 @@
+import multiprocessing
+import pickle
+import sys
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from decimal import Decimal
+
+from fake_catalog import FakeCatalog
+from model_objects import Product, ProductUnit, SpecialOfferType
+from shopping_cart import ShoppingCart
+from teller import Teller
+
+CHECKOUT_DATE = date(2025, 11, 14)
+LANES = 8
+
+
+class ConcurrentCheckoutTest(unittest.TestCase):
+    def setUp(self):
+        # Switch threads as often as possible, so that races show up within a short test.
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.addCleanup(sys.setswitchinterval, switch_interval)
+        self.catalog = FakeCatalog()
+        self.teller = Teller(self.catalog)
+        self.toothbrush = self.add_product("toothbrush", ProductUnit.EACH, 0.99)
+        self.toothpaste = self.add_product("toothpaste", ProductUnit.EACH, 1.79)
+        self.apples = self.add_product("apples", ProductUnit.KILO, 1.99)
+        self.rice = self.add_product("rice", ProductUnit.EACH, 2.49)
+        self.teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, self.toothbrush, None)
+        self.teller.add_special_offer(SpecialOfferType.TEN_PERCENT_DISCOUNT, self.apples, 20.0)
+        self.teller.add_bundle_offer({self.toothbrush: 1, self.toothpaste: 1})
+
+    def add_product(self, name, unit, price):
+        product = Product(name, unit)
+        self.catalog.add_product(product, price)
+        return product
+
+    def build_carts(self, count):
+        carts = []
+        for i in range(count):
+            cart = ShoppingCart()
+            cart.add_item_quantity(self.toothbrush, 1 + i % 4)
+            cart.add_item_quantity(self.toothpaste, 1 + i % 3)
+            cart.add_item_quantity(self.apples, Decimal("0.5") * (1 + i % 5))
+            carts.append(cart)
+        return carts
+
+    def check_out_in_lanes(self, carts):
+        with ThreadPoolExecutor(LANES) as lanes:
+            return list(lanes.map(lambda cart: self.teller.checks_out_articles_from(cart, CHECKOUT_DATE), carts))
+
+    def test_concurrent_lanes_price_like_a_single_lane(self):
+        carts = self.build_carts(200)
+        expected = [self.teller.checks_out_articles_from(cart, CHECKOUT_DATE) for cart in carts]
+
+        receipts = self.check_out_in_lanes(carts)
+
+        self.assertEqual([r.total_price() for r in expected], [r.total_price() for r in receipts])
+        self.assertEqual(
+            [[d.description for d in r.discounts] for r in expected],
+            [[d.description for d in r.discounts] for r in receipts],
+        )
+
+    def test_each_wallet_coupon_is_used_once(self):
+        coupons = [
+            self.teller.create_coupon(self.toothpaste, 1, 1, 50, date(2025, 11, 1), date(2025, 11, 30), f"coupon {i}")
+            for i in range(30)
+        ]
+        self.teller.use_coupons(coupons)
+
+        receipts = self.check_out_in_lanes(self.build_carts(120))
+
+        used = [d.description for r in receipts for d in r.discounts if d.description.startswith("coupon ")]
+        self.assertEqual(len(used), len(set(used)))
+        self.assertEqual(30, len(used))
+        self.assertTrue(all(coupon.redeemed for coupon in coupons))
+
+    def test_promotions_can_change_while_lanes_check_out(self):
+        carts = self.build_carts(150)
+        done = threading.Event()
+        totals_seen = set()
+
+        def change_promotions():
+            percent = 0
+            while not done.is_set():
+                percent = percent % 50 + 1
+                self.teller.add_special_offer(SpecialOfferType.TEN_PERCENT_DISCOUNT, self.rice, percent)
+                self.teller.invalidate_pricing()
+                rice_cart = ShoppingCart()
+                rice_cart.add_item_quantity(self.rice, 1)
+                totals_seen.add(self.teller.checks_out_articles_from(rice_cart, CHECKOUT_DATE).total_price())
+
+        writer = threading.Thread(target=change_promotions)
+        writer.start()
+        try:
+            receipts = self.check_out_in_lanes(carts)
+        finally:
+            done.set()
+            writer.join()
+
+        # Rice is in none of the lanes' carts, so their prices do not depend on the changing offer.
+        expected = self.check_out_in_lanes(carts)
+        self.assertEqual([r.total_price() for r in expected], [r.total_price() for r in receipts])
+        self.assertGreater(len(totals_seen), 1)
+
+    def test_checkout_many_still_runs_in_worker_processes(self):
+        carts = self.build_carts(8)
+
+        receipts = self.teller.checkout_many(carts, checkout_date=CHECKOUT_DATE, processes=2, chunksize=2)
+
+        expected = [self.teller.checks_out_articles_from(cart, CHECKOUT_DATE) for cart in carts]
+        self.assertEqual([r.total_price() for r in expected], [r.total_price() for r in receipts])
+
+    def test_checkout_many_spawns_workers_after_checkouts_have_built_snapshots(self):
+        carts = self.build_carts(4)
+        expected = [self.teller.checks_out_articles_from(cart, CHECKOUT_DATE) for cart in carts]
+
+        spawn = multiprocessing.get_context("spawn")
+        receipts = self.teller.checkout_many(carts, CHECKOUT_DATE, processes=1, chunksize=2, mp_context=spawn)
+
+        self.assertEqual([r.total_price() for r in expected], [r.total_price() for r in receipts])
+        snapshot = self.teller.promotions_on(CHECKOUT_DATE)
+        copy = pickle.loads(pickle.dumps(snapshot))
+        self.assertEqual(sorted(p.name for p in snapshot.offers), sorted(p.name for p in copy.offers))
+        self.assertEqual(snapshot.version, copy.version)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,12 +2,24 @@ import unittest
 from datetime import date
 from decimal import Decimal, ROUND_HALF_UP
 
+from discount_optimizer import DiscountPlanOptimizer
 from model_objects import Product, ProductUnit
+from offer_calculator import OfferCalculator
 from shopping_cart import ShoppingCart
 from teller import Teller
 from fake_catalog import FakeCatalog
 
 
+class CountingOfferCalculator(OfferCalculator):
+    def __init__(self):
+        super().__init__()
+        self.coupon_evaluations = 0
+
+    def compute_coupon_discount(self, *args, **kwargs):
+        self.coupon_evaluations += 1
+        return super().compute_coupon_discount(*args, **kwargs)
+
+
 class CouponTest(unittest.TestCase):
     def setUp(self):
         self.catalog = FakeCatalog()
@@ -95,3 +107,88 @@ class CouponTest(unittest.TestCase):
         self.assert_money_equal(expected_total, receipt.total_price())
         self.assertEqual(1, len(receipt.discounts))
         self.assertIn("orange juice coupon", receipt.discounts[0].description)
+
+    def test_best_subset_of_a_coupon_wallet_is_redeemed(self):
+        juice = self.add_product("orange juice", ProductUnit.EACH, 1.50)
+        checkout_date = date(2025, 11, 14)
+        valid = (date(2025, 11, 13), date(2025, 11, 15))
+        # Taken first in wallet order, the greedy plans would spend all six units on this coupon.
+        whole_cart = self.teller.create_coupon(juice, 5, 1, 100, *valid, description="sixth juice free")
+        half_price = self.teller.create_coupon(juice, 2, 2, 50, *valid, description="juice half price")
+        second_free = self.teller.create_coupon(juice, 1, 1, 100, *valid, description="second juice free")
+        self.teller.use_coupon(whole_cart)
+
+        receipt = self.teller.checks_out_articles_from(
+            self._cart([(juice, 6)]), checkout_date=checkout_date, coupons=[half_price, second_free]
+        )
+
+        self.assert_money_equal(Decimal("6.00"), receipt.total_price())
+        self.assertEqual(2, len(receipt.discounts))
+        self.assertEqual([False, True, True], [c.redeemed for c in (whole_cart, half_price, second_free)])
+
+    def test_irrelevant_coupons_are_pruned_before_the_search(self):
+        juice = self.add_product("orange juice", ProductUnit.EACH, 1.50)
+        others = [self.add_product(f"product {i}", ProductUnit.EACH, 1.00) for i in range(30)]
+        valid = (date(2025, 11, 13), date(2025, 11, 15))
+        wallet = [self.teller.create_coupon(product, 1, 1, 50, *valid) for product in others]
+        wallet += [self.teller.create_coupon(juice, 12, 1, 50, *valid) for _ in range(10)]
+        wallet += [self.teller.create_coupon(juice, 1, 1, 50, date(2025, 10, 1), date(2025, 10, 31)) for _ in range(10)]
+        usable = self.teller.create_coupon(juice, 1, 1, 100, *valid, description="second juice free")
+        wallet.append(usable)
+        # A budget this small only holds when the 50 unusable coupons never reach the search.
+        optimizer = DiscountPlanOptimizer(node_budget=10)
+
+        plan = optimizer.solve(
+            {juice: Decimal("2")}, [], wallet, self.teller.pricing_table, date(2025, 11, 14), OfferCalculator()
+        )
+
+        self.assertIsNotNone(plan)
+        self.assertEqual((usable,), plan.coupons_used)
+        self.assert_money_equal(Decimal("1.50"), plan.savings)
+
+    def test_greedy_fallback_applies_every_coupon_that_fits(self):
+        juice = self.add_product("orange juice", ProductUnit.EACH, 1.50)
+        valid = (date(2025, 11, 13), date(2025, 11, 15))
+        teller = Teller(self.catalog, plan_optimizer=DiscountPlanOptimizer(node_budget=0))
+        teller.use_coupons([
+            teller.create_coupon(juice, 2, 2, 50, *valid),
+            teller.create_coupon(juice, 1, 1, 100, *valid),
+        ])
+
+        receipt = teller.checks_out_articles_from(self._cart([(juice, 6)]), checkout_date=date(2025, 11, 14))
+
+        self.assert_money_equal(Decimal("6.00"), receipt.total_price())
+        self.assertTrue(all(coupon.redeemed for coupon in teller.coupons))
+
+    def test_use_coupon_replaces_the_wallet_and_none_empties_it(self):
+        juice = self.add_product("orange juice", ProductUnit.EACH, 1.50)
+        valid = (date(2025, 11, 13), date(2025, 11, 15))
+        first, second, third = (self.teller.create_coupon(juice, 1, 1, 50, *valid) for _ in range(3))
+
+        self.teller.use_coupons([first, second])
+        self.teller.use_coupon(third)
+        self.assertEqual([third], self.teller.coupons)
+
+        self.teller.use_coupon(None)
+        receipt = self.checkout_with_date([(juice, 2)], date(2025, 11, 14))
+        self.assertEqual([], self.teller.coupons)
+        self.assertEqual([], list(receipt.discounts))
+
+    def test_coupon_combinations_stop_at_the_node_budget(self):
+        juice = self.add_product("orange juice", ProductUnit.EACH, 1.50)
+        valid = (date(2025, 11, 13), date(2025, 11, 15))
+        wallet = [self.teller.create_coupon(juice, 1 + i % 4, 1 + i % 6, 10 + i, *valid) for i in range(60)]
+        calculator = CountingOfferCalculator()
+
+        plan = DiscountPlanOptimizer(node_budget=2000).solve(
+            {juice: Decimal("200")}, [], wallet, self.teller.pricing_table, date(2025, 11, 14), calculator
+        )
+
+        self.assertIsNone(plan)
+        self.assertLessEqual(calculator.coupon_evaluations, 2000)
+
+    def _cart(self, items):
+        cart = ShoppingCart()
+        for product, quantity in items:
+            cart.add_item_quantity(product, quantity)
+        return cart
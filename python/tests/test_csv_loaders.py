@@ -0,0 +1,86 @@
+import tempfile
+import unittest
+from decimal import Decimal
+from pathlib import Path
+
+from csv_loaders import iter_catalog_batches, read_bundle_offers, read_catalog, read_coupons, read_offers
+from fake_catalog import FakeCatalog
+from model_objects import ProductUnit, SpecialOfferType
+from product_registry import ProductRegistry
+from teller import Teller
+
+
+class CsvLoadersTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.data_dir = Path(self._tmp.name)
+        self.catalog = FakeCatalog(ProductRegistry())
+        self.catalog_file = self._write(
+            "catalog.csv",
+            "name,unit,price\n" + "".join(f"item{i},EACH,{i}.25\n" for i in range(7)),
+        )
+
+    def _write(self, name, content):
+        path = self.data_dir / name
+        path.write_text(content, encoding="utf-8")
+        return path
+
+    def test_catalog_is_parsed_in_batches(self):
+        batches = list(iter_catalog_batches(self.catalog_file, batch_size=3))
+
+        self.assertEqual([3, 3, 1], [len(batch) for batch in batches])
+        product, price = batches[2][0]
+        self.assertEqual("item6", product.name)
+        self.assertEqual(ProductUnit.EACH, product.unit)
+        self.assertEqual(Decimal("6.25"), price)
+
+    def test_progress_is_reported_after_each_batch(self):
+        reports = []
+
+        read_catalog(self.catalog_file, self.catalog, batch_size=3, progress=reports.append)
+
+        self.assertEqual([3, 6, 7], [report.rows for report in reports])
+        total_bytes = self.catalog_file.stat().st_size
+        self.assertEqual(total_bytes, reports[-1].bytes_read)
+        self.assertTrue(all(report.total_bytes == total_bytes for report in reports))
+        self.assertEqual(Decimal("4.25"), self.catalog.unit_price(self.catalog.products["item4"]))
+
+    def test_batch_size_does_not_change_what_is_loaded(self):
+        read_catalog(self.catalog_file, self.catalog, batch_size=2)
+        offers_file = self._write("offers.csv", "name,offer,argument\nitem1,TEN_PERCENT_DISCOUNT,10\nitem2,THREE_FOR_TWO,\n")
+        bundles_file = self._write("bundles.csv", "bundle_name,discount_percent,items\npair,15,item1:1;item2:2\nempty,10,\n")
+        coupons_file = self._write(
+            "coupons.csv",
+            "name,product,required_qty,discounted_qty,discount_percent,valid_from,valid_to,description\n"
+            "c,item3,2,1,50,2025-11-13,2025-11-15,item3 coupon\n",
+        )
+        teller = Teller(self.catalog)
+
+        read_offers(offers_file, teller, self.catalog, batch_size=1)
+        loaded = read_bundle_offers(bundles_file, teller, self.catalog, batch_size=1)
+        coupons = read_coupons(coupons_file, self.catalog, batch_size=1)
+
+        self.assertEqual(7, len(self.catalog.products))
+        item1, item2 = self.catalog.products["item1"], self.catalog.products["item2"]
+        self.assertEqual(SpecialOfferType.TEN_PERCENT_DISCOUNT, teller.offers[item1].offer_type)
+        self.assertIsNone(teller.offers[item2].argument)
+        self.assertEqual(1, loaded)
+        self.assertEqual({item1: Decimal("1"), item2: Decimal("2")}, teller.bundle_offers[0].items_required)
+        self.assertEqual([teller.bundle_offers[0]], teller.bundle_offers_for({item1: 1, item2: 2}))
+        self.assertEqual(["item3 coupon"], [coupon.description for coupon in coupons])
+
+    def test_bulk_offers_invalidate_the_pricing_table_once_loaded(self):
+        read_catalog(self.catalog_file, self.catalog)
+        teller = Teller(self.catalog)
+        item = self.catalog.products["item1"]
+        stale = teller.pricing_table
+
+        teller.add_special_offers([(SpecialOfferType.TEN_PERCENT_DISCOUNT, item, 10.0)])
+
+        self.assertIsNot(stale, teller.pricing_table)
+        self.assertEqual(SpecialOfferType.TEN_PERCENT_DISCOUNT, teller.pricing_table.entry(item).offer.offer_type)
+
+    def test_batch_size_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            list(iter_catalog_batches(self.catalog_file, batch_size=0))
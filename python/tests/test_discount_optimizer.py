@@ -0,0 +1,136 @@
+import unittest
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+
+from discount_optimizer import DiscountPlanOptimizer
+from model_objects import Product, ProductUnit, SpecialOfferType
+from offer_calculator import OfferCalculator
+from shopping_cart import ShoppingCart
+from teller import Teller
+from fake_catalog import FakeCatalog
+
+
+class DiscountPlanOptimizerTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = FakeCatalog()
+        self.teller = Teller(self.catalog)
+
+    def add_product(self, name, unit, price):
+        product = Product(name, unit)
+        self.catalog.add_product(product, price)
+        return product
+
+    def build_receipt(self, items, teller=None):
+        cart = ShoppingCart()
+        for product, quantity in items:
+            cart.add_item_quantity(product, quantity)
+        return (teller or self.teller).checks_out_articles_from(cart)
+
+    def assert_money_equal(self, expected, actual):
+        expected_dec = Decimal(str(expected)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+        actual_dec = actual.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+        self.assertEqual(expected_dec, actual_dec)
+
+    def test_picks_the_better_of_two_overlapping_bundles(self):
+        toothbrush = self.add_product("toothbrush", ProductUnit.EACH, 1.00)
+        toothpaste = self.add_product("toothpaste", ProductUnit.EACH, 2.00)
+        floss = self.add_product("floss", ProductUnit.EACH, 3.00)
+        self.teller.add_bundle_offer({toothbrush: 1, toothpaste: 1}, discount_percent=10)
+        self.teller.add_bundle_offer({toothpaste: 1, floss: 1}, discount_percent=50)
+
+        receipt = self.build_receipt([(toothbrush, 1), (toothpaste, 1), (floss, 1)])
+
+        self.assertEqual(1, len(receipt.discounts))
+        self.assert_money_equal(Decimal("-2.50"), receipt.discounts[0].discount_amount)
+
+    def test_combines_bundle_with_offer_on_the_leftover_quantity(self):
+        toothbrush = self.add_product("toothbrush", ProductUnit.EACH, 0.99)
+        toothpaste = self.add_product("toothpaste", ProductUnit.EACH, 1.79)
+        self.teller.add_bundle_offer({toothbrush: 1, toothpaste: 1})
+        self.teller.add_special_offer(SpecialOfferType.FIVE_FOR_AMOUNT, toothpaste, 7.49)
+
+        receipt = self.build_receipt([(toothpaste, 6), (toothbrush, 1)])
+
+        expected_total = (Decimal("0.99") + Decimal("1.79")) * Decimal("0.9") + Decimal("7.49")
+        self.assert_money_equal(expected_total, receipt.total_price())
+        self.assertEqual(2, len(receipt.discounts))
+
+    def test_falls_back_to_greedy_plans_when_budget_is_exhausted(self):
+        toothbrush = self.add_product("toothbrush", ProductUnit.EACH, 1.00)
+        toothpaste = self.add_product("toothpaste", ProductUnit.EACH, 2.00)
+        floss = self.add_product("floss", ProductUnit.EACH, 3.00)
+        teller = Teller(self.catalog, plan_optimizer=DiscountPlanOptimizer(node_budget=1))
+        teller.add_bundle_offer({toothbrush: 1, toothpaste: 1}, discount_percent=10)
+        teller.add_bundle_offer({toothpaste: 1, floss: 1}, discount_percent=50)
+
+        receipt = self.build_receipt([(toothbrush, 1), (toothpaste, 1), (floss, 1)], teller)
+
+        # Greedy applies the first bundle in list order and leaves the second one incomplete.
+        self.assert_money_equal(Decimal("-0.30"), receipt.discounts[0].discount_amount)
+
+    def test_greedy_coupon_plan_reuses_the_bundles_its_coupons_leave_alone(self):
+        toothbrush = self.add_product("toothbrush", ProductUnit.EACH, 1.00)
+        toothpaste = self.add_product("toothpaste", ProductUnit.EACH, 2.00)
+        floss = self.add_product("floss", ProductUnit.EACH, 3.00)
+        teller = Teller(self.catalog, plan_optimizer=DiscountPlanOptimizer(node_budget=0))
+        teller.add_bundle_offer({toothbrush: 1, toothpaste: 1}, discount_percent=10)
+        teller.use_coupon(teller.create_coupon(floss, 1, 1, 50, date(2025, 11, 1), date(2025, 11, 30), "floss coupon"))
+        cart = ShoppingCart()
+        for product, quantity in [(toothbrush, 1), (toothpaste, 1), (floss, 2)]:
+            cart.add_item_quantity(product, quantity)
+
+        receipt = teller.checks_out_articles_from(cart, checkout_date=date(2025, 11, 14))
+
+        self.assertEqual(["floss coupon 50% off", "bundle 10% off"], [d.description for d in receipt.discounts])
+        self.assert_money_equal(Decimal("7.20"), receipt.total_price())
+        self.assertEqual({toothbrush: 1, toothpaste: 1, floss: 2}, cart.product_quantities)
+
+    def test_greedy_coupon_first_plan_reapplies_bundles_after_its_coupons(self):
+        toothbrush = self.add_product("toothbrush", ProductUnit.EACH, 1.00)
+        toothpaste = self.add_product("toothpaste", ProductUnit.EACH, 2.00)
+        teller = Teller(self.catalog, plan_optimizer=DiscountPlanOptimizer(node_budget=0))
+        teller.add_bundle_offer({toothbrush: 1, toothpaste: 1}, discount_percent=10)
+        teller.use_coupon(teller.create_coupon(toothpaste, 1, 1, 100, date(2025, 11, 1), date(2025, 11, 30), "free"))
+        cart = ShoppingCart()
+        for product, quantity in [(toothbrush, 1), (toothpaste, 2)]:
+            cart.add_item_quantity(product, quantity)
+
+        receipt = teller.checks_out_articles_from(cart, checkout_date=date(2025, 11, 14))
+
+        # The coupon takes both toothpastes, so the bundle is no longer complete.
+        self.assertEqual(["free 100% off"], [d.description for d in receipt.discounts])
+        self.assert_money_equal(Decimal("3.00"), receipt.total_price())
+
+    def test_every_option_tried_is_charged_to_the_budget(self):
+        toothbrush = self.add_product("toothbrush", ProductUnit.EACH, 1.00)
+        toothpaste = self.add_product("toothpaste", ProductUnit.EACH, 2.00)
+        floss = self.add_product("floss", ProductUnit.EACH, 3.00)
+        teller = Teller(self.catalog, plan_optimizer=DiscountPlanOptimizer(node_budget=2000))
+        teller.add_bundle_offer({toothbrush: 1, toothpaste: 1}, discount_percent=10)
+        teller.add_bundle_offer({toothpaste: 1, floss: 1}, discount_percent=50)
+        # Few states, but each of them tries up to 300 bundle counts.
+        quantities = {toothbrush: Decimal("300"), toothpaste: Decimal("300"), floss: Decimal("300")}
+
+        plan = teller.plan_optimizer.solve(
+            quantities, teller.bundle_offers, None, teller.pricing_table, None, OfferCalculator()
+        )
+        receipt = self.build_receipt(list(quantities.items()), teller)
+
+        self.assertIsNone(plan)
+        # Greedy takes the first bundle 300 times, which leaves no toothpaste for the second one.
+        self.assertEqual(1, len(receipt.discounts))
+        self.assert_money_equal(Decimal("-90.00"), receipt.discounts[0].discount_amount)
+
+    def test_search_stops_at_time_budget(self):
+        products = [self.add_product(f"product {i}", ProductUnit.EACH, 1.00) for i in range(8)]
+        for i, first in enumerate(products):
+            for second in products[i + 1:]:
+                self.teller.add_bundle_offer({first: 1, second: 1}, discount_percent=5 + i)
+        quantities = {product: Decimal("3") for product in products}
+        optimizer = DiscountPlanOptimizer(node_budget=10 ** 9, time_budget=0)
+
+        plan = optimizer.solve(
+            quantities, self.teller.bundle_offers, None, self.teller.pricing_table, None, OfferCalculator()
+        )
+
+        self.assertIsNone(plan)
@@ -0,0 +1,124 @@
+import random
+import unittest
+from datetime import date
+from decimal import Decimal
+
+from model_objects import PricingMode, Product, ProductUnit, SpecialOfferType
+from receipt import Receipt
+from receipt_printer import ReceiptPrinter
+from shopping_cart import ShoppingCart
+from teller import Teller
+from fake_catalog import FakeCatalog
+
+
+class FixedPointPricingTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = FakeCatalog()
+        self.teller = Teller(self.catalog)
+        self.printer = ReceiptPrinter()
+
+    def add_product(self, name, unit, price):
+        product = Product(name, unit)
+        self.catalog.add_product(product, price)
+        return product
+
+    def checkout(self, items, pricing_mode, coupon=None):
+        cart = ShoppingCart(pricing_mode)
+        for product, quantity in items:
+            cart.add_item_quantity(product, quantity)
+        if coupon:
+            coupon.redeemed = False
+        return self.teller.checks_out_articles_from(cart, checkout_date=date(2025, 11, 14))
+
+    def assert_same_receipts(self, items, coupon=None):
+        expected = self.checkout(items, PricingMode.DECIMAL, coupon)
+        actual = self.checkout(items, PricingMode.FIXED_POINT, coupon)
+        self.assertEqual(expected.total_price(), actual.total_price())
+        self.assertEqual(
+            [(d.description, d.amount) for d in expected.discounts],
+            [(d.description, d.amount) for d in actual.discounts],
+        )
+        self.assertEqual(self.printer.print_receipt(expected), self.printer.print_receipt(actual))
+        self.assertEqual([str(item.quantity) for item in expected.items], [str(item.quantity) for item in actual.items])
+
+    def test_each_offer_type_matches_decimal_engine(self):
+        toothbrush = self.add_product("toothbrush", ProductUnit.EACH, 0.99)
+        apples = self.add_product("apples", ProductUnit.KILO, 1.99)
+        soap = self.add_product("soap", ProductUnit.EACH, 2.0)
+        toothpaste = self.add_product("toothpaste", ProductUnit.EACH, 1.79)
+        self.teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, toothbrush, None)
+        self.teller.add_special_offer(SpecialOfferType.TEN_PERCENT_DISCOUNT, apples, 20.0)
+        self.teller.add_special_offer(SpecialOfferType.TWO_FOR_AMOUNT, soap, 3.0)
+        self.teller.add_special_offer(SpecialOfferType.FIVE_FOR_AMOUNT, toothpaste, 7.49)
+
+        self.assert_same_receipts([(toothbrush, 4), (apples, 1.2), (soap, 5), (toothpaste, 6)])
+
+    def test_receipts_show_the_quantities_as_scanned(self):
+        toothbrush = self.add_product("toothbrush", ProductUnit.EACH, 0.99)
+        apples = self.add_product("apples", ProductUnit.KILO, 1.99)
+        self.teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, toothbrush, None)
+
+        self.assert_same_receipts([(toothbrush, 2.0), (apples, 1.50), (apples, Decimal("0.250")), (toothbrush, 1)])
+        for pricing_mode in (PricingMode.DECIMAL, PricingMode.FIXED_POINT):
+            cart = ShoppingCart(pricing_mode)
+            cart.add_item(toothbrush)
+            receipt = self.teller.checks_out_articles_from(cart)
+            self.assertEqual("1.0", str(receipt.items[0].quantity))
+
+    def test_handle_offers_without_a_pricing_table(self):
+        toothbrush = self.add_product("toothbrush", ProductUnit.EACH, 0.99)
+        apples = self.add_product("apples", ProductUnit.KILO, 1.99)
+        self.teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, toothbrush, None)
+        self.teller.add_special_offer(SpecialOfferType.TEN_PERCENT_DISCOUNT, apples, 20.0)
+        discounts = {}
+        for pricing_mode in PricingMode:
+            cart = ShoppingCart(pricing_mode)
+            cart.add_item_quantity(toothbrush, 3)
+            cart.add_item_quantity(apples, Decimal("1.5"))
+            receipt = Receipt()
+            cart.handle_offers(receipt, self.teller.offers, [], [], self.catalog, date(2025, 11, 14))
+            discounts[pricing_mode] = [(d.description, d.amount) for d in receipt.discounts]
+
+        self.assertEqual(discounts[PricingMode.DECIMAL], discounts[PricingMode.FIXED_POINT])
+        self.assertEqual(2, len(discounts[PricingMode.FIXED_POINT]))
+
+    def test_rejects_quantities_finer_than_a_milli_unit(self):
+        apples = self.add_product("apples", ProductUnit.KILO, 1.99)
+        cart = ShoppingCart(PricingMode.FIXED_POINT)
+
+        with self.assertRaises(ValueError):
+            cart.add_item_quantity(apples, Decimal("0.0005"))
+
+    def test_randomized_carts_match_decimal_engine(self):
+        rng = random.Random(20251114)
+        offer_types = [
+            (SpecialOfferType.THREE_FOR_TWO, lambda: None),
+            (SpecialOfferType.TEN_PERCENT_DISCOUNT, lambda: rng.choice([5.0, 10.0, 12.5, 20.0, 33.33])),
+            (SpecialOfferType.TWO_FOR_AMOUNT, lambda: round(rng.uniform(0.5, 5), 2)),
+            (SpecialOfferType.FIVE_FOR_AMOUNT, lambda: round(rng.uniform(1, 15), 2)),
+        ]
+        products = []
+        for i in range(12):
+            unit = ProductUnit.KILO if i % 3 == 0 else ProductUnit.EACH
+            product = self.add_product(f"product {i}", unit, Decimal(rng.randint(1, 999)) / 100)
+            products.append(product)
+            if i % 4:
+                offer_type, argument = rng.choice(offer_types)
+                self.teller.add_special_offer(offer_type, product, argument())
+        for _ in range(3):
+            bundle = rng.sample(products, 2)
+            self.teller.add_bundle_offer({bundle[0]: 1, bundle[1]: rng.randint(1, 2)}, rng.choice([5, 10, 15]))
+        coupon = self.teller.create_coupon(
+            products[1], 2, 3, 50, date(2025, 11, 13), date(2025, 11, 15), description="test coupon"
+        )
+        self.teller.use_coupon(coupon)
+
+        for _ in range(200):
+            items = []
+            for product in rng.sample(products, rng.randint(1, len(products))):
+                if product.unit == ProductUnit.KILO:
+                    quantity = Decimal(rng.randint(1, 3000)) / 1000
+                else:
+                    quantity = rng.randint(1, 12)
+                items.append((product, quantity))
+            self.assert_same_receipts(items, coupon)
@@ -0,0 +1,123 @@
+import unittest
+from datetime import date
+from decimal import Decimal
+
+from discount_optimizer import DiscountPlanOptimizer
+from model_objects import PricingMode, Product, ProductUnit, SpecialOfferType
+from shopping_cart import ShoppingCart
+from teller import Teller
+from fake_catalog import FakeCatalog
+
+
+class RecordingOptimizer(DiscountPlanOptimizer):
+    def __init__(self):
+        super().__init__()
+        self.solved = []
+
+    def solve(self, quantities, *args, **kwargs):
+        self.solved.append(sorted(product.name for product in quantities))
+        return super().solve(quantities, *args, **kwargs)
+
+
+class IncrementalPricingTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = FakeCatalog()
+        self.teller = Teller(self.catalog)
+        self.checkout_date = date(2025, 11, 14)
+        self.toothbrush = self.add_product("toothbrush", ProductUnit.EACH, 0.99)
+        self.toothpaste = self.add_product("toothpaste", ProductUnit.EACH, 1.79)
+        self.apples = self.add_product("apples", ProductUnit.KILO, 1.99)
+        self.juice = self.add_product("orange juice", ProductUnit.EACH, 1.50)
+        self.teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, self.toothbrush, None)
+        self.teller.add_special_offer(SpecialOfferType.FIVE_FOR_AMOUNT, self.toothpaste, 7.49)
+        self.teller.add_special_offer(SpecialOfferType.TEN_PERCENT_DISCOUNT, self.apples, 20.0)
+        self.teller.add_bundle_offer({self.toothbrush: 1, self.toothpaste: 1})
+        self.coupon = self.teller.create_coupon(
+            self.juice, 6, 6, 50, date(2025, 11, 13), date(2025, 11, 15), "orange juice coupon"
+        )
+        self.teller.use_coupon(self.coupon)
+        self.scans = [
+            (self.toothpaste, 2),
+            (self.juice, 4),
+            (self.apples, Decimal("1.2")),
+            (self.toothbrush, 1),
+            (self.juice, 4),
+            (self.toothpaste, 4),
+            (self.toothbrush, 2),
+            (self.juice, 5),
+        ]
+
+    def add_product(self, name, unit, price):
+        product = Product(name, unit)
+        self.catalog.add_product(product, price)
+        return product
+
+    def full_checkout(self, scans, pricing_mode):
+        cart = ShoppingCart(pricing_mode)
+        for product, quantity in scans:
+            cart.add_item_quantity(product, quantity)
+        self.coupon.redeemed = False
+        receipt = self.teller.checks_out_articles_from(cart, checkout_date=self.checkout_date)
+        self.coupon.redeemed = False
+        return receipt
+
+    def assert_running_totals_match_full_checkouts(self, pricing_mode):
+        cart = ShoppingCart(pricing_mode)
+        pricing = cart.enable_incremental_pricing(self.teller, self.checkout_date)
+        self.assertEqual(0, pricing.running_total)
+
+        for i, (product, quantity) in enumerate(self.scans, start=1):
+            cart.add_item_quantity(product, quantity)
+
+            expected = self.full_checkout(self.scans[:i], pricing_mode)
+            self.assertEqual(expected.total_price(), pricing.running_total)
+            self.assertEqual(-sum(d.amount for d in expected.discounts), pricing.running_savings)
+
+        receipt = self.teller.checks_out_articles_from(cart, checkout_date=self.checkout_date)
+        self.assertEqual(pricing.running_total, receipt.total_price())
+        self.assertTrue(self.coupon.redeemed)
+
+    def test_running_totals_match_full_checkout_after_every_scan(self):
+        self.assert_running_totals_match_full_checkouts(PricingMode.DECIMAL)
+
+    def test_running_totals_in_fixed_point_mode(self):
+        self.assert_running_totals_match_full_checkouts(PricingMode.FIXED_POINT)
+
+    def test_new_offers_are_picked_up_on_next_scan(self):
+        cart = ShoppingCart()
+        pricing = cart.enable_incremental_pricing(self.teller, self.checkout_date)
+        cart.add_item_quantity(self.juice, 2)
+        self.assertEqual(Decimal("3.00"), pricing.running_total)
+
+        self.teller.add_special_offer(SpecialOfferType.TWO_FOR_AMOUNT, self.juice, 2.50)
+        cart.add_item_quantity(self.juice, 2)
+
+        self.assertEqual(Decimal("5.00"), pricing.running_total)
+
+    def test_a_scan_only_searches_the_scanned_products_component(self):
+        optimizer = RecordingOptimizer()
+        teller = Teller(self.catalog, plan_optimizer=optimizer)
+        teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, self.toothbrush, None)
+        teller.add_bundle_offer({self.toothbrush: 1, self.toothpaste: 1})
+        others = [self.add_product(f"product {i}", ProductUnit.EACH, 1 + i) for i in range(20)]
+        cart = ShoppingCart()
+        pricing = cart.enable_incremental_pricing(teller, self.checkout_date)
+
+        for product in others + [self.toothbrush, self.juice, self.toothpaste]:
+            cart.add_item_quantity(product, 3)
+
+        self.assertEqual(1, max(len(products) for products in optimizer.solved[:-1]))
+        self.assertEqual(["toothbrush", "toothpaste"], optimizer.solved[-1])
+        receipt = teller.checks_out_articles_from(cart, checkout_date=self.checkout_date)
+        self.assertEqual(pricing.running_total, receipt.total_price())
+
+    def test_catalog_price_changes_are_picked_up_on_next_scan(self):
+        cart = ShoppingCart()
+        pricing = cart.enable_incremental_pricing(self.teller, self.checkout_date)
+        cart.add_item_quantity(self.toothbrush, 3)
+
+        self.catalog.add_product(self.toothbrush, 1.50)
+        cart.add_item_quantity(self.apples, 1)
+
+        expected = self.full_checkout([(self.toothbrush, 3), (self.apples, 1)], PricingMode.DECIMAL)
+        self.assertEqual(expected.total_price(), pricing.running_total)
@@ -0,0 +1,129 @@
+import io
+import json
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+
+from discount_optimizer import DiscountPlanOptimizer
+from fake_catalog import FakeCatalog
+from instrumentation import Instrumentation, JsonLinesSink, MetricsRegistry
+from model_objects import PricingMode, Product, ProductUnit, SpecialOfferType
+from product_registry import ProductRegistry
+from receipt_printer import ReceiptPrinter
+from shopping_cart import ShoppingCart
+from teller import Teller
+
+CHECKOUT_DATE = date(2025, 11, 14)
+
+
+class InstrumentationTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = FakeCatalog(ProductRegistry())
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.toothpaste = Product("toothpaste", ProductUnit.EACH)
+        self.juice = Product("orange juice", ProductUnit.EACH)
+        self.catalog.add_products([(self.toothbrush, 0.99), (self.toothpaste, 1.79), (self.juice, 1.50)])
+        self.registry = MetricsRegistry()
+        self.instrumentation = Instrumentation(self.registry.record)
+
+    def teller(self, **kwargs):
+        teller = Teller(self.catalog, **kwargs)
+        teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, self.toothbrush, None)
+        teller.add_special_offer(SpecialOfferType.TEN_PERCENT_DISCOUNT, self.juice, 10.0)
+        teller.add_bundle_offer({self.toothbrush: 1, self.toothpaste: 1})
+        teller.use_coupon(
+            teller.create_coupon(self.juice, 6, 6, 50, date(2025, 11, 13), date(2025, 11, 15), "juice coupon")
+        )
+        return teller
+
+    def cart(self, pricing_mode=PricingMode.DECIMAL):
+        cart = ShoppingCart(pricing_mode)
+        cart.add_item_quantity(self.toothbrush, 4)
+        cart.add_item_quantity(self.toothpaste, 1)
+        cart.add_item_quantity(self.juice, 8)
+        return cart
+
+    def test_checkout_records_phases_and_counters(self):
+        teller = self.teller(instrumentation=self.instrumentation)
+
+        teller.checks_out_articles_from(self.cart(), checkout_date=CHECKOUT_DATE)
+
+        checkout = self.registry.snapshot()["checkout"]
+        self.assertEqual(1, checkout["count"])
+        self.assertEqual({"price_lookup", "discounts", "plan_search", "loyalty"}, set(checkout["phases"]))
+        counters = checkout["counters"]
+        self.assertEqual(3, counters["lines"])
+        self.assertGreater(counters["bundles_evaluated"], 0)
+        self.assertGreater(counters["coupon_evaluations"], 0)
+        self.assertGreater(counters["search_nodes"], 0)
+        self.assertGreater(counters["strategy_calls.THREE_FOR_TWO"], 0)
+        self.assertGreater(counters["strategy_calls.TEN_PERCENT_DISCOUNT"], 0)
+
+    def test_greedy_fallback_times_each_plan(self):
+        teller = self.teller(plan_optimizer=DiscountPlanOptimizer(node_budget=0), instrumentation=self.instrumentation)
+
+        teller.checks_out_articles_from(self.cart(PricingMode.FIXED_POINT), checkout_date=CHECKOUT_DATE)
+
+        checkout = self.registry.snapshot()["checkout"]
+        self.assertTrue(
+            {"plan.no_coupon", "plan.coupon_first", "plan.coupon_after_bundles", "bundles"} <= set(checkout["phases"])
+        )
+        self.assertEqual(3, checkout["counters"]["plans_computed"])
+        self.assertEqual(1, checkout["counters"]["search_budget_exhausted"])
+
+    def test_uninstrumented_checkout_is_unchanged(self):
+        instrumented = self.teller(instrumentation=self.instrumentation)
+        plain = self.teller()
+        cart = self.cart()
+        cart.instrumentation = None
+
+        expected = plain.checks_out_articles_from(cart, checkout_date=CHECKOUT_DATE)
+        actual = instrumented.checks_out_articles_from(self.cart(), checkout_date=CHECKOUT_DATE)
+
+        self.assertEqual(expected.total_price(), actual.total_price())
+        self.assertIsNone(cart._offer_calculator.instrumentation)
+
+    def test_cart_instrumentation_covers_direct_offer_handling(self):
+        teller = self.teller()
+        cart = self.cart()
+        cart.instrumentation = self.instrumentation
+
+        with self.instrumentation.operation("discounts_only"):
+            cart.handle_offers(
+                teller.checks_out_articles_from(ShoppingCart()), teller.offers, [], None, self.catalog, CHECKOUT_DATE
+            )
+
+        counters = self.registry.snapshot()["discounts_only"]["counters"]
+        self.assertEqual(2, counters["strategy_calls.THREE_FOR_TWO"] + counters["strategy_calls.TEN_PERCENT_DISCOUNT"])
+
+    def test_records_are_exported_as_json_lines(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "metrics.jsonl"
+            instrumentation = Instrumentation(JsonLinesSink(path))
+            teller = self.teller(instrumentation=instrumentation)
+            printer = ReceiptPrinter(instrumentation=instrumentation)
+
+            receipts = [teller.checks_out_articles_from(self.cart(), checkout_date=CHECKOUT_DATE) for _ in range(2)]
+            printer.write_journal(receipts, io.StringIO())
+
+            records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+        self.assertEqual(["checkout", "checkout", "write_journal"], [record["event"] for record in records])
+        self.assertEqual(3, records[0]["counters"]["lines"])
+
+    def test_phases_accumulate_and_nest(self):
+        ticks = iter([0.0, 1.0, 1.5, 2.0, 2.5, 4.0, 4.5, 6.0])
+        records = []
+        instrumentation = Instrumentation(records.append, clock=lambda: next(ticks))
+
+        with instrumentation.operation("checkout"):
+            with instrumentation.phase("plan"):
+                with instrumentation.phase("bundles"):
+                    pass
+            with instrumentation.phase("plan"):
+                instrumentation.count("plans_computed")
+
+        self.assertEqual({"plan": 2.0, "bundles": 0.5}, records[0]["phases"])
+        self.assertEqual({"plans_computed": 1}, records[0]["counters"])
+        self.assertEqual(6.0, records[0]["duration_s"])
@@ -0,0 +1,146 @@
+import os
+import pickle
+import tempfile
+import threading
+import time
+import unittest
+from datetime import date
+from pathlib import Path
+from unittest import mock
+
+from fake_catalog import FakeCatalog
+from loyalty_ledger import LOG_NAME, LoyaltyLedger
+from model_objects import LoyaltyAccount, Product, ProductUnit
+from shopping_cart import ShoppingCart
+from teller import Teller
+
+
+class LoyaltyLedgerTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.directory = Path(self._tmp.name)
+
+    def open_ledger(self, **kwargs):
+        ledger = LoyaltyLedger(self.directory, **kwargs)
+        self.addCleanup(ledger.close)
+        return ledger
+
+    def test_balances_survive_reopening(self):
+        with LoyaltyLedger(self.directory) as ledger:
+            ledger.earn("alice", 300)
+            ledger.redeem("alice", 120)
+            ledger.earn("bob", 5)
+
+        ledger = self.open_ledger()
+
+        self.assertEqual(180, ledger.balance("alice"))
+        self.assertEqual(5, ledger.balance("bob"))
+        self.assertEqual(0, ledger.balance("carol"))
+
+    def test_redemptions_cannot_overdraw(self):
+        ledger = self.open_ledger()
+        ledger.earn("alice", 100)
+
+        with self.assertRaisesRegex(ValueError, "insufficient points"):
+            ledger.redeem("alice", 101)
+        self.assertEqual(100, ledger.redeem_up_to("alice", 250))
+        self.assertEqual(0, ledger.redeem_up_to("alice", 10))
+
+        ledger.close()
+        self.assertEqual(2, len((self.directory / LOG_NAME).read_bytes().splitlines()))
+
+    def test_concurrent_writers_share_syncs(self):
+        real_fsync = os.fsync
+
+        def slow_fsync(fd):
+            time.sleep(0.002)
+            real_fsync(fd)
+
+        ledger = self.open_ledger()
+        threads = [
+            threading.Thread(target=lambda i=i: [ledger.earn(f"account {i % 4}", 1) for _ in range(50)])
+            for i in range(16)
+        ]
+        with mock.patch("loyalty_ledger.os.fsync", side_effect=slow_fsync) as fsync:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual([200] * 4, [ledger.balance(f"account {i}") for i in range(4)])
+        self.assertLess(fsync.call_count, 800 // 4)
+
+    def test_concurrent_redemptions_spend_each_point_once(self):
+        ledger = self.open_ledger()
+        ledger.earn("alice", 1000)
+        redeemed = []
+
+        def spend():
+            for _ in range(20):
+                redeemed.append(ledger.redeem_up_to("alice", 7))
+
+        threads = [threading.Thread(target=spend) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1000, sum(redeemed))
+        self.assertEqual(0, ledger.balance("alice"))
+
+    def test_snapshots_compact_the_log(self):
+        with LoyaltyLedger(self.directory, snapshot_every=5, keep_history=True) as ledger:
+            for i in range(12):
+                ledger.earn(f"account {i % 3}", 10)
+
+        self.assertEqual(2, len((self.directory / LOG_NAME).read_bytes().splitlines()))
+        history = sorted(path.name for path in self.directory.glob("ledger.*-*.log"))
+        self.assertEqual(["ledger.1-5.log", "ledger.6-10.log"], history)
+        ledger = self.open_ledger()
+        self.assertEqual([40, 40, 40], [ledger.balance(f"account {i}") for i in range(3)])
+
+    def test_a_torn_last_event_is_dropped(self):
+        with LoyaltyLedger(self.directory) as ledger:
+            ledger.earn("alice", 50)
+        with open(self.directory / LOG_NAME, "ab") as log:
+            log.write(b'{"seq":2,"account_id":"alice","kind":"ea')
+
+        with LoyaltyLedger(self.directory) as ledger:
+            self.assertEqual(50, ledger.balance("alice"))
+            ledger.earn("alice", 1)
+
+        self.assertEqual(51, self.open_ledger().balance("alice"))
+
+    def test_buffered_mode_commits_in_the_background(self):
+        ledger = self.open_ledger(durable=False, commit_interval=0.001)
+        ledger.earn("alice", 10)
+
+        deadline = time.monotonic() + 5
+        while not (self.directory / LOG_NAME).read_bytes() and time.monotonic() < deadline:
+            time.sleep(0.001)
+        self.assertEqual(1, len((self.directory / LOG_NAME).read_bytes().splitlines()))
+        ledger.earn("alice", 5)
+        ledger.close()
+        self.assertEqual(15, self.open_ledger().balance("alice"))
+
+    def test_checkout_records_points_through_a_ledger_account(self):
+        catalog = FakeCatalog()
+        milk = Product("milk", ProductUnit.EACH)
+        catalog.add_product(milk, 1.50)
+        ledger = self.open_ledger()
+        ledger.earn("alice", 100)
+        account = ledger.account("alice")
+        cart = ShoppingCart()
+        cart.add_item_quantity(milk, 2)
+
+        receipt = Teller(catalog).checks_out_articles_from(
+            cart, checkout_date=date(2025, 11, 14), loyalty_account=account, points_to_redeem=150
+        )
+
+        self.assertEqual(100, receipt.points_redeemed)
+        self.assertEqual(200, receipt.points_earned)
+        self.assertEqual(200, account.points)
+        copy = pickle.loads(pickle.dumps(account))
+        self.assertIsInstance(copy, LoyaltyAccount)
+        self.assertEqual(200, copy.points)
@@ -0,0 +1,35 @@
+import pickle
+import unittest
+from decimal import Decimal
+
+from model_objects import Discount, Offer, Product, ProductQuantity, ProductUnit, SpecialOfferType
+
+
+class ModelObjectsTest(unittest.TestCase):
+    def test_product_is_immutable_and_hashes_by_value(self):
+        product = Product("toothbrush", ProductUnit.EACH)
+
+        with self.assertRaises(AttributeError):
+            product.name = "toothpaste"
+        self.assertEqual(hash(Product("toothbrush", ProductUnit.EACH)), hash(product))
+        self.assertEqual(Product("toothbrush", ProductUnit.EACH), product)
+        self.assertNotEqual(Product("toothbrush", ProductUnit.KILO), product)
+
+    def test_product_survives_pickling(self):
+        product = Product("apples", ProductUnit.KILO)
+
+        copy = pickle.loads(pickle.dumps(product))
+
+        self.assertEqual(product, copy)
+        self.assertEqual(hash(product), hash(copy))
+
+    def test_model_objects_have_no_instance_dict(self):
+        product = Product("toothbrush", ProductUnit.EACH)
+        objects = [
+            product,
+            ProductQuantity(product, Decimal("1")),
+            Offer(SpecialOfferType.THREE_FOR_TWO, product, None),
+            Discount(product, "3 for 2", Decimal("-0.99")),
+        ]
+        for obj in objects:
+            self.assertFalse(hasattr(obj, "__dict__"), type(obj).__name__)
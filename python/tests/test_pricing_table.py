@@ -0,0 +1,80 @@
+import unittest
+from decimal import Decimal
+
+from model_objects import Product, ProductUnit, SpecialOfferType
+from offer_calculator import OfferCalculator
+from pricing_table import PricingTable
+from shopping_cart import ShoppingCart
+from teller import Teller
+from fake_catalog import FakeCatalog
+
+
+class CountingCatalog(FakeCatalog):
+    def __init__(self):
+        super().__init__()
+        self.lookups = 0
+
+    def unit_price(self, product):
+        self.lookups += 1
+        return super().unit_price(product)
+
+
+class PricingTableTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = CountingCatalog()
+        self.teller = Teller(self.catalog)
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.apples = Product("apples", ProductUnit.KILO)
+        self.catalog.add_product(self.toothbrush, 0.99)
+        self.catalog.add_product(self.apples, 1.99)
+
+    def test_entry_holds_price_strategy_and_parsed_argument(self):
+        self.teller.add_special_offer(SpecialOfferType.TEN_PERCENT_DISCOUNT, self.apples, 20.0)
+
+        entry = self.teller.pricing_table.entry(self.apples)
+
+        self.assertEqual(Decimal("1.99"), entry.unit_price)
+        self.assertEqual(Decimal("20.0"), entry.offer.argument)
+        self.assertIsNotNone(entry.strategy)
+        self.assertIsNone(self.teller.pricing_table.entry(self.toothbrush).strategy)
+
+    def test_catalog_is_queried_once_per_product_across_checkouts(self):
+        self.teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, self.toothbrush, None)
+        for _ in range(3):
+            cart = ShoppingCart()
+            cart.add_item_quantity(self.toothbrush, 3)
+            cart.add_item_quantity(self.toothbrush, 1)
+            cart.add_item_quantity(self.apples, 1.5)
+            self.teller.checks_out_articles_from(cart)
+
+        self.assertEqual(2, self.catalog.lookups)
+
+    def test_adding_offers_invalidates_the_table(self):
+        table = self.teller.pricing_table
+        self.teller.add_special_offer(SpecialOfferType.TEN_PERCENT_DISCOUNT, self.apples, 10.0)
+        self.assertIsNot(table, self.teller.pricing_table)
+
+        table = self.teller.pricing_table
+        self.teller.add_bundle_offer({self.toothbrush: 1, self.apples: 1})
+        self.assertIsNot(table, self.teller.pricing_table)
+
+    def test_price_changes_reach_the_next_checkout(self):
+        cart = ShoppingCart()
+        cart.add_item_quantity(self.toothbrush, 2)
+        before = self.teller.checks_out_articles_from(cart)
+
+        self.catalog.add_product(self.toothbrush, 1.50)
+        after = self.teller.checks_out_articles_from(cart)
+
+        self.assertEqual(Decimal("1.98"), before.total_price())
+        self.assertEqual(Decimal("3.00"), after.total_price())
+
+    def test_prices_kept_are_bounded(self):
+        # With room for one price, each product pushes the other one out.
+        table = PricingTable(self.catalog, {}, OfferCalculator(), max_prices=1)
+
+        for _ in range(2):
+            table.entry(self.toothbrush)
+            table.entry(self.apples)
+
+        self.assertEqual(4, self.catalog.lookups)
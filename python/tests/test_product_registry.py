@@ -0,0 +1,69 @@
+import pickle
+import unittest
+from decimal import Decimal
+
+from model_objects import Product, ProductUnit
+from product_registry import ProductRegistry
+from fake_catalog import FakeCatalog
+
+
+class ProductRegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.registry = ProductRegistry()
+
+    def test_interning_assigns_dense_ids_in_registration_order(self):
+        products = [Product(name, ProductUnit.EACH) for name in ("toothbrush", "toothpaste", "floss")]
+
+        for product in products:
+            self.registry.intern(product)
+
+        self.assertEqual([0, 1, 2], [p.product_id for p in products])
+        self.assertEqual(3, len(self.registry))
+        self.assertIs(products[1], self.registry.product(1))
+
+    def test_equal_products_share_the_canonical_instance(self):
+        first = self.registry.intern(Product("apples", ProductUnit.KILO))
+        duplicate = Product("apples", ProductUnit.KILO)
+
+        self.assertIs(first, self.registry.intern(duplicate))
+        self.assertEqual(first.product_id, duplicate.product_id)
+        self.assertEqual(1, len(self.registry))
+
+    def test_unstamped_copies_resolve_by_value(self):
+        product = self.registry.intern(Product("milk", ProductUnit.EACH))
+        self.registry.intern(Product("bread", ProductUnit.EACH))
+
+        copy = pickle.loads(pickle.dumps(product))
+
+        self.assertIsNone(copy.product_id)
+        self.assertEqual(0, self.registry.id_of(copy))
+
+    def test_catalog_prices_are_indexed_by_product_id(self):
+        catalog = FakeCatalog(self.registry)
+        toothbrush = Product("toothbrush", ProductUnit.EACH)
+        catalog.add_product(toothbrush, 0.99)
+
+        self.assertEqual(Decimal("0.99"), catalog.unit_price(toothbrush))
+        self.assertEqual(Decimal("0.99"), catalog.unit_price(Product("toothbrush", ProductUnit.EACH)))
+        with self.assertRaises(KeyError):
+            catalog.unit_price(Product("toothpaste", ProductUnit.EACH))
+
+    def test_catalogs_number_their_own_products(self):
+        big = FakeCatalog()
+        big.add_products((Product(f"product {i}", ProductUnit.EACH), 1) for i in range(1000))
+        small = FakeCatalog()
+        shared = Product("product 999", ProductUnit.EACH)
+        small.add_product(shared, 2)
+
+        self.assertEqual(1, len(small._prices))
+        self.assertEqual(Decimal("2"), small.unit_price(big.products["product 999"]))
+        self.assertEqual(Decimal("1"), big.unit_price(shared))
+
+    def test_prices_by_name_stay_readable(self):
+        catalog = FakeCatalog(self.registry)
+        catalog.add_products([(Product("milk", ProductUnit.EACH), 0.89), (Product("bread", ProductUnit.EACH), 2.49)])
+
+        self.assertEqual({"milk": Decimal("0.89"), "bread": Decimal("2.49")}, dict(catalog.prices))
+        self.assertEqual(Decimal("2.49"), catalog.prices["bread"])
+        with self.assertRaises(TypeError):
+            catalog.prices["milk"] = Decimal("1")
@@ -0,0 +1,145 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+from csv_loaders import read_bundle_offers, read_catalog, read_coupons, read_offers
+from fake_catalog import FakeCatalog
+from promotion_reloader import PromotionReloader
+from shopping_cart import ShoppingCart
+from teller import Teller
+
+CHECKOUT_DATE = date(2025, 11, 14)
+
+
+class BlockingCatalog(FakeCatalog):
+    """Holds unit_prices() calls until released, so a checkout can be caught in flight."""
+
+    def __init__(self):
+        super().__init__()
+        self.blocked = threading.Event()
+        self.release = threading.Event()
+        self.block = False
+
+    def unit_prices(self, products):
+        if self.block:
+            self.blocked.set()
+            self.release.wait(5)
+        return super().unit_prices(products)
+
+
+class PromotionReloaderTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.data_dir = Path(self._tmp.name)
+        self.write("catalog.csv", "name,unit,price\ntoothbrush,EACH,1.00\ntoothpaste,EACH,2.00\n")
+        self.write("offers.csv", "name,offer,argument\ntoothbrush,THREE_FOR_TWO,0\n")
+        self.write("bundles.csv", "bundle_name,discount_percent,items\n")
+        self.write(
+            "coupons.csv",
+            "name,product,required_qty,discounted_qty,discount_percent,valid_from,valid_to,description\n"
+            "paste,toothpaste,1,1,50,2025-11-01,2025-11-30,paste coupon\n",
+        )
+        self.catalog = BlockingCatalog()
+        read_catalog(self.data_dir / "catalog.csv", self.catalog)
+        self.teller = Teller(self.catalog)
+        read_offers(self.data_dir / "offers.csv", self.teller, self.catalog)
+        read_bundle_offers(self.data_dir / "bundles.csv", self.teller, self.catalog)
+        self.teller.use_coupons(read_coupons(self.data_dir / "coupons.csv", self.catalog))
+        self.reloader = PromotionReloader(self.teller, self.data_dir, interval=0.01)
+        self.addCleanup(self.reloader.stop)
+
+    def write(self, name, text):
+        path = self.data_dir / name
+        existed = path.exists()
+        path.write_text(text, encoding="utf-8")
+        if existed:
+            # Make the change visible even where the clock is too coarse to move the mtime.
+            stat = path.stat()
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def toothbrushes(self, quantity=3):
+        cart = ShoppingCart()
+        cart.add_item_quantity(self.catalog.products["toothbrush"], quantity)
+        return cart
+
+    def test_changed_files_are_swapped_in(self):
+        before = self.teller.checks_out_articles_from(self.toothbrushes(), CHECKOUT_DATE)
+        self.assertIsNone(self.reloader.check())
+
+        self.write("offers.csv", "name,offer,argument\ntoothbrush,TEN_PERCENT_DISCOUNT,50\n")
+        self.write("bundles.csv", "bundle_name,discount_percent,items\npack,10,toothbrush:1;toothpaste:1\n")
+        version = self.reloader.check()
+
+        after = self.teller.checks_out_articles_from(self.toothbrushes(), CHECKOUT_DATE)
+        self.assertEqual(Decimal("2.00"), before.total_price())
+        self.assertEqual(Decimal("1.50"), after.total_price())
+        self.assertEqual(version, after.promo_version)
+        self.assertLess(before.promo_version, after.promo_version)
+        self.assertEqual(1, len(self.teller.bundle_offers))
+        self.assertIsNone(self.reloader.check())
+
+    def test_a_checkout_in_flight_finishes_on_the_old_promotions(self):
+        self.catalog.block = True
+        receipts = []
+        checkout = threading.Thread(
+            target=lambda: receipts.append(self.teller.checks_out_articles_from(self.toothbrushes(), CHECKOUT_DATE))
+        )
+        checkout.start()
+        self.assertTrue(self.catalog.blocked.wait(5))
+
+        self.write("offers.csv", "name,offer,argument\n")
+        version = self.reloader.check()
+        self.catalog.release.set()
+        checkout.join()
+
+        self.assertEqual(Decimal("2.00"), receipts[0].total_price())
+        self.assertLess(receipts[0].promo_version, version)
+        self.assertEqual(Decimal("3.00"), self.teller.checks_out_articles_from(self.toothbrushes()).total_price())
+
+    def test_a_bad_file_keeps_the_current_promotions(self):
+        version = self.teller.promo_version
+        self.write("offers.csv", "name,offer,argument\nfloss,THREE_FOR_TWO,0\n")
+
+        self.assertIsNone(self.reloader.check())
+        self.assertIsInstance(self.reloader.last_error, KeyError)
+        self.assertEqual(version, self.teller.promo_version)
+        self.assertIsNone(self.reloader.check())
+
+        self.write("offers.csv", "name,offer,argument\n")
+        self.assertIsNotNone(self.reloader.check())
+        self.assertIsNone(self.reloader.last_error)
+        self.assertEqual([], self.teller.all_offers)
+
+    def test_redeemed_coupons_stay_redeemed_across_reloads(self):
+        cart = ShoppingCart()
+        cart.add_item_quantity(self.catalog.products["toothpaste"], 2)
+        first = self.teller.checks_out_articles_from(cart, CHECKOUT_DATE)
+
+        self.write("offers.csv", "name,offer,argument\n")
+        self.reloader.check()
+        second = self.teller.checks_out_articles_from(cart, CHECKOUT_DATE)
+
+        self.assertEqual(Decimal("3.00"), first.total_price())
+        self.assertEqual(Decimal("4.00"), second.total_price())
+
+    def test_the_background_thread_picks_up_changes(self):
+        version = self.teller.promo_version
+        self.reloader.start()
+
+        self.write("offers.csv", "name,offer,argument\n")
+        deadline = time.monotonic() + 5
+        while self.teller.promo_version == version and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertGreater(self.teller.promo_version, version)
+        self.assertEqual([], self.teller.all_offers)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+from datetime import date, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+
+from fake_catalog import FakeCatalog
+from model_objects import Product, ProductUnit, SpecialOfferType
+from promotion_schedule import PromotionSchedule
+from shopping_cart import ShoppingCart
+from teller import Teller
+
+MONDAY = date(2025, 11, 10)
+SUNDAY = date(2025, 11, 16)
+
+
+class PromotionScheduleTest(unittest.TestCase):
+    def test_days_between_the_same_boundaries_share_one_built_set(self):
+        builds = []
+        schedule = PromotionSchedule(build=lambda promotions: builds.append(promotions) or tuple(promotions))
+        schedule.add("standing")
+        schedule.add("this week", MONDAY, SUNDAY)
+        schedule.add("until friday", None, MONDAY + timedelta(days=4))
+
+        self.assertEqual(("standing", "until friday"), schedule.active_on(MONDAY - timedelta(days=30)))
+        self.assertEqual(("standing", "this week", "until friday"), schedule.active_on(MONDAY))
+        self.assertIs(schedule.active_on(MONDAY), schedule.active_on(MONDAY + timedelta(days=2)))
+        self.assertEqual(("standing", "this week"), schedule.active_on(SUNDAY))
+        self.assertEqual(("standing",), schedule.active_on(SUNDAY + timedelta(days=1)))
+        self.assertEqual(4, len(builds))
+
+    def test_adding_under_an_existing_key_replaces_in_place(self):
+        schedule = PromotionSchedule()
+        schedule.add("first", key="a")
+        schedule.add("second", key="b")
+        schedule.add("replaced", key="a")
+
+        self.assertEqual(("replaced", "second"), schedule.active_on(MONDAY))
+        self.assertEqual(["replaced", "second"], schedule.promotions())
+
+    def test_rejects_an_interval_that_ends_before_it_starts(self):
+        with self.assertRaises(ValueError):
+            PromotionSchedule().add("backwards", SUNDAY, MONDAY)
+
+    def test_a_batch_with_an_inverted_interval_adds_nothing(self):
+        schedule = PromotionSchedule()
+        with self.assertRaises(ValueError):
+            schedule.add_all([("fine", MONDAY, SUNDAY, None), ("backwards", SUNDAY, MONDAY, None)])
+
+        self.assertEqual([], schedule.promotions())
+
+
+class TellerScheduleTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = FakeCatalog()
+        self.teller = Teller(self.catalog)
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.toothpaste = Product("toothpaste", ProductUnit.EACH)
+        self.catalog.add_product(self.toothbrush, 1.00)
+        self.catalog.add_product(self.toothpaste, 2.00)
+
+    def total(self, items, checkout_date):
+        cart = ShoppingCart()
+        for product, quantity in items:
+            cart.add_item_quantity(product, quantity)
+        receipt = self.teller.checks_out_articles_from(cart, checkout_date=checkout_date)
+        return receipt.total_price().quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+    def test_a_batch_of_offers_is_one_promotion_change(self):
+        self.teller.promotions_on(MONDAY)
+        version = self.teller.promo_version
+
+        self.teller.add_special_offers([
+            (SpecialOfferType.THREE_FOR_TWO, self.toothbrush, None),
+            (SpecialOfferType.TEN_PERCENT_DISCOUNT, self.toothpaste, 10.0),
+        ])
+        self.teller.add_bundle_offers([({self.toothbrush: 1, self.toothpaste: 1}, 10)])
+
+        self.assertEqual(version + 2, self.teller.promo_version)
+        self.assertEqual(Decimal("2.00"), self.total([(self.toothbrush, 3)], MONDAY))
+        self.assertEqual(Decimal("1.80"), self.total([(self.toothpaste, 1)], MONDAY))
+
+    def test_a_weekly_offer_overrides_the_standing_one_for_its_dates(self):
+        self.teller.add_special_offer(SpecialOfferType.TEN_PERCENT_DISCOUNT, self.toothbrush, 10.0)
+        self.teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, self.toothbrush, None, MONDAY, SUNDAY)
+
+        self.assertEqual(Decimal("2.70"), self.total([(self.toothbrush, 3)], MONDAY - timedelta(days=1)))
+        self.assertEqual(Decimal("2.00"), self.total([(self.toothbrush, 3)], MONDAY))
+        self.assertEqual(Decimal("2.00"), self.total([(self.toothbrush, 3)], SUNDAY))
+        self.assertEqual(Decimal("2.70"), self.total([(self.toothbrush, 3)], SUNDAY + timedelta(days=1)))
+
+    def test_bundles_and_wallet_coupons_apply_only_within_their_dates(self):
+        self.teller.add_bundle_offer({self.toothbrush: 1, self.toothpaste: 1}, 50, MONDAY, SUNDAY)
+        self.teller.use_coupon(self.teller.create_coupon(self.toothpaste, 1, 1, 100, SUNDAY, SUNDAY))
+        items = [(self.toothbrush, 1), (self.toothpaste, 2)]
+
+        self.assertEqual(Decimal("5.00"), self.total(items, MONDAY - timedelta(days=1)))
+        self.assertEqual(Decimal("3.50"), self.total(items, MONDAY))
+        self.assertEqual(Decimal("3.00"), self.total(items, SUNDAY))
+        after = SUNDAY + timedelta(days=1)
+        self.assertEqual([], self.teller.bundle_offers_for({self.toothbrush: 1, self.toothpaste: 1}, after))
+
+    def test_checkouts_in_the_same_week_share_the_active_set_and_pricing_table(self):
+        self.teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, self.toothbrush, None, MONDAY, SUNDAY)
+        monday = self.teller.promotions_on(MONDAY)
+
+        self.assertIs(monday, self.teller.promotions_on(MONDAY + timedelta(days=3)))
+        self.assertIs(monday.pricing_table, self.teller.promotions_on(SUNDAY).pricing_table)
+        self.assertEqual({}, self.teller.promotions_on(SUNDAY + timedelta(days=1)).offers)
+
+        self.teller.add_special_offer(SpecialOfferType.TEN_PERCENT_DISCOUNT, self.toothpaste, 10.0)
+        self.assertIsNot(monday, self.teller.promotions_on(MONDAY))
+        self.assertEqual(2, len(self.teller.all_offers))
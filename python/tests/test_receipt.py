@@ -0,0 +1,43 @@
+import pickle
+import unittest
+from decimal import Decimal
+
+from model_objects import Discount, Product, ProductUnit
+from receipt import Receipt
+
+
+class ReceiptTest(unittest.TestCase):
+    def setUp(self):
+        self.receipt = Receipt()
+        self.milk = Product("milk", ProductUnit.EACH)
+
+    def test_accessors_return_live_read_only_views(self):
+        discounts = self.receipt.discounts
+        self.assertIs(discounts, self.receipt.discounts)
+        self.assertEqual([], discounts)
+
+        discount = Discount(self.milk, "10% off", Decimal("-0.15"))
+        self.receipt.add_discount(discount)
+
+        self.assertEqual([discount], discounts)
+        self.assertEqual(1, len(discounts))
+        self.assertFalse(hasattr(discounts, "append"))
+
+    def test_running_totals_follow_added_lines(self):
+        self.receipt.add_product(self.milk, Decimal("2"), Decimal("1.50"), Decimal("3.00"))
+        self.receipt.add_discount(Discount(self.milk, "10% off", Decimal("-0.30")))
+        self.receipt.add_payment("Loyalty points", Decimal("-1.00"))
+
+        self.assertEqual(Decimal("3.00"), self.receipt.subtotal)
+        self.assertEqual(Decimal("-0.30"), self.receipt.discount_total)
+        self.assertEqual(Decimal("-1.00"), self.receipt.payment_total)
+        self.assertEqual(Decimal("1.70"), self.receipt.total_price())
+
+    def test_views_survive_pickling(self):
+        self.receipt.add_product(self.milk, Decimal("1"), Decimal("1.50"), Decimal("1.50"))
+
+        copy = pickle.loads(pickle.dumps(self.receipt))
+        copy.add_product(self.milk, Decimal("1"), Decimal("1.50"), Decimal("1.50"))
+
+        self.assertEqual(2, len(copy.items))
+        self.assertEqual(Decimal("3.00"), copy.total_price())
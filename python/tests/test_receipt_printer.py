@@ -0,0 +1,55 @@
+import io
+import unittest
+from decimal import Decimal
+
+from model_objects import Discount, Product, ProductUnit
+from receipt import Receipt
+from receipt_printer import ReceiptPrinter
+
+
+class ReceiptPrinterTest(unittest.TestCase):
+    def setUp(self):
+        self.printer = ReceiptPrinter(columns=30)
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.apples = Product("apples", ProductUnit.KILO)
+
+    def build_receipt(self):
+        receipt = Receipt()
+        receipt.add_product(self.toothbrush, Decimal("3"), Decimal("0.99"), Decimal("2.97"))
+        receipt.add_product(self.apples, Decimal("1.2"), Decimal("1.99"), Decimal("2.388"))
+        receipt.add_discount(Discount(self.toothbrush, "3 for 2", Decimal("-0.99")))
+        return receipt
+
+    def test_print_receipt_pads_lines_to_column_width(self):
+        expected = (
+            "toothbrush                2.97\n"
+            "  0.99 * 3\n"
+            "apples                    2.39\n"
+            "  1.99 * 1.200\n"
+            "3 for 2 (toothbrush)     -0.99\n"
+            "\n"
+            "Total:                    4.37\n"
+        )
+        self.assertEqual(expected, self.printer.print_receipt(self.build_receipt()))
+
+    def test_streaming_output_matches_print_receipt(self):
+        receipt = self.build_receipt()
+        stream = io.StringIO()
+
+        self.printer.write_receipt(receipt, stream)
+
+        self.assertEqual(self.printer.print_receipt(receipt), stream.getvalue())
+        self.assertEqual(self.printer.print_receipt(receipt), "".join(self.printer.iter_receipt_lines(receipt)))
+
+    def test_write_journal_separates_receipts(self):
+        receipts = (self.build_receipt() for _ in range(3))
+        stream = io.StringIO()
+
+        self.printer.write_journal(receipts, stream, separator="----\n")
+
+        single = self.printer.print_receipt(self.build_receipt())
+        self.assertEqual("----\n".join([single] * 3), stream.getvalue())
+
+    def test_long_names_are_not_padded(self):
+        line = self.printer.format_line_with_whitespace("x" * 40, "1.00")
+        self.assertEqual("x" * 40 + "1.00\n", line)
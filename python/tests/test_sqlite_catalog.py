@@ -0,0 +1,129 @@
+import pickle
+import tempfile
+import threading
+import unittest
+from decimal import Decimal
+from pathlib import Path
+
+from lru_cache import CacheStats
+from model_objects import Product, ProductUnit, SpecialOfferType
+from shopping_cart import ShoppingCart
+from sqlite_catalog import SqliteCatalog
+from teller import Teller
+
+
+class CountingSqliteCatalog(SqliteCatalog):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fetches = []
+
+    def _fetch(self, products):
+        self.fetches.append(sorted(product.name for product in products))
+        return super()._fetch(products)
+
+
+class SqliteCatalogTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.path = Path(self._tmp.name) / "catalog.db"
+        self.catalog = CountingSqliteCatalog(self.path, cache_size=3)
+        self.addCleanup(self.catalog.close)
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.apples = Product("apples", ProductUnit.KILO)
+        self.rice = Product("rice", ProductUnit.EACH)
+        self.milk = Product("milk", ProductUnit.EACH)
+        self.catalog.add_products(
+            [(self.toothbrush, Decimal("0.99")), (self.apples, Decimal("1.99")), (self.rice, "2.49"), (self.milk, 1.5)]
+        )
+
+    def test_prices_round_trip_exactly(self):
+        self.assertEqual(Decimal("2.49"), self.catalog.unit_price(self.rice))
+        self.assertEqual("1.5", str(self.catalog.unit_price(self.milk)))
+        self.assertEqual(self.apples, self.catalog.products["apples"])
+        self.assertEqual(["toothbrush", "apples", "rice", "milk"], list(self.catalog.products))
+        self.assertIsNone(self.catalog.products.get("bread"))
+
+    def test_unit_prices_fetches_all_misses_in_one_query(self):
+        prices = self.catalog.unit_prices([self.toothbrush, self.apples, self.toothbrush])
+
+        self.assertEqual({self.toothbrush: Decimal("0.99"), self.apples: Decimal("1.99")}, prices)
+        self.assertEqual([["apples", "toothbrush"]], self.catalog.fetches)
+        self.assertEqual(CacheStats(hits=0, misses=2, evictions=0, size=2), self.catalog.cache_stats)
+
+    def test_cache_evicts_the_least_recently_used_price(self):
+        self.catalog.unit_prices([self.toothbrush, self.apples, self.rice])
+        self.catalog.unit_price(self.toothbrush)
+        self.catalog.unit_price(self.milk)
+
+        self.catalog.unit_prices([self.toothbrush, self.rice, self.milk])
+        self.catalog.unit_price(self.apples)
+
+        self.assertEqual([["apples", "rice", "toothbrush"], ["milk"], ["apples"]], self.catalog.fetches)
+        self.assertEqual(CacheStats(hits=4, misses=5, evictions=2, size=3), self.catalog.cache_stats)
+
+    def test_unknown_products_and_units_raise_key_error(self):
+        with self.assertRaises(KeyError):
+            self.catalog.unit_price(Product("bread", ProductUnit.EACH))
+        with self.assertRaises(KeyError):
+            self.catalog.unit_price(Product("apples", ProductUnit.EACH))
+
+    def test_adding_a_product_replaces_its_cached_price(self):
+        self.catalog.unit_price(self.rice)
+
+        self.catalog.add_product(self.rice, Decimal("2.99"))
+
+        self.assertEqual(Decimal("2.99"), self.catalog.unit_price(self.rice))
+
+    def test_teller_prices_follow_catalog_updates(self):
+        teller = Teller(self.catalog)
+        cart = ShoppingCart()
+        cart.add_item_quantity(self.rice, 2)
+        teller.checks_out_articles_from(cart)
+
+        self.catalog.add_product(self.rice, Decimal("2.99"))
+
+        self.assertEqual(Decimal("5.98"), teller.checks_out_articles_from(cart).total_price())
+
+    def test_lookups_from_many_threads_share_the_pool(self):
+        catalog = SqliteCatalog(self.path, cache_size=0, pool_size=2)
+        self.addCleanup(catalog.close)
+        errors = []
+
+        def look_up():
+            try:
+                for _ in range(50):
+                    self.assertEqual(Decimal("1.99"), catalog.unit_prices([self.apples, self.rice])[self.apples])
+            except Exception as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=look_up) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([], errors)
+        self.assertLessEqual(catalog._opened, 2)
+
+    def test_checkout_fetches_the_cart_prices_in_one_round_trip(self):
+        teller = Teller(self.catalog)
+        teller.add_special_offer(SpecialOfferType.TEN_PERCENT_DISCOUNT, self.apples, 10.0)
+        teller.add_bundle_offer({self.toothbrush: 1, self.rice: 1}, discount_percent=10)
+        cart = ShoppingCart()
+        cart.add_item_quantity(self.toothbrush, 2)
+        cart.add_item_quantity(self.apples, 1.5)
+        cart.add_item_quantity(self.rice, 1)
+        cart.add_item_quantity(self.toothbrush, 1)
+
+        receipt = teller.checks_out_articles_from(cart)
+
+        self.assertEqual([["apples", "rice", "toothbrush"]], self.catalog.fetches)
+        self.assertEqual(Decimal("7.80"), receipt.total_price().quantize(Decimal("0.01")))
+
+    def test_pickled_catalog_reopens_the_same_file(self):
+        copy = pickle.loads(pickle.dumps(self.catalog))
+        self.addCleanup(copy.close)
+
+        self.assertEqual(Decimal("0.99"), copy.unit_price(self.toothbrush))
+        self.assertEqual(CacheStats(hits=0, misses=1, evictions=0, size=1), copy.cache_stats)
@@ -0,0 +1,119 @@
+import unittest
+from datetime import date
+from decimal import Decimal
+
+from discount_optimizer import DiscountPlanOptimizer
+from fake_catalog import FakeCatalog
+from lru_cache import CacheStats
+from model_objects import Offer, PricingMode, Product, ProductUnit, SpecialOfferType
+from offer_calculator import OfferCalculator, StrategyMemo
+from product_registry import ProductRegistry
+from shopping_cart import ShoppingCart
+from teller import Teller
+
+CHECKOUT_DATE = date(2025, 11, 14)
+
+
+class StrategyMemoTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = FakeCatalog(ProductRegistry())
+        self.apples = Product("apples", ProductUnit.KILO)
+        self.pears = Product("pears", ProductUnit.KILO)
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.catalog.add_products([(self.apples, 1.99), (self.pears, 1.99), (self.toothbrush, 0.99)])
+
+    def teller(self, **kwargs):
+        teller = Teller(self.catalog, **kwargs)
+        teller.add_special_offers([
+            (SpecialOfferType.TEN_PERCENT_DISCOUNT, self.apples, 20.0),
+            (SpecialOfferType.TEN_PERCENT_DISCOUNT, self.pears, 20.0),
+            (SpecialOfferType.THREE_FOR_TWO, self.toothbrush, None),
+        ])
+        return teller
+
+    def checkout(self, teller, items, pricing_mode=PricingMode.DECIMAL):
+        cart = ShoppingCart(pricing_mode)
+        for product, quantity in items:
+            cart.add_item_quantity(product, quantity)
+        return teller.checks_out_articles_from(cart, checkout_date=CHECKOUT_DATE)
+
+    def test_results_are_shared_across_carts_and_products(self):
+        teller = self.teller()
+
+        self.checkout(teller, [(self.apples, 2.5), (self.toothbrush, 3)])
+        misses = teller.strategy_memo.stats.misses
+        receipt = self.checkout(teller, [(self.pears, 2.5), (self.toothbrush, 3)])
+
+        stats = teller.strategy_memo.stats
+        self.assertEqual(misses, stats.misses)
+        self.assertGreaterEqual(stats.hits, 2)
+        pears = [d for d in receipt.discounts if d.product == self.pears]
+        self.assertEqual(1, len(pears))
+        self.assertEqual("20.0% off", pears[0].description)
+
+    def test_receipts_do_not_share_discounts(self):
+        teller = self.teller()
+        items = [(self.apples, 2.5), (self.toothbrush, 3)]
+
+        first = self.checkout(teller, items)
+        second = self.checkout(teller, items)
+        first.discounts[0].amount = Decimal("0")
+
+        self.assertGreater(teller.strategy_memo.stats.hits, 0)
+        self.assertTrue(all(a is not b for a, b in zip(first.discounts, second.discounts)))
+        self.assertEqual(self.checkout(teller, items).total_price(), second.total_price())
+        self.assertNotEqual(Decimal("0"), second.discounts[0].amount)
+
+    def test_receipts_match_an_unmemoized_teller(self):
+        items = [(self.apples, 2.5), (self.pears, 1.25), (self.toothbrush, 7)]
+        for pricing_mode in (PricingMode.DECIMAL, PricingMode.FIXED_POINT):
+            with self.subTest(pricing_mode=pricing_mode):
+                plain = self.checkout(self.teller(memo_size=0), items, pricing_mode)
+                teller = self.teller()
+                self.checkout(teller, items, pricing_mode)
+                memoized = self.checkout(teller, items, pricing_mode)
+
+                self.assertGreater(teller.strategy_memo.stats.hits, 0)
+                self.assertEqual(plain.total_price(), memoized.total_price())
+                self.assertEqual(
+                    [(d.product, d.description, d.discount_amount) for d in plain.discounts],
+                    [(d.product, d.description, d.discount_amount) for d in memoized.discounts],
+                )
+
+    def test_offer_and_price_changes_clear_the_memo(self):
+        teller = self.teller()
+        self.checkout(teller, [(self.toothbrush, 3)])
+        self.assertEqual(1, teller.strategy_memo.stats.size)
+
+        teller.add_special_offer(SpecialOfferType.TEN_PERCENT_DISCOUNT, self.apples, 30.0)
+        self.assertEqual(0, teller.strategy_memo.stats.size)
+
+        self.checkout(teller, [(self.toothbrush, 3)])
+        self.catalog.add_product(self.toothbrush, 1.49)
+        teller.invalidate_pricing()
+        receipt = self.checkout(teller, [(self.toothbrush, 3)])
+
+        self.assertEqual(Decimal("2.98"), receipt.total_price())
+
+    def test_greedy_plans_hit_results_from_another_cart(self):
+        teller = self.teller(plan_optimizer=DiscountPlanOptimizer(node_budget=0))
+        # The greedy bundle step weighs the bundle against the products' own offers through the cart's calculator.
+        teller.add_bundle_offer({self.apples: 1, self.toothbrush: 1})
+        items = [(self.apples, 2.5), (self.toothbrush, 3)]
+
+        self.checkout(teller, items)
+        misses = teller.strategy_memo.stats.misses
+        self.checkout(teller, items)
+
+        self.assertEqual(misses, teller.strategy_memo.stats.misses)
+
+    def test_least_recently_used_results_are_evicted(self):
+        memo = StrategyMemo(max_size=2)
+        calculator = OfferCalculator()
+        calculator.memo = memo
+        offer = Offer(SpecialOfferType.TEN_PERCENT_DISCOUNT, self.apples, Decimal("10"))
+
+        for quantity in (1, 2, 1, 3, 2):
+            calculator.calculate_discount(offer, self.apples, quantity, Decimal("2.00"))
+
+        self.assertEqual(CacheStats(hits=1, misses=4, evictions=2, size=2), memo.stats)